@@ -0,0 +1,203 @@
+"""
+Micro-benchmarks of the hot paths of the type inference on synthetic class definitions
+(so that no stub files are parsed and no results depend on the installed typeshed).
+
+```
+$ python benchmark.py --iterations 2000
+```
+"""
+
+import argparse
+import os
+import time
+
+import look_up
+import subtyping
+from class_definition import ClassDefinition
+from function_definition import FunctionDefinition
+from memo_table import clear_memo_table
+import tracing
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_OFF, set_trace_level
+from type_annotation import *
+
+
+BENCHMARK_MODULE_NAME = '_type_inference_for_python_benchmark'
+
+
+# Seeds the cache of `look_up.look_up_class` with `number_of_classes` generic classes `C0[T]`, `C1[T]`, ...
+# Each class has `number_of_methods` methods `m0(self, T, builtins.int) -> T`, ...
+# Returns the list of `ConcreteClass`'es
+def seed_synthetic_class_definitions(number_of_classes=8, number_of_methods=16) -> list:
+    concrete_class_list = list()
+
+    for i in range(number_of_classes):
+        concrete_class = ConcreteClass(BENCHMARK_MODULE_NAME, f'C{i}')
+        type_variable = TypeVariable()
+        type_of_self = Subscription(concrete_class, (type_variable,))
+
+        look_up.concrete_class_to_class_definition_dict[concrete_class] = ClassDefinition(
+            type_variable_list=[type_variable],
+            method_name_to_method_list_dict={
+                f'm{j}': [
+                    FunctionDefinition(
+                        type_variable_list=[],
+                        parameter_type_annotation_list=[type_of_self, type_variable, ConcreteClass('builtins', 'int')],
+                        vararg_type_annotation=type_annotation_from_instance(None),
+                        kwonlyargs_name_to_type_annotation_dict=dict(),
+                        kwarg_type_annotation=type_annotation_from_instance(None),
+                        return_value_type_annotation=type_variable
+                    )
+                ]
+                for j in range(number_of_methods)
+            },
+            staticmethod_name_to_staticmethod_list_dict=dict(),
+            property_name_to_property_type_annotation_dict=dict()
+        )
+
+        concrete_class_list.append(concrete_class)
+
+    return concrete_class_list
+
+
+def benchmark_replace_type_variables_in_type_annotation(concrete_class_list, iterations) -> int:
+    type_variable = TypeVariable()
+    type_annotation = type_variable
+    for concrete_class in concrete_class_list:
+        type_annotation = Subscription(concrete_class, (type_annotation, type_variable))
+
+    old_type_variable_to_new_type_annotation_dict = {type_variable: ConcreteClass('builtins', 'int')}
+
+    for _ in range(iterations):
+        replace_type_variables_in_type_annotation(type_annotation, old_type_variable_to_new_type_annotation_dict)
+
+    return iterations
+
+
+# A nested annotation with one substituted type variable among ground `Subscription`'s, of which only the path to the type variable is rebuilt
+def benchmark_replace_type_variables_in_mostly_ground_type_annotation(concrete_class_list, iterations) -> int:
+    type_variable = TypeVariable()
+    ground_type_annotation = ConcreteClass('builtins', 'int')
+    for concrete_class in concrete_class_list:
+        ground_type_annotation = Subscription(concrete_class, (ground_type_annotation, ground_type_annotation))
+
+    type_annotation = Subscription(concrete_class_list[0], (ground_type_annotation, Subscription(concrete_class_list[-1], (ground_type_annotation, type_variable))))
+
+    old_type_variable_to_new_type_annotation_dict = {type_variable: ConcreteClass('builtins', 'int')}
+
+    for _ in range(iterations):
+        replace_type_variables_in_type_annotation(type_annotation, old_type_variable_to_new_type_annotation_dict)
+
+    return iterations
+
+
+# The memo of `type_annotation_subtyping` is cleared before every iteration, so that each query is computed
+def benchmark_type_annotation_subtyping(concrete_class_list, iterations) -> int:
+    type_annotation_pair_list = [
+        (Subscription(first_concrete_class, (ConcreteClass('builtins', 'int'),)), Subscription(second_concrete_class, (TypeVariable(),)))
+        for first_concrete_class in concrete_class_list
+        for second_concrete_class in concrete_class_list
+    ]
+
+    for _ in range(iterations):
+        clear_memo_table(subtyping.TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, reset_counters=False)
+        for first_type_annotation, second_type_annotation in type_annotation_pair_list:
+            subtyping.type_annotation_subtyping(first_type_annotation, second_type_annotation)
+
+    return iterations * len(type_annotation_pair_list)
+
+
+# `benchmark_type_annotation_subtyping` through `type_annotation_subtyping_many`, with every pair repeated 4 times
+def benchmark_type_annotation_subtyping_many(concrete_class_list, iterations) -> int:
+    type_annotation_pair_list = [
+        (Subscription(first_concrete_class, (ConcreteClass('builtins', 'int'),)), Subscription(second_concrete_class, (TypeVariable(),)))
+        for first_concrete_class in concrete_class_list
+        for second_concrete_class in concrete_class_list
+    ] * 4
+
+    for _ in range(iterations):
+        clear_memo_table(subtyping.TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, reset_counters=False)
+        subtyping.type_annotation_subtyping_many(type_annotation_pair_list)
+
+    return iterations * len(type_annotation_pair_list)
+
+
+# `Ci[builtins.int] <: Union[...]` against the same `Union` written in every rotation of its elements (with the last two nested)
+# The memo of `type_annotation_subtyping` is cleared before every iteration, and shared by the rotations of a `Union`, as they are the same `Union`
+def benchmark_union_type_annotation_subtyping(concrete_class_list, iterations) -> int:
+    element_list = [ Subscription(concrete_class, (TypeVariable(),)) for concrete_class in concrete_class_list[:4] ]
+
+    union_list = [
+        create_union_type_annotation(rotated_element_list[:-2] + [ create_union_type_annotation(rotated_element_list[-2:]) ])
+        for rotated_element_list in (element_list[i:] + element_list[:i] for i in range(len(element_list)))
+    ]
+
+    type_annotation_pair_list = [
+        (Subscription(concrete_class, (ConcreteClass('builtins', 'int'),)), union)
+        for concrete_class in concrete_class_list
+        for union in union_list
+    ]
+
+    for _ in range(iterations):
+        clear_memo_table(subtyping.TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, reset_counters=False)
+        for first_type_annotation, second_type_annotation in type_annotation_pair_list:
+            subtyping.type_annotation_subtyping(first_type_annotation, second_type_annotation)
+
+    return iterations * len(type_annotation_pair_list)
+
+
+# Nested generics `C0[C1[...C7[C0[...builtins.int]]]] <: C0[C1[...C7[C0[...T]]]]`, `depth` levels deep
+# The memo of `type_annotation_subtyping` is cleared before every iteration
+def benchmark_nested_type_annotation_subtyping(concrete_class_list, iterations, depth=24) -> int:
+    first_type_annotation = ConcreteClass('builtins', 'int')
+    second_type_annotation = TypeVariable()
+    for i in reversed(range(depth)):
+        concrete_class = concrete_class_list[i % len(concrete_class_list)]
+        first_type_annotation = Subscription(concrete_class, (first_type_annotation,))
+        second_type_annotation = Subscription(concrete_class, (second_type_annotation,))
+
+    for _ in range(iterations):
+        clear_memo_table(subtyping.TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, reset_counters=False)
+        subtyping.type_annotation_subtyping(first_type_annotation, second_type_annotation)
+
+    return iterations
+
+
+# Returns the number of operations per second
+def measure_throughput(benchmark, concrete_class_list, iterations) -> float:
+    start_time = time.perf_counter()
+    number_of_operations = benchmark(concrete_class_list, iterations)
+    return number_of_operations / (time.perf_counter() - start_time)
+
+
+# Runs each benchmark with tracing off, and with tracing at TRACE_LEVEL_DEBUG writing to os.devnull
+# Returns a dict mapping each benchmark name to (throughput with tracing off, throughput with tracing on)
+def run_tracing_benchmarks(iterations=1000) -> dict:
+    concrete_class_list = seed_synthetic_class_definitions()
+
+    benchmark_name_to_throughput_tuple_dict = dict()
+
+    previous_trace_level = tracing.TRACE_LEVEL
+
+    with open(os.devnull, 'w') as devnull:
+        try:
+            for benchmark in (benchmark_replace_type_variables_in_type_annotation, benchmark_replace_type_variables_in_mostly_ground_type_annotation, benchmark_type_annotation_subtyping, benchmark_type_annotation_subtyping_many, benchmark_union_type_annotation_subtyping, benchmark_nested_type_annotation_subtyping):
+                set_trace_level(TRACE_LEVEL_OFF)
+                throughput_with_tracing_off = measure_throughput(benchmark, concrete_class_list, iterations)
+
+                set_trace_level(TRACE_LEVEL_DEBUG, devnull)
+                throughput_with_tracing_on = measure_throughput(benchmark, concrete_class_list, iterations)
+
+                benchmark_name_to_throughput_tuple_dict[benchmark.__name__] = (throughput_with_tracing_off, throughput_with_tracing_on)
+        finally:
+            set_trace_level(previous_trace_level)
+
+    return benchmark_name_to_throughput_tuple_dict
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Benchmark the hot paths of the type inference with tracing off and on.')
+    argument_parser.add_argument('--iterations', type=int, default=1000)
+    arguments = argument_parser.parse_args()
+
+    for benchmark_name, (throughput_with_tracing_off, throughput_with_tracing_on) in run_tracing_benchmarks(arguments.iterations).items():
+        print(f'{benchmark_name}: {throughput_with_tracing_off:.0f} ops/s with tracing off, {throughput_with_tracing_on:.0f} ops/s with tracing on ({throughput_with_tracing_off / throughput_with_tracing_on:.1f}x)')
@@ -1,8 +1,12 @@
-import sys
+from collections.abc import Mapping
+from functools import partial
+import threading
 
-from attrs import define
+from attrs import define, field, frozen
 
 from function_definition import FunctionDefinition
+from runtime_statistics import instrumented, register_cache_size_function
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_INFO, trace
 from type_annotation import *
 
 
@@ -17,128 +21,321 @@ class ClassDefinition:
     # new
     # support properties
     property_name_to_property_type_annotation_dict: dict
+    # new
+    # ClassDefinitionFingerprint, computed on first use (see `get_class_definition_fingerprint`)
+    fingerprint: object = field(default=None, eq=False, repr=False)
+    # new
+    # The C3 linearization of the class and its base classes, as a list of MethodResolutionOrderEntry's (the class itself first)
+    # None if unknown (e.g. for hand-written or instantiated definitions, or definitions decoded from a type database), in which case subclasses take all of its members (including inherited ones) as its own
+    method_resolution_order_or_none: object = field(default=None, eq=False, repr=False)
 
+    # new
+    # Pickled (e.g. by the persistent cache) without the fingerprint, as its bits are only meaningful within one process
+    def __reduce__(self):
+        return ClassDefinition, (self.type_variable_list, self.method_name_to_method_list_dict, self.staticmethod_name_to_staticmethod_list_dict, self.property_name_to_property_type_annotation_dict, None, self.method_resolution_order_or_none)
 
-def instantiate_type_variables_in_class_definition(class_definition: ClassDefinition, type_annotation_list: list, indent_level=0) -> ClassDefinition:
-    indent = '    ' * indent_level
 
-    print(indent, f'instantiate_type_variables_in_class_definition {class_definition} {type_annotation_list}', file=sys.stderr)
+# new
+# A class in the MRO of a class, with its own members only (not including inherited members),
+# and its type arguments in terms of the type variables of the class whose MRO it is in
+@define
+class MethodResolutionOrderEntry:
+    concrete_class: ConcreteClass
+    type_variable_list: list
+    type_annotation_list: list
+    own_method_name_to_method_list_dict: dict
+    own_staticmethod_name_to_staticmethod_list_dict: dict
+    own_property_name_to_property_type_annotation_dict: dict
+
+
+# new
+# The MRO of a base class `concrete_class`, with the type arguments `type_annotation_list`, in terms of the type variables of the subclass
+def instantiate_method_resolution_order(concrete_class: ConcreteClass, class_definition: ClassDefinition, type_annotation_list: list, indent_level=0) -> list:
+    if class_definition.method_resolution_order_or_none is None:
+        # All members of the class are taken as its own
+        return [
+            MethodResolutionOrderEntry(
+                concrete_class,
+                class_definition.type_variable_list,
+                type_annotation_list,
+                class_definition.method_name_to_method_list_dict,
+                class_definition.staticmethod_name_to_staticmethod_list_dict,
+                class_definition.property_name_to_property_type_annotation_dict
+            )
+        ]
+
+    old_type_variable_to_new_type_annotation_dict = dict(zip(class_definition.type_variable_list, type_annotation_list))
+
+    return [
+        MethodResolutionOrderEntry(
+            method_resolution_order_entry.concrete_class,
+            method_resolution_order_entry.type_variable_list,
+            [
+                replace_type_variables_in_type_annotation(type_annotation, old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+                for type_annotation in method_resolution_order_entry.type_annotation_list
+            ],
+            method_resolution_order_entry.own_method_name_to_method_list_dict,
+            method_resolution_order_entry.own_staticmethod_name_to_staticmethod_list_dict,
+            method_resolution_order_entry.own_property_name_to_property_type_annotation_dict
+        )
+        for method_resolution_order_entry in class_definition.method_resolution_order_or_none
+    ]
 
-    assert len(type_annotation_list) >= len(class_definition.type_variable_list)
 
-    old_type_variable_to_new_type_annotation_dict = {
-        old_type_variable: new_type_annotation
-        for old_type_variable, new_type_annotation in zip(class_definition.type_variable_list, type_annotation_list)
-    }
-    
-    new_type_variable_list = [
-        new_type_annotation
-        for new_type_annotation in old_type_variable_to_new_type_annotation_dict.values()
-        if isinstance(new_type_annotation, TypeVariable)
-    ]
+# new
+# C3 linearization: merges the MROs of the base classes and the list of base classes (lists of MethodResolutionOrderEntry's) into the MRO of the subclass, without the subclass itself
+# Falls back to the first-seen order of the classes if the MROs are inconsistent
+def merge_method_resolution_orders(method_resolution_order_list: list, indent_level=0) -> list:
+    sequence_list = [ list(method_resolution_order) for method_resolution_order in method_resolution_order_list ]
+    sequence_list.append([ method_resolution_order[0] for method_resolution_order in method_resolution_order_list if method_resolution_order ])
 
-    # new_method_name_to_method_list_dict
-    new_method_name_to_method_list_dict = dict()
-    
-    for method_name, method_list in class_definition.method_name_to_method_list_dict.items():
-        new_method_name = method_name
-        new_method_list = list()
-
-        for method in method_list:
-            # Create method_level_old_type_variable_to_new_type_annotation_dict
-            method_level_old_type_variable_to_new_type_annotation_dict = old_type_variable_to_new_type_annotation_dict.copy()
-            for method_level_type_variable in method.type_variable_list:
-                method_level_old_type_variable_to_new_type_annotation_dict[method_level_type_variable] = method_level_type_variable
-
-            new_method_type_variable_list = method.type_variable_list
-
-            new_method_parameter_type_annotation_list = [
-                replace_type_variables_in_type_annotation(old_parameter_type_annotation, method_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
-                for old_parameter_type_annotation in method.parameter_type_annotation_list
-            ]
-
-            new_method_vararg_type_annotation = replace_type_variables_in_type_annotation(
-                method.vararg_type_annotation,
-                method_level_old_type_variable_to_new_type_annotation_dict,
-                indent_level + 1
-            )
+    merged_method_resolution_order = list()
 
-            new_method_kwonlyargs_name_to_type_annotation_dict = {
-                kwonlyargs_name: replace_type_variables_in_type_annotation(old_kwonlyargs_type_annotation, method_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
-                for kwonlyargs_name, old_kwonlyargs_type_annotation in method.kwonlyargs_name_to_type_annotation_dict.items()
-            }
+    while True:
+        sequence_list = [ sequence for sequence in sequence_list if sequence ]
 
-            new_method_kwarg_type_annotation = replace_type_variables_in_type_annotation(
-                method.kwarg_type_annotation,
-                method_level_old_type_variable_to_new_type_annotation_dict,
-                indent_level + 1
-            )
+        if not sequence_list:
+            return merged_method_resolution_order
 
-            new_method_return_value_type_annotation = replace_type_variables_in_type_annotation(method.return_value_type_annotation, method_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+        # The first head not in the tail of any sequence
+        for sequence in sequence_list:
+            head_concrete_class = sequence[0].concrete_class
+            if not any(
+                method_resolution_order_entry.concrete_class == head_concrete_class
+                for other_sequence in sequence_list
+                for method_resolution_order_entry in other_sequence[1:]
+            ):
+                head = sequence[0]
+                break
+        else:
+            trace(TRACE_LEVEL_INFO, indent_level, 'inconsistent MRO %s', [ [ method_resolution_order_entry.concrete_class for method_resolution_order_entry in sequence ] for sequence in sequence_list ])
 
-            new_method = FunctionDefinition(new_method_type_variable_list, new_method_parameter_type_annotation_list, new_method_vararg_type_annotation, new_method_kwonlyargs_name_to_type_annotation_dict, new_method_kwarg_type_annotation, new_method_return_value_type_annotation)
+            merged_concrete_class_set = { method_resolution_order_entry.concrete_class for method_resolution_order_entry in merged_method_resolution_order }
+            for sequence in sequence_list:
+                for method_resolution_order_entry in sequence:
+                    if method_resolution_order_entry.concrete_class not in merged_concrete_class_set:
+                        merged_concrete_class_set.add(method_resolution_order_entry.concrete_class)
+                        merged_method_resolution_order.append(method_resolution_order_entry)
 
-            new_method_list.append(new_method)
+            return merged_method_resolution_order
 
-        new_method_name_to_method_list_dict[method_name] = new_method_list
+        merged_method_resolution_order.append(head)
 
-    # new_staticmethod_name_to_staticmethod_list_dict
-    new_staticmethod_name_to_staticmethod_list_dict = dict()
-    
-    for staticmethod_name, staticmethod_list in class_definition.staticmethod_name_to_staticmethod_list_dict.items():
-        new_staticmethod_name = staticmethod_name
-        new_staticmethod_list = list()
-
-        for staticmethod in staticmethod_list:
-            # Create staticmethod_level_old_type_variable_to_new_type_annotation_dict
-            staticmethod_level_old_type_variable_to_new_type_annotation_dict = dict()
-            for staticmethod_level_type_variable in staticmethod.type_variable_list:
-                staticmethod_level_old_type_variable_to_new_type_annotation_dict[staticmethod_level_type_variable] = staticmethod_level_type_variable
-
-            new_staticmethod_type_variable_list = staticmethod.type_variable_list
-
-            new_staticmethod_parameter_type_annotation_list = [
-                replace_type_variables_in_type_annotation(old_parameter_type_annotation, staticmethod_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
-                for old_parameter_type_annotation in staticmethod.parameter_type_annotation_list
-            ]
-
-            new_staticmethod_vararg_type_annotation = replace_type_variables_in_type_annotation(
-                staticmethod.vararg_type_annotation,
-                staticmethod_level_old_type_variable_to_new_type_annotation_dict,
-                indent_level + 1
-            )
+        sequence_list = [
+            sequence[1:] if sequence[0].concrete_class == head_concrete_class else sequence
+            for sequence in sequence_list
+        ]
 
-            new_staticmethod_kwonlyargs_name_to_type_annotation_dict = {
-                kwonlyargs_name: replace_type_variables_in_type_annotation(old_kwonlyargs_type_annotation, staticmethod_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
-                for kwonlyargs_name, old_kwonlyargs_type_annotation in staticmethod.kwonlyargs_name_to_type_annotation_dict.items()
-            }
 
-            new_staticmethod_kwarg_type_annotation = replace_type_variables_in_type_annotation(
-                staticmethod.kwarg_type_annotation,
-                staticmethod_level_old_type_variable_to_new_type_annotation_dict,
-                indent_level + 1
-            )
+# new
+# Member names are interned to bit positions, shared by methods, staticmethods and properties
+# Cache
+member_name_to_bit_dict = dict()
 
-            new_staticmethod_return_value_type_annotation = replace_type_variables_in_type_annotation(staticmethod.return_value_type_annotation, staticmethod_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+member_name_lock = threading.Lock()
 
-            new_staticmethod = FunctionDefinition(new_staticmethod_type_variable_list, new_staticmethod_parameter_type_annotation_list, new_staticmethod_vararg_type_annotation, new_staticmethod_kwonlyargs_name_to_type_annotation_dict, new_staticmethod_kwarg_type_annotation, new_staticmethod_return_value_type_annotation)
+register_cache_size_function('member_name_bit', lambda: len(member_name_to_bit_dict))
 
-            new_staticmethod_list.append(new_staticmethod)
 
-        new_staticmethod_name_to_staticmethod_list_dict[staticmethod_name] = new_staticmethod_list
-    
-    # new_property_name_to_property_type_annotation_dict
-    new_property_name_to_property_type_annotation_dict = dict()
+def get_member_name_bit(member_name: str) -> int:
+    bit = member_name_to_bit_dict.get(member_name, None)
+
+    if bit is None:
+        with member_name_lock:
+            bit = member_name_to_bit_dict.setdefault(member_name, 1 << len(member_name_to_bit_dict))
+
+    return bit
+
 
-    for property_name, property_type_annotation in class_definition.property_name_to_property_type_annotation_dict.items():
-        new_property_name = property_name
+def get_member_name_bitset(member_name_iterable) -> int:
+    bitset = 0
+    for member_name in member_name_iterable:
+        bitset |= get_member_name_bit(member_name)
+    return bitset
 
-        new_property_type_annotation = replace_type_variables_in_type_annotation(
-            property_type_annotation,
-            old_type_variable_to_new_type_annotation_dict,
-            indent_level + 1
+
+# new
+# The member names of a class as bitsets, so that a class missing members of another class is rejected with a few bitwise operations
+@frozen
+class ClassDefinitionFingerprint:
+    method_name_bitset: int
+    staticmethod_name_bitset: int
+    property_name_bitset: int
+
+
+# Only iterates over member names, and does not materialize any member of a `LazyMemberMapping`
+def get_class_definition_fingerprint(class_definition: ClassDefinition) -> ClassDefinitionFingerprint:
+    if class_definition.fingerprint is None:
+        class_definition.fingerprint = ClassDefinitionFingerprint(
+            get_member_name_bitset(class_definition.method_name_to_method_list_dict),
+            get_member_name_bitset(class_definition.staticmethod_name_to_staticmethod_list_dict),
+            get_member_name_bitset(class_definition.property_name_to_property_type_annotation_dict)
+        )
+
+    return class_definition.fingerprint
+
+
+# Whether `first_class_definition` has all members of `second_class_definition` (of the same kind)
+def has_all_member_names(first_class_definition: ClassDefinition, second_class_definition: ClassDefinition) -> bool:
+    first_class_definition_fingerprint = get_class_definition_fingerprint(first_class_definition)
+    second_class_definition_fingerprint = get_class_definition_fingerprint(second_class_definition)
+
+    return not (
+        second_class_definition_fingerprint.method_name_bitset & ~first_class_definition_fingerprint.method_name_bitset
+        or second_class_definition_fingerprint.staticmethod_name_bitset & ~first_class_definition_fingerprint.staticmethod_name_bitset
+        or second_class_definition_fingerprint.property_name_bitset & ~first_class_definition_fingerprint.property_name_bitset
+    )
+
+
+# new
+# A read-only view of a class' members (methods, staticmethods or properties)
+# Looks up `own_member_dict` first, and then each (member_mapping, transform_or_none) in layer_list in order (for a parsed class, its own members and then the own members of each class in its MRO)
+# A member found in a layer is only transformed (e.g. has its type variables substituted) when it is first read
+class LazyMemberMapping(Mapping):
+    __slots__ = ('own_member_dict', 'layer_list', 'materialized_member_dict', 'member_name_list')
+
+    def __init__(self, own_member_dict: dict, layer_list=()):
+        self.own_member_dict = own_member_dict
+        self.layer_list = list(layer_list)
+        self.materialized_member_dict = dict()
+        self.member_name_list = None
+
+    def __getitem__(self, member_name):
+        if member_name in self.own_member_dict:
+            return self.own_member_dict[member_name]
+        elif member_name in self.materialized_member_dict:
+            return self.materialized_member_dict[member_name]
+        else:
+            for member_mapping, transform_or_none in self.layer_list:
+                if member_name in member_mapping:
+                    member = member_mapping[member_name]
+                    if transform_or_none is not None:
+                        member = transform_or_none(member)
+
+                    # Concurrent first reads all get the member materialized first
+                    return self.materialized_member_dict.setdefault(member_name, member)
+
+            raise KeyError(member_name)
+
+    # Does not materialize any member
+    def __contains__(self, member_name):
+        return member_name in self.own_member_dict or any(
+            member_name in member_mapping
+            for member_mapping, transform_or_none in self.layer_list
         )
 
-        new_property_name_to_property_type_annotation_dict[new_property_name] = new_property_type_annotation
+    def __iter__(self):
+        if self.member_name_list is None:
+            member_name_list = list(self.own_member_dict)
+            member_name_set = set(member_name_list)
+
+            for member_mapping, transform_or_none in self.layer_list:
+                for member_name in member_mapping:
+                    if member_name not in member_name_set:
+                        member_name_set.add(member_name)
+                        member_name_list.append(member_name)
+
+            self.member_name_list = member_name_list
+
+        return iter(self.member_name_list)
+
+    def __len__(self):
+        return sum(1 for member_name in self)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)})'
+
+    # Pickled (e.g. by the persistent cache) as a plain, fully materialized dict
+    def __reduce__(self):
+        return dict, (dict(self.items()),)
+
+
+def instantiate_type_variables_in_method(method: FunctionDefinition, old_type_variable_to_new_type_annotation_dict: dict, indent_level=0) -> FunctionDefinition:
+    # Create method_level_old_type_variable_to_new_type_annotation_dict
+    method_level_old_type_variable_to_new_type_annotation_dict = old_type_variable_to_new_type_annotation_dict.copy()
+    for method_level_type_variable in method.type_variable_list:
+        method_level_old_type_variable_to_new_type_annotation_dict[method_level_type_variable] = method_level_type_variable
+
+    new_method_type_variable_list = method.type_variable_list
+
+    new_method_parameter_type_annotation_list = [
+        replace_type_variables_in_type_annotation(old_parameter_type_annotation, method_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+        for old_parameter_type_annotation in method.parameter_type_annotation_list
+    ]
+
+    new_method_vararg_type_annotation = replace_type_variables_in_type_annotation(
+        method.vararg_type_annotation,
+        method_level_old_type_variable_to_new_type_annotation_dict,
+        indent_level + 1
+    )
+
+    new_method_kwonlyargs_name_to_type_annotation_dict = {
+        kwonlyargs_name: replace_type_variables_in_type_annotation(old_kwonlyargs_type_annotation, method_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+        for kwonlyargs_name, old_kwonlyargs_type_annotation in method.kwonlyargs_name_to_type_annotation_dict.items()
+    }
+
+    new_method_kwarg_type_annotation = replace_type_variables_in_type_annotation(
+        method.kwarg_type_annotation,
+        method_level_old_type_variable_to_new_type_annotation_dict,
+        indent_level + 1
+    )
+
+    new_method_return_value_type_annotation = replace_type_variables_in_type_annotation(method.return_value_type_annotation, method_level_old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+
+    return FunctionDefinition(new_method_type_variable_list, new_method_parameter_type_annotation_list, new_method_vararg_type_annotation, new_method_kwonlyargs_name_to_type_annotation_dict, new_method_kwarg_type_annotation, new_method_return_value_type_annotation, method.parameter_name_list, method.number_of_defaulted_parameters, method.has_vararg, method.has_kwarg)
+
+
+def instantiate_type_variables_in_method_list(old_type_variable_to_new_type_annotation_dict: dict, method_list: list) -> list:
+    return [
+        instantiate_type_variables_in_method(method, old_type_variable_to_new_type_annotation_dict)
+        for method in method_list
+    ]
+
+
+# new
+# Used by `look_up.parse_class` for methods inherited from a base class
+# Instantiates the type variables of the base class, and replaces the type of the first parameter with the type of `self` or `cls` of the subclass
+def instantiate_type_variables_in_inherited_method_list(old_type_variable_to_new_type_annotation_dict: dict, type_of_self_or_cls, method_list: list) -> list:
+    new_method_list = instantiate_type_variables_in_method_list(old_type_variable_to_new_type_annotation_dict, method_list)
+
+    for new_method in new_method_list:
+        new_method.parameter_type_annotation_list[0] = type_of_self_or_cls
+
+    return new_method_list
+
+
+def instantiate_type_variables_in_property_type_annotation(old_type_variable_to_new_type_annotation_dict: dict, property_type_annotation):
+    return replace_type_variables_in_type_annotation(property_type_annotation, old_type_variable_to_new_type_annotation_dict)
+
+
+@instrumented
+def instantiate_type_variables_in_class_definition(class_definition: ClassDefinition, type_annotation_list: list, indent_level=0) -> ClassDefinition:
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'instantiate_type_variables_in_class_definition %s %s', class_definition, type_annotation_list)
+
+    assert len(type_annotation_list) >= len(class_definition.type_variable_list)
+
+    old_type_variable_to_new_type_annotation_dict = {
+        old_type_variable: new_type_annotation
+        for old_type_variable, new_type_annotation in zip(class_definition.type_variable_list, type_annotation_list)
+    }
+    
+    new_type_variable_list = [
+        new_type_annotation
+        for new_type_annotation in old_type_variable_to_new_type_annotation_dict.values()
+        if isinstance(new_type_annotation, TypeVariable)
+    ]
+
+    # Methods and properties are instantiated lazily, when they are first read
+    new_method_name_to_method_list_dict = LazyMemberMapping(dict(), [
+        (class_definition.method_name_to_method_list_dict, partial(instantiate_type_variables_in_method_list, old_type_variable_to_new_type_annotation_dict))
+    ])
+
+    # staticmethods do not reference class-level type variables, and are shared with class_definition
+    new_staticmethod_name_to_staticmethod_list_dict = class_definition.staticmethod_name_to_staticmethod_list_dict
+    
+    new_property_name_to_property_type_annotation_dict = LazyMemberMapping(dict(), [
+        (class_definition.property_name_to_property_type_annotation_dict, partial(instantiate_type_variables_in_property_type_annotation, old_type_variable_to_new_type_annotation_dict))
+    ])
     
-    return ClassDefinition(new_type_variable_list, new_method_name_to_method_list_dict, new_staticmethod_name_to_staticmethod_list_dict, new_property_name_to_property_type_annotation_dict)
+    # Instantiation does not change member names, so the fingerprint (if already computed) is shared
+    return ClassDefinition(new_type_variable_list, new_method_name_to_method_list_dict, new_staticmethod_name_to_staticmethod_list_dict, new_property_name_to_property_type_annotation_dict, class_definition.fingerprint)
@@ -0,0 +1,194 @@
+"""
+Compact class table storing the class hierarchy parsed from the bases of typeshed classes.
+
+Each `ConcreteClass` is interned to a dense integer ID.
+Classes without explicit bases in their stubs have the implicit base `builtins.object` (see `look_up.parse_class`).
+The ancestors of each class (including itself) are stored as a bitset (a Python int), so a nominal subclass check is a single bit test.
+
+```python
+In [1]: from look_up import *
+
+In [2]: look_up_class(ConcreteClass('builtins', 'bool'))
+
+In [3]: is_nominal_subclass(ConcreteClass('builtins', 'bool'), ConcreteClass('builtins', 'int'))
+Out[3]: True
+
+In [4]: [ concrete_class for concrete_class in iterate_ancestor_classes(ConcreteClass('builtins', 'bool')) ]
+Out[4]:
+[ConcreteClass(module_name='builtins', class_name='bool'),
+ ConcreteClass(module_name='builtins', class_name='int'),
+ ConcreteClass(module_name='builtins', class_name='object')]
+```
+"""
+
+import threading
+
+from runtime_statistics import register_cache_size_function
+from type_annotation import *
+
+
+# new
+# The implicit base of classes without explicit bases
+OBJECT_CONCRETE_CLASS = ConcreteClass('builtins', 'object')
+
+
+# Class table
+concrete_class_to_class_id_dict = dict()
+class_id_to_concrete_class_list = list()
+class_id_to_base_class_id_list_list = list()
+# new
+# The inverse of `class_id_to_base_class_id_list_list`, so that changing the bases of a class only invalidates its descendants
+class_id_to_derived_class_id_list_list = list()
+# Lazily computed, None if not computed yet
+class_id_to_ancestor_bitset_or_none_list = list()
+
+register_cache_size_function('class_hierarchy', lambda: len(class_id_to_concrete_class_list))
+
+# Guards all writes to the class table (reads of computed entries are lock-free)
+class_hierarchy_lock = threading.RLock()
+
+
+def get_class_id(concrete_class: ConcreteClass) -> int:
+    global concrete_class_to_class_id_dict, class_id_to_concrete_class_list, class_id_to_base_class_id_list_list, class_id_to_derived_class_id_list_list, class_id_to_ancestor_bitset_or_none_list
+
+    class_id = concrete_class_to_class_id_dict.get(concrete_class, None)
+
+    if class_id is None:
+        with class_hierarchy_lock:
+            class_id = concrete_class_to_class_id_dict.get(concrete_class, None)
+
+            if class_id is None:
+                class_id = len(class_id_to_concrete_class_list)
+
+                # Append to the lists first, so that lock-free readers never see an ID without entries
+                class_id_to_concrete_class_list.append(concrete_class)
+                class_id_to_base_class_id_list_list.append(list())
+                class_id_to_derived_class_id_list_list.append(list())
+                class_id_to_ancestor_bitset_or_none_list.append(None)
+                concrete_class_to_class_id_dict[concrete_class] = class_id
+
+    return class_id
+
+
+def get_class_id_or_none(concrete_class: ConcreteClass):
+    return concrete_class_to_class_id_dict.get(concrete_class, None)
+
+
+def add_base_classes(concrete_class: ConcreteClass, base_class_iterable):
+    global class_id_to_base_class_id_list_list, class_id_to_derived_class_id_list_list, class_id_to_ancestor_bitset_or_none_list
+
+    with class_hierarchy_lock:
+        class_id = get_class_id(concrete_class)
+        base_class_id_list = class_id_to_base_class_id_list_list[class_id]
+
+        changed = False
+
+        for base_class in base_class_iterable:
+            base_class_id = get_class_id(base_class)
+            if base_class_id not in base_class_id_list:
+                base_class_id_list.append(base_class_id)
+                class_id_to_derived_class_id_list_list[base_class_id].append(class_id)
+                changed = True
+
+        # Invalidate the ancestor bitsets of the class and all of its descendants
+        if changed:
+            visited_class_id_set = {class_id}
+            stack = [class_id]
+
+            while stack:
+                class_id_ = stack.pop()
+                class_id_to_ancestor_bitset_or_none_list[class_id_] = None
+
+                for derived_class_id in class_id_to_derived_class_id_list_list[class_id_]:
+                    if derived_class_id not in visited_class_id_set:
+                        visited_class_id_set.add(derived_class_id)
+                        stack.append(derived_class_id)
+
+
+def get_ancestor_bitset(class_id: int) -> int:
+    global class_id_to_ancestor_bitset_or_none_list
+
+    ancestor_bitset_or_none = class_id_to_ancestor_bitset_or_none_list[class_id]
+    if ancestor_bitset_or_none is not None:
+        return ancestor_bitset_or_none
+
+    with class_hierarchy_lock:
+        # Iterative post-order traversal, robust against (malformed) cycles
+        in_progress_class_id_set = {class_id}
+        stack = [(class_id, iter(class_id_to_base_class_id_list_list[class_id]))]
+
+        while stack:
+            current_class_id, base_class_id_iterator = stack[-1]
+
+            for base_class_id in base_class_id_iterator:
+                if class_id_to_ancestor_bitset_or_none_list[base_class_id] is None and base_class_id not in in_progress_class_id_set:
+                    in_progress_class_id_set.add(base_class_id)
+                    stack.append((base_class_id, iter(class_id_to_base_class_id_list_list[base_class_id])))
+                    break
+            else:
+                stack.pop()
+                in_progress_class_id_set.discard(current_class_id)
+
+                ancestor_bitset = 1 << current_class_id
+                for base_class_id in class_id_to_base_class_id_list_list[current_class_id]:
+                    base_ancestor_bitset_or_none = class_id_to_ancestor_bitset_or_none_list[base_class_id]
+                    if base_ancestor_bitset_or_none is not None:
+                        ancestor_bitset |= base_ancestor_bitset_or_none
+
+                class_id_to_ancestor_bitset_or_none_list[current_class_id] = ancestor_bitset
+
+        return class_id_to_ancestor_bitset_or_none_list[class_id]
+
+
+# Whether `second_concrete_class` is `first_concrete_class` or one of its ancestors according to the parsed stub bases
+# `builtins.object` is an ancestor of every class; otherwise, classes that have not been looked up have no known ancestors
+def is_nominal_subclass(first_concrete_class: ConcreteClass, second_concrete_class: ConcreteClass) -> bool:
+    if first_concrete_class == second_concrete_class or second_concrete_class == OBJECT_CONCRETE_CLASS:
+        return True
+
+    first_class_id = concrete_class_to_class_id_dict.get(first_concrete_class, None)
+    second_class_id = concrete_class_to_class_id_dict.get(second_concrete_class, None)
+
+    if first_class_id is None or second_class_id is None:
+        return False
+    else:
+        return bool(get_ancestor_bitset(first_class_id) >> second_class_id & 1)
+
+
+def iterate_concrete_classes():
+    yield from class_id_to_concrete_class_list
+
+
+# In class ID order
+def iterate_class_ids_in_bitset(bitset: int):
+    while bitset:
+        lowest_bit = bitset & -bitset
+        yield lowest_bit.bit_length() - 1
+        bitset ^= lowest_bit
+
+
+def get_concrete_class(class_id: int) -> ConcreteClass:
+    return class_id_to_concrete_class_list[class_id]
+
+
+def iterate_ancestor_classes(concrete_class: ConcreteClass):
+    class_id = concrete_class_to_class_id_dict.get(concrete_class, None)
+
+    if class_id is not None:
+        for ancestor_class_id in iterate_class_ids_in_bitset(get_ancestor_bitset(class_id)):
+            yield class_id_to_concrete_class_list[ancestor_class_id]
+
+
+def iterate_base_classes(concrete_class: ConcreteClass):
+    class_id = concrete_class_to_class_id_dict.get(concrete_class, None)
+
+    if class_id is not None:
+        for base_class_id in class_id_to_base_class_id_list_list[class_id]:
+            yield class_id_to_concrete_class_list[base_class_id]
+
+
+# All (class, base class) edges
+def iterate_class_inheritance_edges():
+    for class_id, base_class_id_list in enumerate(class_id_to_base_class_id_list_list):
+        for base_class_id in base_class_id_list:
+            yield class_id_to_concrete_class_list[class_id], class_id_to_concrete_class_list[base_class_id]
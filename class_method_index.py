@@ -0,0 +1,143 @@
+"""
+Class-by-method-name index for finding the candidate classes of a set of present methods.
+
+For each method name, the index stores the set of classes defining (or inheriting) it as a bit-packed row of a NumPy matrix,
+so that a superset query is a vectorized AND of the rows of the queried method names.
+Results are ranked by the number of methods of each class (fewest first), so that the most specific candidates come first.
+
+```python
+In [1]: from typeshed_index import *
+
+In [2]: load_typeshed_index('typeshed_index.pickle')
+
+In [3]: from class_method_index import *
+
+In [4]: class_method_index = build_class_method_index()
+
+In [5]: get_classes_with_methods(class_method_index, ['__getitem__', '__len__', 'append'])[:3]
+Out[5]:
+[ConcreteClass(module_name='typing', class_name='MutableSequence'),
+ ConcreteClass(module_name='collections', class_name='UserList'),
+ ConcreteClass(module_name='builtins', class_name='list')]
+
+In [6]: save_class_method_index(class_method_index, 'class_method_index.npz')
+
+In [7]: class_method_index = load_class_method_index('class_method_index.npz') # e.g. in a worker process
+```
+"""
+
+from attrs import define
+import numpy as np
+
+import look_up
+from class_hierarchy import iterate_concrete_classes
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_INFO, trace
+from type_annotation import *
+
+
+@define
+class ClassMethodIndex:
+    concrete_class_list: list
+    method_name_list: list
+    method_name_to_method_index_dict: dict
+    # shape (number of method names, ceil(number of classes / 8)), dtype uint8
+    # bit `j` of row `i` is set if `concrete_class_list[j]` has method `method_name_list[i]`
+    method_by_class_bit_matrix: np.ndarray
+    # shape (number of classes,), the number of methods of each class
+    method_count_array: np.ndarray
+
+
+def create_class_method_index(concrete_class_list: list, method_name_set_list: list) -> ClassMethodIndex:
+    method_name_list = sorted(set().union(*method_name_set_list))
+    method_name_to_method_index_dict = { method_name: i for i, method_name in enumerate(method_name_list) }
+
+    class_by_method_matrix = np.zeros((len(concrete_class_list), len(method_name_list)), dtype=bool)
+    for class_index, method_name_set in enumerate(method_name_set_list):
+        class_by_method_matrix[class_index, [ method_name_to_method_index_dict[method_name] for method_name in method_name_set ]] = True
+
+    return ClassMethodIndex(
+        concrete_class_list,
+        method_name_list,
+        method_name_to_method_index_dict,
+        np.packbits(class_by_method_matrix.T, axis=1),
+        class_by_method_matrix.sum(axis=1)
+    )
+
+
+# Indexes all classes in the cache of `look_up.look_up_class` (e.g. all typeshed classes after `typeshed_index.load_typeshed_index`),
+# as well as all classes in the class hierarchy (which are looked up), or only the classes in `concrete_class_iterable` if given
+def build_class_method_index(concrete_class_iterable=None, indent_level=0) -> ClassMethodIndex:
+    trace(TRACE_LEVEL_INFO, indent_level, 'build_class_method_index')
+
+    if concrete_class_iterable is None:
+        concrete_class_iterable = list(dict.fromkeys(
+            [ *look_up.concrete_class_to_class_definition_dict, *iterate_concrete_classes() ]
+        ))
+
+    concrete_class_list = list()
+    method_name_set_list = list()
+
+    for concrete_class in concrete_class_iterable:
+        try:
+            class_definition = look_up.look_up_class(concrete_class, indent_level + 1)
+        # Classes whose stubs cannot be parsed are left out of the index
+        except Exception as e:
+            trace(TRACE_LEVEL_DEBUG, indent_level, '%s skipped: %s %s', concrete_class, type(e).__name__, e)
+            continue
+
+        concrete_class_list.append(concrete_class)
+        method_name_set_list.append(set(class_definition.method_name_to_method_list_dict))
+
+    return create_class_method_index(concrete_class_list, method_name_set_list)
+
+
+# Returns the classes having all methods in `method_name_iterable`, ranked by their number of methods (fewest first)
+def get_classes_with_methods(class_method_index: ClassMethodIndex, method_name_iterable) -> list:
+    method_index_list = list()
+
+    for method_name in set(method_name_iterable):
+        method_index_or_none = class_method_index.method_name_to_method_index_dict.get(method_name, None)
+        # No class has this method
+        if method_index_or_none is None:
+            return []
+        method_index_list.append(method_index_or_none)
+
+    number_of_classes = len(class_method_index.concrete_class_list)
+
+    if method_index_list:
+        class_bit_array = np.bitwise_and.reduce(class_method_index.method_by_class_bit_matrix[method_index_list], axis=0)
+        class_index_array = np.flatnonzero(np.unpackbits(class_bit_array, count=number_of_classes))
+    else:
+        class_index_array = np.arange(number_of_classes)
+
+    ranked_class_index_array = class_index_array[np.argsort(class_method_index.method_count_array[class_index_array], kind='stable')]
+
+    return [ class_method_index.concrete_class_list[class_index] for class_index in ranked_class_index_array ]
+
+
+# Stored as an uncompressed .npz file of plain arrays (no pickles), which loads without re-parsing any stubs
+def save_class_method_index(class_method_index: ClassMethodIndex, file_path: str):
+    np.savez(
+        file_path,
+        module_name_array=np.array([ concrete_class.module_name for concrete_class in class_method_index.concrete_class_list ], dtype=str),
+        class_name_array=np.array([ concrete_class.class_name for concrete_class in class_method_index.concrete_class_list ], dtype=str),
+        method_name_array=np.array(class_method_index.method_name_list, dtype=str),
+        method_by_class_bit_matrix=class_method_index.method_by_class_bit_matrix,
+        method_count_array=class_method_index.method_count_array
+    )
+
+
+def load_class_method_index(file_path: str) -> ClassMethodIndex:
+    with np.load(file_path, allow_pickle=False) as npz_file:
+        method_name_list = npz_file['method_name_array'].tolist()
+
+        return ClassMethodIndex(
+            [
+                ConcreteClass(module_name, class_name)
+                for module_name, class_name in zip(npz_file['module_name_array'].tolist(), npz_file['class_name_array'].tolist())
+            ],
+            method_name_list,
+            { method_name: i for i, method_name in enumerate(method_name_list) },
+            npz_file['method_by_class_bit_matrix'],
+            npz_file['method_count_array']
+        )
@@ -1,4 +1,6 @@
-from attrs import define
+from attrs import define, field, frozen
+
+from type_annotation import ConcreteClass, Subscription
 
 
 @define
@@ -15,4 +17,54 @@ class FunctionDefinition:
     # support args.kwarg
     kwarg_type_annotation: object
     return_value_type_annotation: object
+    # new
+    # the shape of the signature, used for overload dispatch (see `overload_index.py`)
+    # None if unknown (e.g. for hand-written definitions), in which case calls of any shape are compatible
+    parameter_name_list: object = None
+    number_of_defaulted_parameters: int = 0
+    has_vararg: bool = False
+    has_kwarg: bool = False
+    # new
+    # FunctionDefinitionFingerprint, computed on first use (see `get_function_definition_fingerprint`)
+    fingerprint: object = field(default=None, eq=False, repr=False)
+
+
+# new
+# A summary of a signature that is cheap to compare, used by `subtyping.py` to reject or order checks before any structural work
+@frozen
+class FunctionDefinitionFingerprint:
+    number_of_parameters: int
+    # Whether `*args` and `**kwargs` have a type annotation other than `NoneType`
+    has_vararg_type_annotation: bool
+    has_kwarg_type_annotation: bool
+    kwonlyargs_name_frozenset: frozenset
+    # The concrete class of the return value type annotation, None if it is not a `ConcreteClass` or a `Subscription` (e.g. a `TypeVariable`)
+    return_value_concrete_class_or_none: object
+
+
+def get_function_definition_fingerprint(function_definition: FunctionDefinition) -> FunctionDefinitionFingerprint:
+    if function_definition.fingerprint is None:
+        none_type = ConcreteClass(module_name='builtins', class_name='NoneType')
+
+        return_value_type_annotation = function_definition.return_value_type_annotation
+        if isinstance(return_value_type_annotation, ConcreteClass):
+            return_value_concrete_class_or_none = return_value_type_annotation
+        elif isinstance(return_value_type_annotation, Subscription):
+            return_value_concrete_class_or_none = return_value_type_annotation.concrete_class
+        else:
+            return_value_concrete_class_or_none = None
+
+        function_definition.fingerprint = FunctionDefinitionFingerprint(
+            len(function_definition.parameter_type_annotation_list),
+            function_definition.vararg_type_annotation != none_type,
+            function_definition.kwarg_type_annotation != none_type,
+            frozenset(function_definition.kwonlyargs_name_to_type_annotation_dict),
+            return_value_concrete_class_or_none
+        )
+
+    return function_definition.fingerprint
+
 
+# Whether `first_function_definition` has all keyword-only parameters of `second_function_definition`
+def has_all_kwonlyargs_names(first_function_definition: FunctionDefinition, second_function_definition: FunctionDefinition) -> bool:
+    return get_function_definition_fingerprint(second_function_definition).kwonlyargs_name_frozenset <= get_function_definition_fingerprint(first_function_definition).kwonlyargs_name_frozenset
@@ -16,30 +16,39 @@ In [7]: class_list = [ v for k, v in module.__dict__.items() if isinstance(v, ty
 In [8]: for f in global_function_list: look_up_global_function(GlobalFunction(f.__module__, f.__name__))
 
 In [9]: for c in class_list: look_up_class(ConcreteClass(c.__module__, c.__name__))
+
+In [10]: save_persistent_cache()
 """
 
 import ast
-import sys
+from functools import partial
+import os
+import threading
 
-import networkx as nx
 from ordered_set import OrderedSet
 import typeshed_client.parser
 
-from class_definition import ClassDefinition, instantiate_type_variables_in_class_definition
+from class_hierarchy import OBJECT_CONCRETE_CLASS, add_base_classes, get_class_id, iterate_base_classes, iterate_class_inheritance_edges, iterate_concrete_classes, is_nominal_subclass
+from class_definition import ClassDefinition, LazyMemberMapping, MethodResolutionOrderEntry, instantiate_method_resolution_order, instantiate_type_variables_in_class_definition, instantiate_type_variables_in_inherited_method_list, instantiate_type_variables_in_property_type_annotation, merge_method_resolution_orders
 from function_definition import FunctionDefinition
+from look_up_coalescing import coalesce_look_up
+from memo_table import MemoTable
+from persistent_cache import load_module_entries_from_persistent_cache, save_module_entries_to_persistent_cache
+from runtime_statistics import instrumented, record_cache_hit, record_cache_miss, register_cache_size_function
+from stub_module_cache import get_stub_names, mark_name_converted_by_look_up_name, mark_name_converted_to_definition
+from tracing import TRACE_LEVEL_DEBUG, is_trace_level_enabled, trace
+from type_database import open_type_database_or_none, write_type_database
 from type_annotation import *
 
 
-CLASS_INHERITANCE_GRAPH = nx.DiGraph()
-
 # Parse AST Node to Type Annotation
 # Returns an instance of ConcreteClass, TypeVariable, Subscription, list
 # new
 # a keyword-only parameter for resolving all instances of `Self` and `_typeshed.Self`
 def parse_node_to_type_annotation(module_name, node, indent_level=0, *, type_annotation_for_self=None):
-    indent = '    ' * indent_level
-
-    print(indent, f'parse_node_to_type_annotation {module_name} {ast.dump(node)}', file=sys.stderr)
+    # `ast.dump` is expensive, so it is only called when tracing
+    if is_trace_level_enabled(TRACE_LEVEL_DEBUG):
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'parse_node_to_type_annotation %s %s', module_name, ast.dump(node))
 
     # Name(id='object', ctx=Load())
     # Name(id='_KT', ctx=Load())
@@ -71,15 +80,14 @@ def parse_node_to_type_annotation(module_name, node, indent_level=0, *, type_ann
 
         # recursively parse node.slice.value
         assert isinstance(node.slice, ast.Index), ast.dump(node.slice)
-        parsed_node_slice_value = parse_node_to_type_annotation(module_name, node.slice.value, indent_level + 1, type_annotation_for_self=type_annotation_for_self)
 
         # store the results of parsing node.slice.value in type_annotation_list
-        type_annotation_list = list()
-
-        if isinstance(parsed_node_slice_value, Union):
-            type_annotation_list.extend(parsed_node_slice_value)
+        # changed
+        # the elements of a Tuple or List are parsed in order, as they are type arguments and not the elements of a Union
+        if isinstance(node.slice.value, (ast.Tuple, ast.List)):
+            type_annotation_list = parse_nodes_to_type_annotation_list(module_name, node.slice.value.elts, indent_level + 1, type_annotation_for_self=type_annotation_for_self)
         else:
-            type_annotation_list.append(parsed_node_slice_value)
+            type_annotation_list = parse_nodes_to_type_annotation_list(module_name, [node.slice.value], indent_level + 1, type_annotation_for_self=type_annotation_for_self)
 
         # new
         # special handling for typing.Literal, typing_extensions.Literal, and typing.ClassVar
@@ -102,43 +110,20 @@ def parse_node_to_type_annotation(module_name, node, indent_level=0, *, type_ann
     elif isinstance(node, ast.BinOp):
         assert isinstance(node.op, ast.BitOr)
 
-        list_instance = list()
-
         # recursively parse node.left
         parsed_node_left = parse_node_to_type_annotation(module_name, node.left, indent_level + 1, type_annotation_for_self=type_annotation_for_self)
         
-        # update list_instance
-        if isinstance(parsed_node_left, Union):
-            list_instance.extend(parsed_node_left)
-        else:
-            list_instance.append(parsed_node_left)
-        
         # recursively parse node.right
         parsed_node_right = parse_node_to_type_annotation(module_name, node.right, indent_level + 1, type_annotation_for_self=type_annotation_for_self)
 
-        # update list_instance
-        if isinstance(parsed_node_right, Union):
-            list_instance.extend(parsed_node_right)
-        else:
-            list_instance.append(parsed_node_right)
-
-        return Union(list_instance)
+        # changed
+        # `create_union_type_annotation` flattens, deduplicates and orders the elements
+        return create_union_type_annotation([parsed_node_left, parsed_node_right])
     # new
     # Tuple(elts=[Name(id='_KT', ctx=Load()), Name(id='_VT', ctx=Load())], ctx=Load())
     # List(elts=[Name(id='_T', ctx=Load())], ctx=Load())
     elif isinstance(node, (ast.Tuple, ast.List)):
-        list_instance = list()
-
-        for elt in node.elts:
-            parsed_elt = parse_node_to_type_annotation(module_name, elt, indent_level + 1, type_annotation_for_self=type_annotation_for_self)
-
-            # update list_instance
-            if isinstance(parsed_elt, Union):
-                list_instance.extend(parsed_elt)
-            else:
-                list_instance.append(parsed_elt)
-        
-        return Union(list_instance)
+        return create_union_type_annotation(parse_nodes_to_type_annotation_list(module_name, node.elts, indent_level + 1, type_annotation_for_self=type_annotation_for_self))
     # new
     # Create instance of ConcreteClass
     elif isinstance(node, ast.Constant):
@@ -175,21 +160,46 @@ def parse_node_to_type_annotation(module_name, node, indent_level=0, *, type_ann
         assert False, ast.dump(node)
 
 
+# new
+# Parses `node_list` in order into a list of type annotations
+# Nested Tuple's and List's (e.g. the parameters of `Callable[[int, str], bool]`) are flattened in order, and Union's are replaced by their elements (as before)
+# The elements of a Union written with `|` are spliced in source order, as only `create_union_type_annotation` orders them canonically
+# (a Union looked up through an alias is spliced in canonical order)
+def parse_nodes_to_type_annotation_list(module_name, node_list, indent_level=0, *, type_annotation_for_self=None) -> list:
+    type_annotation_list = list()
+
+    for node in node_list:
+        if isinstance(node, (ast.Tuple, ast.List)):
+            type_annotation_list.extend(parse_nodes_to_type_annotation_list(module_name, node.elts, indent_level, type_annotation_for_self=type_annotation_for_self))
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+            type_annotation_list.extend(parse_nodes_to_type_annotation_list(module_name, [node.left, node.right], indent_level, type_annotation_for_self=type_annotation_for_self))
+        else:
+            parsed_node = parse_node_to_type_annotation(module_name, node, indent_level, type_annotation_for_self=type_annotation_for_self)
+
+            if isinstance(parsed_node, Union):
+                type_annotation_list.extend(parsed_node.element_tuple)
+            else:
+                type_annotation_list.append(parsed_node)
+
+    return type_annotation_list
+
+
 # Parse Class
 def parse_class(concrete_class: ConcreteClass, class_def: ast.ClassDef, child_nodes: dict, indent_level=0) -> ClassDefinition:
-    global CLASS_INHERITANCE_GRAPH
-    
-    indent = '    ' * indent_level
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'parse_class %s %s', concrete_class, child_nodes.keys())
 
-    print(indent, f'parse_class {concrete_class} {child_nodes.keys()}', file=sys.stderr)
+    # Register the class in the class table, even if it has no bases
+    get_class_id(concrete_class)
 
     class_level_type_variable_ordered_set = OrderedSet()
 
-    method_name_to_method_list_dict = dict()
+    method_name_to_function_def_list_dict = dict()
+
+    staticmethod_name_to_function_def_list_dict = dict()
 
-    staticmethod_name_to_staticmethod_list_dict = dict()
+    property_name_to_annotation_node_dict = dict()
 
-    property_name_to_property_type_annotation_dict = dict()
+    base_class_method_resolution_order_list = list()
 
     for base in class_def.bases:
         # Parse AST node to type annotation
@@ -206,29 +216,26 @@ def parse_class(concrete_class: ConcreteClass, class_def: ast.ClassDef, child_no
         else:
             assert False, base_type_annotation
             
-        CLASS_INHERITANCE_GRAPH.add_node(concrete_class)
-        CLASS_INHERITANCE_GRAPH.add_edge(concrete_class, base_class)
+        add_base_classes(concrete_class, (base_class,))
         
         # Update class_level_type_variable_ordered_set
         for base_class_type_annotation in base_class_type_annotation_list:
             class_level_type_variable_ordered_set.update(iterate_type_variables_in_type_annotation(base_class_type_annotation, indent_level + 1))
         
         # Eagerly resolve base class
-        print(indent, f'looking up base class {base_class}', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'looking up base class %s', base_class)
         base_class_definition = look_up_class(base_class, indent_level + 1)
 
-        print(indent, f'instantiating type variables in base class {base_class} with {base_class_type_annotation_list}', file=sys.stderr)
-        base_class_definition_with_instantiated_type_variables = instantiate_type_variables_in_class_definition(base_class_definition, base_class_type_annotation_list, indent_level + 1)
+        assert len(base_class_type_annotation_list) >= len(base_class_definition.type_variable_list)
 
-        print(indent, f'adding all methods to method_name_to_method_list_dict', file=sys.stderr)
-        method_name_to_method_list_dict.update(base_class_definition_with_instantiated_type_variables.method_name_to_method_list_dict)
-
-        print(indent, f'adding all staticmethods to staticmethod_name_to_staticmethod_list_dict', file=sys.stderr)
-        staticmethod_name_to_staticmethod_list_dict.update(base_class_definition_with_instantiated_type_variables.staticmethod_name_to_staticmethod_list_dict)
-
-        print(indent, f'adding all properties to property_name_to_property_type_annotation_dict', file=sys.stderr)
-        property_name_to_property_type_annotation_dict.update(base_class_definition_with_instantiated_type_variables.property_name_to_property_type_annotation_dict)
+        # new
+        # The MRO of the base class, in terms of the type variables of this class
+        base_class_method_resolution_order_list.append(instantiate_method_resolution_order(base_class, base_class_definition, base_class_type_annotation_list, indent_level + 1))
 
+    # new
+    # Like at runtime, `object` is the implicit base of classes without explicit bases (in the class table only, its members are not inherited)
+    if not class_def.bases and concrete_class != OBJECT_CONCRETE_CLASS:
+        add_base_classes(concrete_class, (OBJECT_CONCRETE_CLASS,))
 
     class_level_type_variable_list = list(class_level_type_variable_ordered_set)
     
@@ -236,14 +243,10 @@ def parse_class(concrete_class: ConcreteClass, class_def: ast.ClassDef, child_no
         type_of_self_or_cls = Subscription(concrete_class, tuple(class_level_type_variable_list))
     else:
         type_of_self_or_cls = concrete_class
-    
-    # Replacing the type of the first parameter of all methods in method_name_to_method_list_dict to type_of_self_or_cls
-    for method_name, method_list in method_name_to_method_list_dict.items():
-        for method in method_list:
-            parameter_type_annotation_list = method.parameter_type_annotation_list
-            parameter_type_annotation_list[0] = type_of_self_or_cls
 
-    # Add methods and properties
+    # new
+    # Own members are parsed when they are first read, so a lookup only pays for the members it touches
+    # Only the kind of each child node (method, staticmethod or property) is determined here
     for child_node_name, child_node in child_nodes.items():
         # "FunctionDef(name='__iter__', args=arguments(posonlyargs=[], args=[arg(arg='self', annotation=None, type_comment=None)], vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]), body=[Expr(value=Constant(value=Ellipsis, kind=None))], decorator_list=[Name(id='abstractmethod', ctx=Load())], returns=Subscript(value=Name(id='Iterator', ctx=Load()), slice=Index(value=Name(id='_T_co', ctx=Load())), ctx=Load()), type_comment=None)"
         child_node_ast = child_node.ast
@@ -251,43 +254,109 @@ def parse_class(concrete_class: ConcreteClass, class_def: ast.ClassDef, child_no
         if isinstance(child_node_ast, ast.FunctionDef):
             # Is Method (including `classmethod`'s, not including `staticmethod`'s)
             if is_method(child_node_ast):
-                method_name_to_method_list_dict[child_node_name] = [
-                    parse_method(concrete_class, child_node_ast, type_of_self_or_cls, class_level_type_variable_ordered_set, indent_level + 1) 
-                ]
+                method_name_to_function_def_list_dict[child_node_name] = [child_node_ast]
             else:
-                staticmethod_name_to_staticmethod_list_dict[child_node_name] = [
-                    parse_global_function_or_staticmethod(concrete_class, child_node_ast, indent_level + 1)
-                ]
+                staticmethod_name_to_function_def_list_dict[child_node_name] = [child_node_ast]
         elif isinstance(child_node_ast, typeshed_client.parser.OverloadedName):
             # Is Method (including `classmethod`'s, not including `staticmethod`'s)
             if all((is_method(definition) for definition in child_node_ast.definitions)):
-                method_name_to_method_list_dict[child_node_name] = [ 
-                    parse_method(concrete_class, definition, type_of_self_or_cls, class_level_type_variable_ordered_set, indent_level + 1)
-                    for definition in child_node_ast.definitions
-                ]
+                method_name_to_function_def_list_dict[child_node_name] = child_node_ast.definitions
             else:
                 assert all((not is_method(definition) for definition in child_node_ast.definitions))
-                staticmethod_name_to_staticmethod_list_dict[child_node_name] = [ 
-                    parse_global_function_or_staticmethod(concrete_class, definition, indent_level + 1)
-                    for definition in child_node_ast.definitions
-                ]
+                staticmethod_name_to_function_def_list_dict[child_node_name] = child_node_ast.definitions
         elif isinstance(child_node_ast, ast.AnnAssign):
-            property_name_to_property_type_annotation_dict[child_node_name] = parse_node_to_type_annotation(
-                concrete_class.module_name,
-                child_node_ast.annotation,
-                indent_level + 1
-            )
+            property_name_to_annotation_node_dict[child_node_name] = child_node_ast.annotation
         else:
             assert False, child_node_ast
+
+    # new
+    # Own members are parsed when they are first read, and shared by the class and its subclasses (through the MRO)
+    own_method_name_to_method_list_dict = LazyMemberMapping(dict(), [(
+        method_name_to_function_def_list_dict,
+        partial(parse_method_list, concrete_class=concrete_class, type_of_self_or_cls=type_of_self_or_cls, class_level_type_variable_set=class_level_type_variable_ordered_set, indent_level=indent_level + 1)
+    )])
+
+    own_staticmethod_name_to_staticmethod_list_dict = LazyMemberMapping(dict(), [(
+        staticmethod_name_to_function_def_list_dict,
+        partial(parse_staticmethod_list, concrete_class=concrete_class, indent_level=indent_level + 1)
+    )])
+
+    own_property_name_to_property_type_annotation_dict = LazyMemberMapping(dict(), [(
+        property_name_to_annotation_node_dict,
+        partial(parse_node_to_type_annotation, concrete_class.module_name, indent_level=indent_level + 1)
+    )])
+
+    # new
+    # The C3 linearization of the class and its base classes (as Python computes `__mro__`)
+    method_resolution_order = [
+        MethodResolutionOrderEntry(
+            concrete_class,
+            class_level_type_variable_list,
+            class_level_type_variable_list,
+            own_method_name_to_method_list_dict,
+            own_staticmethod_name_to_staticmethod_list_dict,
+            own_property_name_to_property_type_annotation_dict
+        )
+    ] + merge_method_resolution_orders(base_class_method_resolution_order_list, indent_level + 1)
+
+    # new
+    # Members of base classes are not copied into the subclass
+    # Instead, they are looked up through the own members of each class in the MRO, and their type variables are lazily instantiated (with the type of the first parameter of methods replaced with type_of_self_or_cls) only when they are read
+    # Own members take precedence over inherited members
+    method_layer_list = [ (own_method_name_to_method_list_dict, None) ]
+    staticmethod_layer_list = [ (own_staticmethod_name_to_staticmethod_list_dict, None) ]
+    property_layer_list = [ (own_property_name_to_property_type_annotation_dict, None) ]
+
+    for method_resolution_order_entry in method_resolution_order[1:]:
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'inheriting members of %s with %s', method_resolution_order_entry.concrete_class, method_resolution_order_entry.type_annotation_list)
+
+        old_type_variable_to_new_type_annotation_dict = {
+            old_type_variable: new_type_annotation
+            for old_type_variable, new_type_annotation in zip(method_resolution_order_entry.type_variable_list, method_resolution_order_entry.type_annotation_list)
+        }
+
+        method_layer_list.append((
+            method_resolution_order_entry.own_method_name_to_method_list_dict,
+            partial(instantiate_type_variables_in_inherited_method_list, old_type_variable_to_new_type_annotation_dict, type_of_self_or_cls)
+        ))
+
+        staticmethod_layer_list.append((
+            method_resolution_order_entry.own_staticmethod_name_to_staticmethod_list_dict,
+            None
+        ))
+
+        property_layer_list.append((
+            method_resolution_order_entry.own_property_name_to_property_type_annotation_dict,
+            partial(instantiate_type_variables_in_property_type_annotation, old_type_variable_to_new_type_annotation_dict)
+        ))
     
     return ClassDefinition(
         class_level_type_variable_list,
-        method_name_to_method_list_dict,
-        staticmethod_name_to_staticmethod_list_dict,
-        property_name_to_property_type_annotation_dict
+        LazyMemberMapping(dict(), method_layer_list),
+        LazyMemberMapping(dict(), staticmethod_layer_list),
+        LazyMemberMapping(dict(), property_layer_list),
+        method_resolution_order_or_none=method_resolution_order
     )
 
 
+# new
+# Parse the (possibly overloaded) definitions of a method when it is first read
+def parse_method_list(function_def_list, concrete_class, type_of_self_or_cls, class_level_type_variable_set, indent_level=0) -> list:
+    return [
+        parse_method(concrete_class, function_def, type_of_self_or_cls, class_level_type_variable_set, indent_level)
+        for function_def in function_def_list
+    ]
+
+
+# new
+# Parse the (possibly overloaded) definitions of a staticmethod when it is first read
+def parse_staticmethod_list(function_def_list, concrete_class, indent_level=0) -> list:
+    return [
+        parse_global_function_or_staticmethod(concrete_class, function_def, indent_level)
+        for function_def in function_def_list
+    ]
+
+
 # Is Method (including `classmethod`'s, not including `staticmethod`'s)
 def is_method(function_def):
     args = function_def.args
@@ -301,9 +370,7 @@ def is_method(function_def):
 # def __contains__(self, __o: object) -> bool: ...
 # "FunctionDef(name='__contains__', args=arguments(posonlyargs=[], args=[arg(arg='self', annotation=None, type_comment=None), arg(arg='__o', annotation=Name(id='object', ctx=Load()), type_comment=None)], vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]), body=[Expr(value=Constant(value=Ellipsis, kind=None))], decorator_list=[], returns=Name(id='bool', ctx=Load()), type_comment=None)"
 def parse_method(concrete_class, function_def, type_of_self_or_cls, class_level_type_variable_set, indent_level=0):
-    indent = '    ' * indent_level
-
-    print(indent, f'parse_method {concrete_class} {function_def.name}', file=sys.stderr)
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'parse_method %s %s', concrete_class, function_def.name)
 
     # copy the original class_level_type_variable_set
     class_level_type_variable_set_copy = class_level_type_variable_set.copy()
@@ -368,7 +435,11 @@ def parse_method(concrete_class, function_def, type_of_self_or_cls, class_level_
         vararg_type_annotation=vararg_type_annotation,
         kwonlyargs_name_to_type_annotation_dict=kwonlyargs_name_to_type_annotation_dict,
         kwarg_type_annotation=kwarg_type_annotation,
-        return_value_type_annotation=return_value_type_annotation
+        return_value_type_annotation=return_value_type_annotation,
+        parameter_name_list=[ arg.arg for arg in args_args ],
+        number_of_defaulted_parameters=len(args.defaults),
+        has_vararg=args_vararg is not None,
+        has_kwarg=args_kwarg is not None
     )
 
 
@@ -378,9 +449,7 @@ def parse_method(concrete_class, function_def, type_of_self_or_cls, class_level_
 # def breakpoint(*args: Any, **kws: Any) -> None: ...
 # "FunctionDef(name='breakpoint', args=arguments(posonlyargs=[], args=[], vararg=arg(arg='args', annotation=Name(id='Any', ctx=Load()), type_comment=None), kwonlyargs=[], kw_defaults=[], kwarg=arg(arg='kws', annotation=Name(id='Any', ctx=Load()), type_comment=None), defaults=[]), body=[Expr(value=Constant(value=Ellipsis, kind=None))], decorator_list=[], returns=Constant(value=None, kind=None), type_comment=None)"
 def parse_global_function_or_staticmethod(global_function_or_concrete_class, function_def: ast.FunctionDef, indent_level=0) -> FunctionDefinition:
-    indent = '    ' * indent_level
-
-    print(indent, f'parse_global_function_or_staticmethod {global_function_or_concrete_class}', file=sys.stderr)
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'parse_global_function_or_staticmethod %s', global_function_or_concrete_class)
 
     global_function_level_type_variable_ordered_set = OrderedSet()
 
@@ -438,7 +507,11 @@ def parse_global_function_or_staticmethod(global_function_or_concrete_class, fun
         vararg_type_annotation=vararg_type_annotation,
         kwonlyargs_name_to_type_annotation_dict=kwonlyargs_name_to_type_annotation_dict,
         kwarg_type_annotation=kwarg_type_annotation,
-        return_value_type_annotation=return_value_type_annotation
+        return_value_type_annotation=return_value_type_annotation,
+        parameter_name_list=[ arg.arg for arg in args_args ],
+        number_of_defaulted_parameters=len(args.defaults),
+        has_vararg=args_vararg is not None,
+        has_kwarg=args_kwarg is not None
     )
 
 
@@ -459,120 +532,241 @@ module_name_name_tuple_to_kind_type_annotation_tuple_dict = {
     ('_typeshed', 'Self'): (ConcreteClass('_typeshed', 'Self'), Kind.CLASS_DEFINITION)
 }
 
+register_cache_size_function('look_up_name', lambda: len(module_name_name_tuple_to_kind_type_annotation_tuple_dict))
+
+@instrumented
 def look_up_name(module_name: str, name: str, indent_level=0):
     global module_name_name_tuple_to_kind_type_annotation_tuple_dict
     
-    indent = '    ' * indent_level
-
-    print(indent, f'look_up_name {module_name} {name} {look_up_name}', file=sys.stderr)
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'look_up_name %s %s %s', module_name, name, look_up_name)
     
     if (module_name, name) in module_name_name_tuple_to_kind_type_annotation_tuple_dict:
-        print(indent, 'cache hit', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache hit')
+        record_cache_hit('look_up_name')
         return module_name_name_tuple_to_kind_type_annotation_tuple_dict[(module_name, name)]
     else:
-        print(indent, 'cache miss', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache miss')
+        record_cache_miss('look_up_name')
+
+        if load_module_from_persistent_cache(module_name, indent_level + 1) and (module_name, name) in module_name_name_tuple_to_kind_type_annotation_tuple_dict:
+            return module_name_name_tuple_to_kind_type_annotation_tuple_dict[(module_name, name)]
+
+        # new
+        if type_database_or_none is not None:
+            type_annotation_kind_tuple_or_none = type_database_or_none.look_up_name_or_none(module_name, name, indent_level + 1)
+            if type_annotation_kind_tuple_or_none is not None:
+                return module_name_name_tuple_to_kind_type_annotation_tuple_dict.setdefault((module_name, name), type_annotation_kind_tuple_or_none)
+
+        # new
+        # On the first miss in a module, resolve all of its names in one pass
+        # Misses while building a table only resolve the missing name, so that building a table does not cascade into other modules
+        if not getattr(name_resolution_table_thread_local, 'is_building_name_resolution_table', False):
+            get_name_resolution_table(module_name, indent_level + 1)
+
+            if (module_name, name) in module_name_name_tuple_to_kind_type_annotation_tuple_dict:
+                return module_name_name_tuple_to_kind_type_annotation_tuple_dict[(module_name, name)]
 
         # Initialize to (TypeVariable(), Kind.TYPE_VARIABLE) to handle potential recursive lookups
-        type_variable_for_module_name_name_tuple = TypeVariable()
-        module_name_name_tuple_to_kind_type_annotation_tuple_dict[(module_name, name)] = (type_variable_for_module_name_name_tuple, Kind.TYPE_VARIABLE)
+        # The placeholder is only returned to recursive lookups, and is never visible to other threads
+        return coalesce_look_up(
+            module_name_name_tuple_to_kind_type_annotation_tuple_dict,
+            ('look_up_name', module_name, name),
+            partial(resolve_name, module_name, name, indent_level + 1),
+            (TypeVariable(), Kind.TYPE_VARIABLE),
+            (module_name, name)
+        )
+
+
+# Resolve `name` in `module_name` without caching (called by `look_up_name` on a cache miss)
+# new
+# Follows re-exports (`typeshed_client.parser.ImportedName`'s) and the fallback to `builtins` iteratively,
+# and caches the result for every name along the chain, so that each chain is only walked once
+def resolve_name(module_name: str, name: str, indent_level=0):
+    global module_name_name_tuple_to_kind_type_annotation_tuple_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'resolve_name %s %s', module_name, name)
+
+    module_name_name_tuple_list = [(module_name, name)]
+    return_value = None
+
+    while return_value is None:
+        current_module_name, current_name = module_name_name_tuple_list[-1]
+
+        module_stub_names_dict = get_stub_names(current_module_name, indent_level + 1)
+
+        if current_name in module_stub_names_dict:
+            name_info_ast = module_stub_names_dict[current_name].ast
 
-        module_stub_names_dict = typeshed_client.parser.get_stub_names(module_name)
-        
-        if name in module_stub_names_dict:
-            name_info = module_stub_names_dict[name]
-            name_info_ast = name_info.ast
-
-            # It is a concrete class
-            if isinstance(name_info_ast, ast.ClassDef):
-                return_value = (ConcreteClass(module_name, name), Kind.CLASS_DEFINITION)
-            # It is a global function
-            elif isinstance(name_info_ast, ast.FunctionDef):
-                return_value = (GlobalFunction(module_name, name), Kind.GLOBAL_FUNCTION_DEFINITION)
-            elif isinstance(name_info_ast, typeshed_client.parser.OverloadedName):
-                assert all((isinstance(definition, ast.FunctionDef) for definition in name_info_ast.definitions))
-                return_value = (GlobalFunction(module_name, name), Kind.GLOBAL_FUNCTION_DEFINITION)
             # It is an imported name
-            elif isinstance(name_info_ast, typeshed_client.parser.ImportedName):
-                new_module_name = '.'.join(name_info_ast.module_name)
-                new_name = name_info_ast.name
-
-                return_value = look_up_name(new_module_name, new_name, indent_level + 1)
-            # _T = TypeVar("_T")
-            # _T_co = TypeVar("_T_co", covariant=True)
-            # _OpenFile = StrOrBytesPath | int  # noqa: Y026  # TODO: Use TypeAlias once mypy bugs are fixed
-            # _LiteralInteger = _PositiveInteger | _NegativeInteger | Literal[0]
-            # EnvironmentError = OSError
-            # CLASS_DEFINITION, UNION, SUBSCRIBED_CLASS, TYPE_VARIABLE, OBJECT
-            elif isinstance(name_info_ast, ast.Assign):
-                name_info_ast_value = name_info_ast.value
-
-                # If the RHS is an `ast.Call` and the called function is 'TypeVar'
-                # We conclude that we have encountered a type variable
-                if isinstance(name_info_ast_value, ast.Call) and name_info_ast_value.func.id == 'TypeVar':
-                    return_value = (TypeVariable(), Kind.TYPE_VARIABLE)
-                # Otherwise, we call `parse_node_to_type_annotation` to handle that.
-                else:
-                    parsed_name_info_ast_value = parse_node_to_type_annotation(
-                        module_name,
-                        name_info_ast_value,
-                        indent_level + 1
-                    )
-
-                    if isinstance(parsed_name_info_ast_value, ConcreteClass):
-                        return_value = (parsed_name_info_ast_value, Kind.CLASS_DEFINITION)
-                    elif isinstance(parsed_name_info_ast_value, Union):
-                        return_value = (parsed_name_info_ast_value, Kind.UNION)
-                    elif isinstance(parsed_name_info_ast_value, Subscription):
-                        return_value = (parsed_name_info_ast_value, Kind.SUBSCRIBED_CLASS)
-                    else:
-                        assert False, parsed_name_info_ast_value
-            
-            # _PositiveInteger: TypeAlias = Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25]
-            # ReadOnlyBuffer: TypeAlias = bytes  # stable
-            # WriteableBuffer: TypeAlias = bytearray | memoryview | array.array[Any] | mmap.mmap | ctypes._CData
-            # _ClassInfo: TypeAlias = type | types.UnionType | tuple[_ClassInfo, ...]
-            # NotImplemented: _NotImplementedType
-            # Ellipsis: ellipsis
-            elif isinstance(name_info_ast, ast.AnnAssign):
-                name_info_ast_value = name_info_ast.value
-
-                # If the RHS is not None, we call `parse_node_to_type_annotation` to handle that.
-                if name_info_ast_value is not None:
-                    parsed_name_info_ast_value = parse_node_to_type_annotation(
-                        module_name,
-                        name_info_ast_value,
-                        indent_level + 1
-                    )
-
-                    if isinstance(parsed_name_info_ast_value, ConcreteClass):
-                        return_value = (parsed_name_info_ast_value, Kind.CLASS_DEFINITION)
-                    elif isinstance(parsed_name_info_ast_value, Union):
-                        return_value = (parsed_name_info_ast_value, Kind.UNION)
-                    elif isinstance(parsed_name_info_ast_value, Subscription):
-                        return_value = (parsed_name_info_ast_value, Kind.SUBSCRIBED_CLASS)
-                    else:
-                        assert False, parsed_name_info_ast_value
-                # If the RHS is None, we call `parse_node_to_type_annotation` on the annotation of the LHS.
-                else:
-                    name_info_ast_annotation = name_info_ast.annotation
-
-                    parsed_name_info_ast_annotation = parse_node_to_type_annotation(
-                        module_name,
-                        name_info_ast_annotation,
-                        indent_level + 1
-                    )
-
-                    return_value = (parsed_name_info_ast_annotation, Kind.OBJECT)
+            if isinstance(name_info_ast, typeshed_client.parser.ImportedName):
+                next_module_name_name_tuple = ('.'.join(name_info_ast.module_name), name_info_ast.name)
+            # `(module_name, name)` is defined here
+            elif len(module_name_name_tuple_list) == 1:
+                return_value = resolve_name_definition(current_module_name, current_name, name_info_ast, indent_level + 1)
+                break
+            # The chain ends here (looked up so that recursive references to the definition get the placeholder)
             else:
-                assert False, name_info_ast
+                return_value = look_up_name(current_module_name, current_name, indent_level + 1)
+                break
         # look up class_name in builtins as a backup plan
         else:
-            assert module_name != 'builtins'
+            assert current_module_name != 'builtins'
+
+            next_module_name_name_tuple = ('builtins', current_name)
+
+        is_cyclic = next_module_name_name_tuple in module_name_name_tuple_list
+        module_name_name_tuple_list.append(next_module_name_name_tuple)
+
+        # The rest of the chain has already been resolved, or the chain is cyclic (`look_up_name` returns the placeholder in that case)
+        if is_cyclic or next_module_name_name_tuple in module_name_name_tuple_to_kind_type_annotation_tuple_dict:
+            return_value = look_up_name(*next_module_name_name_tuple, indent_level + 1)
+
+    # The first name is cached by the calling `look_up_name`, and the last one by the `look_up_name` above
+    for module_name_name_tuple in module_name_name_tuple_list[1:-1]:
+        module_name_name_tuple_to_kind_type_annotation_tuple_dict.setdefault(module_name_name_tuple, return_value)
+        mark_name_converted_by_look_up_name(*module_name_name_tuple)
+
+    mark_name_converted_by_look_up_name(module_name, name)
+    return return_value
+
+
+# Resolve a name defined (not imported) in `module_name`
+def resolve_name_definition(module_name: str, name: str, name_info_ast, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'resolve_name_definition %s %s', module_name, name)
+
+    # It is a concrete class
+    if isinstance(name_info_ast, ast.ClassDef):
+        return_value = (ConcreteClass(module_name, name), Kind.CLASS_DEFINITION)
+    # It is a global function
+    elif isinstance(name_info_ast, ast.FunctionDef):
+        return_value = (GlobalFunction(module_name, name), Kind.GLOBAL_FUNCTION_DEFINITION)
+    elif isinstance(name_info_ast, typeshed_client.parser.OverloadedName):
+        assert all((isinstance(definition, ast.FunctionDef) for definition in name_info_ast.definitions))
+        return_value = (GlobalFunction(module_name, name), Kind.GLOBAL_FUNCTION_DEFINITION)
+    # _T = TypeVar("_T")
+    # _T_co = TypeVar("_T_co", covariant=True)
+    # _OpenFile = StrOrBytesPath | int  # noqa: Y026  # TODO: Use TypeAlias once mypy bugs are fixed
+    # _LiteralInteger = _PositiveInteger | _NegativeInteger | Literal[0]
+    # EnvironmentError = OSError
+    # CLASS_DEFINITION, UNION, SUBSCRIBED_CLASS, TYPE_VARIABLE, OBJECT
+    elif isinstance(name_info_ast, ast.Assign):
+        name_info_ast_value = name_info_ast.value
+
+        # If the RHS is an `ast.Call` and the called function is 'TypeVar'
+        # We conclude that we have encountered a type variable
+        if isinstance(name_info_ast_value, ast.Call) and name_info_ast_value.func.id == 'TypeVar':
+            return_value = (TypeVariable(), Kind.TYPE_VARIABLE)
+        # Otherwise, we call `parse_node_to_type_annotation` to handle that.
+        else:
+            parsed_name_info_ast_value = parse_node_to_type_annotation(
+                module_name,
+                name_info_ast_value,
+                indent_level + 1
+            )
+
+            if isinstance(parsed_name_info_ast_value, ConcreteClass):
+                return_value = (parsed_name_info_ast_value, Kind.CLASS_DEFINITION)
+            elif isinstance(parsed_name_info_ast_value, Union):
+                return_value = (parsed_name_info_ast_value, Kind.UNION)
+            elif isinstance(parsed_name_info_ast_value, Subscription):
+                return_value = (parsed_name_info_ast_value, Kind.SUBSCRIBED_CLASS)
+            else:
+                assert False, parsed_name_info_ast_value
+
+    # _PositiveInteger: TypeAlias = Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25]
+    # ReadOnlyBuffer: TypeAlias = bytes  # stable
+    # WriteableBuffer: TypeAlias = bytearray | memoryview | array.array[Any] | mmap.mmap | ctypes._CData
+    # _ClassInfo: TypeAlias = type | types.UnionType | tuple[_ClassInfo, ...]
+    # NotImplemented: _NotImplementedType
+    # Ellipsis: ellipsis
+    elif isinstance(name_info_ast, ast.AnnAssign):
+        name_info_ast_value = name_info_ast.value
+
+        # If the RHS is not None, we call `parse_node_to_type_annotation` to handle that.
+        if name_info_ast_value is not None:
+            parsed_name_info_ast_value = parse_node_to_type_annotation(
+                module_name,
+                name_info_ast_value,
+                indent_level + 1
+            )
+
+            if isinstance(parsed_name_info_ast_value, ConcreteClass):
+                return_value = (parsed_name_info_ast_value, Kind.CLASS_DEFINITION)
+            elif isinstance(parsed_name_info_ast_value, Union):
+                return_value = (parsed_name_info_ast_value, Kind.UNION)
+            elif isinstance(parsed_name_info_ast_value, Subscription):
+                return_value = (parsed_name_info_ast_value, Kind.SUBSCRIBED_CLASS)
+            else:
+                assert False, parsed_name_info_ast_value
+        # If the RHS is None, we call `parse_node_to_type_annotation` on the annotation of the LHS.
+        else:
+            name_info_ast_annotation = name_info_ast.annotation
 
-            return_value =  look_up_name('builtins', name, indent_level + 1)
+            parsed_name_info_ast_annotation = parse_node_to_type_annotation(
+                module_name,
+                name_info_ast_annotation,
+                indent_level + 1
+            )
+
+            return_value = (parsed_name_info_ast_annotation, Kind.OBJECT)
+    else:
+        assert False, name_info_ast
+
+    return return_value
+
+
+# Name Resolution Table
+
+# Cache
+# Maps each module to a flat table mapping each name visible in it to its final (type annotation, Kind) target
+# Every entry of a table is also in the cache of `look_up_name`
+module_name_to_name_resolution_table_dict = dict()
+
+register_cache_size_function('get_name_resolution_table', lambda: len(module_name_to_name_resolution_table_dict))
+
+name_resolution_table_thread_local = threading.local()
+
+def get_name_resolution_table(module_name: str, indent_level=0) -> dict:
+    global module_name_to_name_resolution_table_dict
 
-        module_name_name_tuple_to_kind_type_annotation_tuple_dict[(module_name, name)] = return_value
-        return return_value
+    if module_name in module_name_to_name_resolution_table_dict:
+        return module_name_to_name_resolution_table_dict[module_name]
+    else:
+        # A table being built on another thread that waits on this thread is returned empty
+        return coalesce_look_up(
+            module_name_to_name_resolution_table_dict,
+            ('get_name_resolution_table', module_name),
+            partial(build_name_resolution_table, module_name, indent_level + 1),
+            dict(),
+            module_name
+        )
+
+
+def build_name_resolution_table(module_name: str, indent_level=0) -> dict:
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'build_name_resolution_table %s', module_name)
+
+    name_resolution_table = dict()
+
+    module_stub_names_dict = get_stub_names(module_name, indent_level + 1)
+
+    if module_stub_names_dict is None:
+        return name_resolution_table
+
+    was_building_name_resolution_table = getattr(name_resolution_table_thread_local, 'is_building_name_resolution_table', False)
+    name_resolution_table_thread_local.is_building_name_resolution_table = True
+
+    try:
+        for name in list(module_stub_names_dict):
+            try:
+                name_resolution_table[name] = look_up_name(module_name, name, indent_level + 1)
+            # The parser asserts on stub constructs it does not support
+            # Such names are left out of the table, and are looked up (and fail) on demand as before
+            except Exception as e:
+                trace(TRACE_LEVEL_DEBUG, indent_level, '%s.%s skipped: %s %s', module_name, name, type(e).__name__, e)
+    finally:
+        name_resolution_table_thread_local.is_building_name_resolution_table = was_building_name_resolution_table
+
+    return name_resolution_table
 
 
 # Look Up Class
@@ -598,34 +792,143 @@ concrete_class_to_class_definition_dict = {
    ),
 }
 
+register_cache_size_function('look_up_class', lambda: len(concrete_class_to_class_definition_dict))
+
+@instrumented
 def look_up_class(concrete_class: ConcreteClass, indent_level=0) -> ClassDefinition:
     global concrete_class_to_class_definition_dict
     
-    indent = '    ' * indent_level
-
-    print(indent, f'look_up_class {concrete_class}', file=sys.stderr)
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'look_up_class %s', concrete_class)
     
     if concrete_class in concrete_class_to_class_definition_dict:
-        print(indent, 'cache hit', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache hit')
+        record_cache_hit('look_up_class')
         return concrete_class_to_class_definition_dict[concrete_class]
     else:
-        print(indent, 'cache miss', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache miss')
+        record_cache_miss('look_up_class')
 
-        module_stub_names_dict = typeshed_client.parser.get_stub_names(concrete_class.module_name)
-        name_info = module_stub_names_dict[concrete_class.class_name]
-        
-        if isinstance(name_info.ast, ast.ClassDef):
-            return_value = parse_class(concrete_class, name_info.ast, name_info.child_nodes, indent_level + 1)
-        else:
-            return_value = ClassDefinition(
-                type_variable_list=list(),
-                method_name_to_method_list_dict=dict(),
-                staticmethod_name_to_staticmethod_list_dict=dict(),
-                property_name_to_property_type_annotation_dict=dict()
-            )
+        if load_module_from_persistent_cache(concrete_class.module_name, indent_level + 1) and concrete_class in concrete_class_to_class_definition_dict:
+            return concrete_class_to_class_definition_dict[concrete_class]
+
+        # new
+        if type_database_or_none is not None:
+            class_definition_base_class_list_tuple_or_none = type_database_or_none.look_up_class_or_none(concrete_class, indent_level + 1)
+            if class_definition_base_class_list_tuple_or_none is not None:
+                class_definition, base_class_list = class_definition_base_class_list_tuple_or_none
+                add_base_classes(concrete_class, base_class_list)
+                get_class_id(concrete_class)
+                return concrete_class_to_class_definition_dict.setdefault(concrete_class, class_definition)
+
+        return coalesce_look_up(
+            concrete_class_to_class_definition_dict,
+            ('look_up_class', concrete_class),
+            partial(resolve_class, concrete_class, indent_level + 1),
+            cache_dict_key=concrete_class
+        )
+
+
+# Parse the `ClassDefinition` of `concrete_class` without caching (called by `look_up_class` on a cache miss)
+def resolve_class(concrete_class: ConcreteClass, indent_level=0) -> ClassDefinition:
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'resolve_class %s', concrete_class)
+
+    module_stub_names_dict = get_stub_names(concrete_class.module_name, indent_level + 1)
+    name_info = module_stub_names_dict[concrete_class.class_name]
+    
+    if isinstance(name_info.ast, ast.ClassDef):
+        return_value = parse_class(concrete_class, name_info.ast, name_info.child_nodes, indent_level + 1)
+    else:
+        return_value = ClassDefinition(
+            type_variable_list=list(),
+            method_name_to_method_list_dict=dict(),
+            staticmethod_name_to_staticmethod_list_dict=dict(),
+            property_name_to_property_type_annotation_dict=dict()
+        )
+
+        # new
+        # Special forms (e.g. `typing.Protocol`, `typing.Generic`) have no bases either
+        add_base_classes(concrete_class, (OBJECT_CONCRETE_CLASS,))
+
+    mark_name_converted_to_definition(concrete_class.module_name, concrete_class.class_name)
+    return return_value
+
+
+# new
+# Nominal Classes
+
+# Cache
+concrete_class_to_is_nominal_class_dict = dict()
+
+register_cache_size_function('is_nominal_class', lambda: len(concrete_class_to_is_nominal_class_dict))
+
+# Whether `concrete_class` is defined by a `class` statement in its stub that does not directly derive from `Protocol`,
+# so that its stub bases determine all of its subclasses
+# Protocols, special forms (e.g. `typing.Callable`) and classes without a stub are compared structurally instead
+def is_nominal_class(concrete_class: ConcreteClass, indent_level=0) -> bool:
+    global concrete_class_to_is_nominal_class_dict
+
+    if concrete_class not in concrete_class_to_is_nominal_class_dict:
+        module_stub_names_dict = get_stub_names(concrete_class.module_name, indent_level + 1)
+        name_info_or_none = module_stub_names_dict.get(concrete_class.class_name, None) if module_stub_names_dict is not None else None
+
+        concrete_class_to_is_nominal_class_dict[concrete_class] = (
+            name_info_or_none is not None
+            and isinstance(name_info_or_none.ast, ast.ClassDef)
+            and not any(is_protocol_base_node(base) for base in name_info_or_none.ast.bases)
+        )
+
+    return concrete_class_to_is_nominal_class_dict[concrete_class]
+
+
+# `Protocol`, `Protocol[...]`, `typing.Protocol`, etc.
+# Decided syntactically, as `Protocol` is a special form which does not always resolve to a class (e.g. in `typing_extensions`)
+def is_protocol_base_node(node) -> bool:
+    if isinstance(node, ast.Subscript):
+        node = node.value
+
+    if isinstance(node, ast.Name):
+        return node.id == 'Protocol'
+    elif isinstance(node, ast.Attribute):
+        return node.attr == 'Protocol'
+    else:
+        return False
+
+
+# new
+# Look Up Instantiated Class
+
+# Cache
+# Maps (ConcreteClass, type argument tuple) to (ClassDefinition, instantiated ClassDefinition), in LRU order
+# Type variables are hashed by identity, and the class-level type variables of a class are those of its cached ClassDefinition,
+# so a key only matches instantiations with the very same type arguments
+# The ClassDefinition is kept to detect entries instantiated from a ClassDefinition that has since been replaced in the cache of `look_up_class`
+INSTANTIATED_CLASS_MEMO_TABLE = MemoTable('look_up_instantiated_class', int(os.environ.get('TYPE_INFERENCE_FOR_PYTHON_INSTANTIATED_CLASS_MEMO_TABLE_MAXIMUM_SIZE', 65536)))
+
+register_cache_size_function('look_up_instantiated_class', lambda: len(INSTANTIATED_CLASS_MEMO_TABLE))
+
+# The ClassDefinition of `concrete_class` with its type variables instantiated with `type_annotation_list`
+# Instantiated ClassDefinition's are shared, and must not be mutated
+def look_up_instantiated_class(concrete_class: ConcreteClass, type_annotation_list, indent_level=0) -> ClassDefinition:
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'look_up_instantiated_class %s %s', concrete_class, type_annotation_list)
+
+    class_definition = look_up_class(concrete_class, indent_level + 1)
+
+    key = (concrete_class, tuple(type_annotation_list))
+
+    class_definition_instantiated_class_definition_tuple_or_none = INSTANTIATED_CLASS_MEMO_TABLE.get(key)
+
+    if class_definition_instantiated_class_definition_tuple_or_none is not None and class_definition_instantiated_class_definition_tuple_or_none[0] is class_definition:
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache hit')
+        record_cache_hit('look_up_instantiated_class')
+        return class_definition_instantiated_class_definition_tuple_or_none[1]
+    else:
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache miss')
+        record_cache_miss('look_up_instantiated_class')
+
+        instantiated_class_definition = instantiate_type_variables_in_class_definition(class_definition, type_annotation_list, indent_level + 1)
+        INSTANTIATED_CLASS_MEMO_TABLE.put(key, (class_definition, instantiated_class_definition))
 
-        concrete_class_to_class_definition_dict[concrete_class] = return_value
-        return return_value
+        return instantiated_class_definition
 
 
 # Look Up Global Function
@@ -633,29 +936,224 @@ def look_up_class(concrete_class: ConcreteClass, indent_level=0) -> ClassDefinit
 # Cache
 global_function_to_function_definition_dict = dict()
 
+register_cache_size_function('look_up_global_function', lambda: len(global_function_to_function_definition_dict))
+
+@instrumented
 def look_up_global_function(global_function: GlobalFunction, indent_level=0) -> FunctionDefinition:
     global global_function_to_function_definition_dict
     
-    indent = '    ' * indent_level
-
-    print(indent, f'look_up_global_function {global_function}', file=sys.stderr)
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'look_up_global_function %s', global_function)
     
     if global_function in global_function_to_function_definition_dict:
-        print(indent, 'cache hit', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache hit')
+        record_cache_hit('look_up_global_function')
         return global_function_to_function_definition_dict[global_function]
     else:
-        print(indent, 'cache miss', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'cache miss')
+        record_cache_miss('look_up_global_function')
+
+        if load_module_from_persistent_cache(global_function.module_name, indent_level + 1) and global_function in global_function_to_function_definition_dict:
+            return global_function_to_function_definition_dict[global_function]
+
+        # new
+        if type_database_or_none is not None:
+            function_definition_list_or_none = type_database_or_none.look_up_global_function_or_none(global_function, indent_level + 1)
+            if function_definition_list_or_none is not None:
+                return global_function_to_function_definition_dict.setdefault(global_function, function_definition_list_or_none)
+
+        return coalesce_look_up(
+            global_function_to_function_definition_dict,
+            ('look_up_global_function', global_function),
+            partial(resolve_global_function, global_function, indent_level + 1),
+            cache_dict_key=global_function
+        )
+
+
+# Parse the `FunctionDefinition`'s of `global_function` without caching (called by `look_up_global_function` on a cache miss)
+def resolve_global_function(global_function: GlobalFunction, indent_level=0) -> list:
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'resolve_global_function %s', global_function)
+
+    module_stub_names_dict = get_stub_names(global_function.module_name, indent_level + 1)
+    name_info = module_stub_names_dict[global_function.function_name]
+    
+    if isinstance(name_info.ast, ast.FunctionDef):
+        return_value = [ parse_global_function_or_staticmethod(global_function, name_info.ast, indent_level + 1) ]
+    elif isinstance(name_info.ast, typeshed_client.parser.OverloadedName):
+        return_value = [
+            parse_global_function_or_staticmethod(global_function, definition, indent_level + 1)
+            for definition in name_info.ast.definitions
+        ]
+
+    mark_name_converted_to_definition(global_function.module_name, global_function.function_name)
+    return return_value
+
+
+# Persistent Cache
+
+# Maps each module whose entries have already been looked up in the persistent cache to whether they were found (and installed)
+module_name_to_loaded_from_persistent_cache_dict = dict()
+
+# Returns whether entries were loaded (by this or an earlier call)
+# Concurrent calls for the same module wait until the entries are installed
+def load_module_from_persistent_cache(module_name: str, indent_level=0) -> bool:
+    global module_name_to_loaded_from_persistent_cache_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'load_module_from_persistent_cache %s', module_name)
+
+    if module_name in module_name_to_loaded_from_persistent_cache_dict:
+        return module_name_to_loaded_from_persistent_cache_dict[module_name]
+    else:
+        return coalesce_look_up(
+            module_name_to_loaded_from_persistent_cache_dict,
+            ('load_module_from_persistent_cache', module_name),
+            partial(install_module_entries_from_persistent_cache, module_name, indent_level + 1),
+            False,
+            module_name
+        )
+
+
+def install_module_entries_from_persistent_cache(module_name: str, indent_level=0) -> bool:
+    module_entries = load_module_entries_from_persistent_cache(module_name, indent_level + 1)
+
+    if module_entries is None:
+        return False
+    else:
+        install_module_entries(module_entries, indent_level + 1)
+        return True
+
+
+# new
+# Parse all lazily parsed members of `class_definition`
+# Returns whether all of them could be parsed (classes with members that cannot be parsed are not persisted)
+def materialize_class_definition(class_definition: ClassDefinition, indent_level=0) -> bool:
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'materialize_class_definition %s', class_definition)
+
+    try:
+        for member_mapping in (
+            class_definition.method_name_to_method_list_dict,
+            class_definition.staticmethod_name_to_staticmethod_list_dict,
+            class_definition.property_name_to_property_type_annotation_dict
+        ):
+            for member_name in member_mapping:
+                member_mapping[member_name]
+    # The parser asserts on stub constructs it does not support
+    except Exception as e:
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'members cannot be parsed: %s %s', type(e).__name__, e)
+        return False
+
+    return True
+
+
+# Collect all cached entries belonging to `module_name`
+def collect_module_entries(module_name: str, indent_level=0) -> dict:
+    global module_name_name_tuple_to_kind_type_annotation_tuple_dict, concrete_class_to_class_definition_dict, global_function_to_function_definition_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'collect_module_entries %s', module_name)
+
+    return {
+        'module_name_name_tuple_to_kind_type_annotation_tuple_dict': {
+            (module_name_, name): kind_type_annotation_tuple
+            for (module_name_, name), kind_type_annotation_tuple in module_name_name_tuple_to_kind_type_annotation_tuple_dict.items()
+            if module_name_ == module_name
+        },
+        'concrete_class_to_class_definition_dict': {
+            concrete_class: class_definition
+            for concrete_class, class_definition in list(concrete_class_to_class_definition_dict.items())
+            if concrete_class.module_name == module_name and materialize_class_definition(class_definition, indent_level + 1)
+        },
+        'global_function_to_function_definition_dict': {
+            global_function: function_definition_list
+            for global_function, function_definition_list in global_function_to_function_definition_dict.items()
+            if global_function.module_name == module_name
+        },
+        'class_inheritance_edge_list': [
+            (concrete_class, base_class)
+            for concrete_class, base_class in iterate_class_inheritance_edges()
+            if concrete_class.module_name == module_name
+        ]
+    }
+
+
+# Install entries collected by `collect_module_entries`
+# Entries already present in memory take precedence
+def install_module_entries(module_entries: dict, indent_level=0):
+    global module_name_name_tuple_to_kind_type_annotation_tuple_dict, concrete_class_to_class_definition_dict, global_function_to_function_definition_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'install_module_entries')
+
+    for key, value in module_entries['module_name_name_tuple_to_kind_type_annotation_tuple_dict'].items():
+        module_name_name_tuple_to_kind_type_annotation_tuple_dict.setdefault(key, value)
+
+    for key, value in module_entries['concrete_class_to_class_definition_dict'].items():
+        concrete_class_to_class_definition_dict.setdefault(key, value)
+
+    for key, value in module_entries['global_function_to_function_definition_dict'].items():
+        global_function_to_function_definition_dict.setdefault(key, value)
+
+    for concrete_class, base_class in module_entries['class_inheritance_edge_list']:
+        add_base_classes(concrete_class, (base_class,))
+
+    # Register classes without bases (e.g. `object`) as well
+    for concrete_class in module_entries['concrete_class_to_class_definition_dict']:
+        get_class_id(concrete_class)
+
+
+# Write the entries of all modules currently in memory to the persistent cache
+def save_persistent_cache(indent_level=0):
+    global module_name_name_tuple_to_kind_type_annotation_tuple_dict, concrete_class_to_class_definition_dict, global_function_to_function_definition_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'save_persistent_cache')
+
+    module_name_set = set()
+    module_name_set.update(module_name for (module_name, name) in module_name_name_tuple_to_kind_type_annotation_tuple_dict)
+    module_name_set.update(concrete_class.module_name for concrete_class in concrete_class_to_class_definition_dict)
+    module_name_set.update(global_function.module_name for global_function in global_function_to_function_definition_dict)
+
+    for module_name in sorted(module_name_set):
+        # Merge with the entries already on disk so that saving never loses previously cached entries
+        load_module_from_persistent_cache(module_name, indent_level + 1)
+
+        save_module_entries_to_persistent_cache(module_name, collect_module_entries(module_name, indent_level + 1), indent_level + 1)
+
+
+# Shared Type Database
+
+# Opened (read-only, memory-mapped) type database consulted on cache misses, None if there is none
+type_database_or_none = None
+
+
+# Consult the type database at `file_path` on cache misses (e.g. in each worker process of a fleet sharing one database file)
+# Returns whether the database is compatible with the running Python version and was opened
+def open_type_database(file_path: str, indent_level=0) -> bool:
+    global type_database_or_none
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'open_type_database %s', file_path)
+
+    # A previously opened database is not closed, as members of classes decoded from it are only read from its mapping when first accessed
+    type_database_or_none = open_type_database_or_none(file_path, indent_level + 1)
+
+    return type_database_or_none is not None
+
+
+# Write the entries of all modules currently in memory to a type database at `file_path`
+def save_type_database(file_path: str, indent_level=0):
+    global module_name_name_tuple_to_kind_type_annotation_tuple_dict, concrete_class_to_class_definition_dict, global_function_to_function_definition_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'save_type_database %s', file_path)
+
+    write_type_database(
+        file_path,
+        dict(module_name_name_tuple_to_kind_type_annotation_tuple_dict),
+        {
+            concrete_class: class_definition
+            for concrete_class, class_definition in list(concrete_class_to_class_definition_dict.items())
+            if materialize_class_definition(class_definition, indent_level + 1)
+        },
+        dict(global_function_to_function_definition_dict),
+        lambda concrete_class: list(iterate_base_classes(concrete_class)),
+        indent_level + 1
+    )
 
-        module_stub_names_dict = typeshed_client.parser.get_stub_names(global_function.module_name)
-        name_info = module_stub_names_dict[global_function.function_name]
-        
-        if isinstance(name_info.ast, ast.FunctionDef):
-            return_value = [ parse_global_function_or_staticmethod(global_function, name_info.ast, indent_level + 1) ]
-        elif isinstance(name_info.ast, typeshed_client.parser.OverloadedName):
-            return_value = [
-                parse_global_function_or_staticmethod(global_function, definition, indent_level + 1)
-                for definition in name_info.ast.definitions
-            ]
 
-        global_function_to_function_definition_dict[global_function] = return_value
-        return return_value
+if os.environ.get('TYPE_INFERENCE_FOR_PYTHON_TYPE_DATABASE', None):
+    open_type_database(os.environ['TYPE_INFERENCE_FOR_PYTHON_TYPE_DATABASE'])
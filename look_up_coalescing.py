@@ -0,0 +1,123 @@
+"""
+Coalescing of concurrent cache misses for the lookup caches in `look_up.py`.
+
+The first thread missing a cache key computes the value; other threads missing the same key wait on the same future.
+A lookup of a key that is in flight on the same thread (a recursive lookup), or whose wait would close a cycle of threads waiting on each other,
+does not wait: it gets the placeholder of the in-flight lookup if it has one, and otherwise computes the value itself without caching it.
+Placeholders are never stored in the caches, so other threads never mistake them for the real answer.
+
+```python
+In [1]: from concurrent.futures import ThreadPoolExecutor
+
+In [2]: from look_up import *
+
+In [3]: with ThreadPoolExecutor(8) as executor:
+   ...:     class_definition_list = list(executor.map(look_up_class, [ConcreteClass('builtins', 'int')] * 8))
+
+In [4]: all(class_definition is class_definition_list[0] for class_definition in class_definition_list) # parsed once
+Out[4]: True
+```
+"""
+
+from concurrent.futures import Future
+import threading
+
+from attrs import define
+
+
+@define
+class InFlightLookUp:
+    owner_thread_id: int
+    future: Future
+    # Returned to recursive lookups, None if there is none
+    placeholder_or_none: object
+
+
+look_up_coalescing_lock = threading.Lock()
+
+cache_key_to_in_flight_look_up_dict = dict()
+
+# The cache key each waiting thread waits on
+thread_id_to_awaited_cache_key_dict = dict()
+
+
+# Whether `thread_id` waiting on a lookup owned by `owner_thread_id` would wait (transitively) on itself
+# Called with `look_up_coalescing_lock` held
+def closes_wait_cycle(thread_id: int, owner_thread_id: int) -> bool:
+    visited_thread_id_set = set()
+
+    while owner_thread_id not in visited_thread_id_set:
+        if owner_thread_id == thread_id:
+            return True
+
+        visited_thread_id_set.add(owner_thread_id)
+
+        awaited_cache_key_or_none = thread_id_to_awaited_cache_key_dict.get(owner_thread_id, None)
+        if awaited_cache_key_or_none is None:
+            return False
+
+        in_flight_look_up_or_none = cache_key_to_in_flight_look_up_dict.get(awaited_cache_key_or_none, None)
+        if in_flight_look_up_or_none is None:
+            return False
+
+        owner_thread_id = in_flight_look_up_or_none.owner_thread_id
+
+    return False
+
+
+# Returns `cache_dict[cache_key]`, calling `compute_value()` and caching its result on a miss
+# `cache_key` has to be unique across all caches (e.g. prefixed by the name of the lookup)
+# `cache_dict_key` is the key in `cache_dict` (`cache_key` if None)
+def coalesce_look_up(cache_dict: dict, cache_key, compute_value, placeholder_or_none=None, cache_dict_key=None):
+    global cache_key_to_in_flight_look_up_dict, thread_id_to_awaited_cache_key_dict
+
+    if cache_dict_key is None:
+        cache_dict_key = cache_key
+
+    thread_id = threading.get_ident()
+
+    with look_up_coalescing_lock:
+        # Computed by another thread after the caller's cache miss
+        if cache_dict_key in cache_dict:
+            return cache_dict[cache_dict_key]
+
+        in_flight_look_up = cache_key_to_in_flight_look_up_dict.get(cache_key, None)
+
+        if in_flight_look_up is None:
+            in_flight_look_up = InFlightLookUp(thread_id, Future(), placeholder_or_none)
+            cache_key_to_in_flight_look_up_dict[cache_key] = in_flight_look_up
+            is_owner = True
+            is_recursive = False
+        else:
+            is_owner = False
+            is_recursive = closes_wait_cycle(thread_id, in_flight_look_up.owner_thread_id)
+            if not is_recursive:
+                thread_id_to_awaited_cache_key_dict[thread_id] = cache_key
+
+    if is_owner:
+        try:
+            value = compute_value()
+        except BaseException as e:
+            with look_up_coalescing_lock:
+                del cache_key_to_in_flight_look_up_dict[cache_key]
+            in_flight_look_up.future.set_exception(e)
+            raise
+
+        with look_up_coalescing_lock:
+            # Entries installed from the persistent cache in the meantime take precedence
+            value = cache_dict.setdefault(cache_dict_key, value)
+            del cache_key_to_in_flight_look_up_dict[cache_key]
+        in_flight_look_up.future.set_result(value)
+
+        return value
+    elif is_recursive:
+        if in_flight_look_up.placeholder_or_none is not None:
+            return in_flight_look_up.placeholder_or_none
+        else:
+            return compute_value()
+    else:
+        try:
+            return in_flight_look_up.future.result()
+        finally:
+            with look_up_coalescing_lock:
+                del thread_id_to_awaited_cache_key_dict[thread_id]
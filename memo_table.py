@@ -0,0 +1,126 @@
+"""
+Bounded, thread-safe memo tables with LRU eviction and hit/miss/eviction counters.
+
+Entries put while a scope (`memo_table_scope`) is active are removed when the scope exits,
+so that the answers specific to one inference job do not outlive it, while entries put outside any scope stay reusable across jobs.
+
+```python
+In [1]: from memo_table import *
+
+In [2]: from subtyping import *
+
+In [3]: configure_memo_table(TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, maximum_size=4096)
+
+In [4]: with memo_table_scope(TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE):
+   ...:     type_annotation_subtyping(ConcreteClass('builtins', 'bool'), ConcreteClass('builtins', 'int'))
+
+In [5]: get_memo_table_statistics(TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE)
+Out[5]:
+{'hits': 0,
+ 'misses': 1,
+ 'evictions': 0,
+ 'number_of_entries': 0,
+ 'maximum_size': 4096,
+ 'hit_ratio': 0.0}
+```
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+
+from attrs import define, field
+
+
+@define
+class MemoTable:
+    name: str
+    maximum_size: int
+    # In LRU order (least recently used first)
+    key_to_value_ordered_dict: OrderedDict = field(factory=OrderedDict)
+    # The keys put in each active scope (innermost last)
+    scope_key_set_list: list = field(factory=list)
+    counter_dict: dict = field(factory=lambda: {'hits': 0, 'misses': 0, 'evictions': 0})
+    lock: object = field(factory=threading.RLock)
+
+    def __len__(self):
+        return len(self.key_to_value_ordered_dict)
+
+    def __contains__(self, key):
+        return key in self.key_to_value_ordered_dict
+
+    # Returns `default` on a miss
+    # Counts a hit or a miss, and marks the entry as the most recently used on a hit
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.key_to_value_ordered_dict:
+                self.counter_dict['hits'] += 1
+                self.key_to_value_ordered_dict.move_to_end(key)
+                return self.key_to_value_ordered_dict[key]
+            else:
+                self.counter_dict['misses'] += 1
+                return default
+
+    def put(self, key, value):
+        with self.lock:
+            self.key_to_value_ordered_dict[key] = value
+            self.key_to_value_ordered_dict.move_to_end(key)
+
+            if self.scope_key_set_list:
+                self.scope_key_set_list[-1].add(key)
+
+            evict_memo_table_entries_over_maximum_size(self)
+
+
+def evict_memo_table_entries_over_maximum_size(memo_table: MemoTable):
+    with memo_table.lock:
+        while len(memo_table.key_to_value_ordered_dict) > memo_table.maximum_size:
+            memo_table.key_to_value_ordered_dict.popitem(last=False)
+            memo_table.counter_dict['evictions'] += 1
+
+
+def configure_memo_table(memo_table: MemoTable, maximum_size=None):
+    with memo_table.lock:
+        if maximum_size is not None:
+            memo_table.maximum_size = maximum_size
+
+        evict_memo_table_entries_over_maximum_size(memo_table)
+
+
+# Entries put in `memo_table` inside the `with` block are removed when it exits
+@contextmanager
+def memo_table_scope(memo_table: MemoTable):
+    with memo_table.lock:
+        scope_key_set = set()
+        memo_table.scope_key_set_list.append(scope_key_set)
+
+    try:
+        yield memo_table
+    finally:
+        with memo_table.lock:
+            # Removed by identity, as other (e.g. empty) scopes may hold equal sets
+            memo_table.scope_key_set_list[:] = [ key_set for key_set in memo_table.scope_key_set_list if key_set is not scope_key_set ]
+
+            for key in scope_key_set:
+                memo_table.key_to_value_ordered_dict.pop(key, None)
+
+
+def get_memo_table_statistics(memo_table: MemoTable) -> dict:
+    with memo_table.lock:
+        statistics = dict(memo_table.counter_dict)
+        statistics['number_of_entries'] = len(memo_table.key_to_value_ordered_dict)
+        statistics['maximum_size'] = memo_table.maximum_size
+
+        number_of_lookups = statistics['hits'] + statistics['misses']
+        statistics['hit_ratio'] = statistics['hits'] / number_of_lookups if number_of_lookups else None
+
+        return statistics
+
+
+def clear_memo_table(memo_table: MemoTable, reset_counters=True):
+    with memo_table.lock:
+        memo_table.key_to_value_ordered_dict.clear()
+
+        if reset_counters:
+            for key in memo_table.counter_dict:
+                memo_table.counter_dict[key] = 0
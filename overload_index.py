@@ -0,0 +1,152 @@
+"""
+Overload dispatch index of a (possibly overloaded) function or method.
+
+The overloads of a function are bucketed by the shape of their signatures
+(number of positional parameters, number of defaulted parameters, `*args` and `**kwargs` presence, parameter names and keyword-only parameter names),
+so that a call of a given shape (number of positional arguments and keyword argument names) only runs the structural check against compatible overloads.
+The compatibility of each bucket with each call shape is computed once per index.
+
+Positional arguments include the bound `self` or `cls` of methods, as in `FunctionDefinition.parameter_type_annotation_list`.
+Overloads with more required parameters than positional arguments (and keyword arguments binding them) are incompatible,
+so a call only binding `self` and one argument does not match `dict.get(self, key, default)`.
+Defaults of keyword-only parameters are not tracked, so calls not passing a required keyword-only parameter are still considered compatible.
+
+```python
+In [1]: from look_up import *
+
+In [2]: from overload_index import *
+
+In [3]: method_list = look_up_class(ConcreteClass('builtins', 'dict')).method_name_to_method_list_dict['get']
+
+In [4]: get_compatible_overload_indices(get_overload_index(method_list), 2) # d.get(key)
+Out[4]: [0]
+
+In [5]: get_compatible_overload_indices(get_overload_index(method_list), 3) # d.get(key, default)
+Out[5]: [1]
+```
+"""
+
+from attrs import define, frozen
+
+from function_definition import FunctionDefinition
+from runtime_statistics import record_cache_hit, record_cache_miss, register_cache_size_function
+
+
+@frozen
+class OverloadShape:
+    # None if unknown
+    parameter_name_tuple: object
+    number_of_defaulted_parameters: int
+    has_vararg: bool
+    has_kwarg: bool
+    kwonlyarg_name_frozenset: frozenset
+
+
+@define
+class OverloadIndex:
+    # The indices of the overloads of each shape, in overload order
+    overload_shape_to_overload_index_list_dict: dict
+    # Cache
+    call_shape_to_compatible_overload_index_list_dict: dict
+
+
+def get_overload_shape(function_definition: FunctionDefinition) -> OverloadShape:
+    return OverloadShape(
+        None if function_definition.parameter_name_list is None else tuple(function_definition.parameter_name_list),
+        function_definition.number_of_defaulted_parameters,
+        function_definition.has_vararg,
+        function_definition.has_kwarg,
+        frozenset(function_definition.kwonlyargs_name_to_type_annotation_dict)
+    )
+
+
+# Whether a call with `number_of_positional_arguments` positional arguments and keyword arguments named `keyword_name_frozenset`
+# can bind to a signature of shape `overload_shape`
+def is_call_shape_compatible(overload_shape: OverloadShape, number_of_positional_arguments: int, keyword_name_frozenset: frozenset) -> bool:
+    if overload_shape.parameter_name_tuple is None:
+        return True
+
+    number_of_positional_parameters = len(overload_shape.parameter_name_tuple)
+
+    # Too many positional arguments
+    if number_of_positional_arguments > number_of_positional_parameters and not overload_shape.has_vararg:
+        return False
+
+    unbound_parameter_name_tuple = overload_shape.parameter_name_tuple[number_of_positional_arguments:]
+
+    # Required positional parameters not bound positionally have to be bound by keyword
+    number_of_required_parameters = number_of_positional_parameters - overload_shape.number_of_defaulted_parameters
+    for parameter_name in overload_shape.parameter_name_tuple[number_of_positional_arguments:number_of_required_parameters]:
+        if parameter_name not in keyword_name_frozenset:
+            return False
+
+    # Every keyword argument has to bind to an unbound parameter, a keyword-only parameter, or `**kwargs`
+    if not overload_shape.has_kwarg:
+        for keyword_name in keyword_name_frozenset:
+            if keyword_name not in unbound_parameter_name_tuple and keyword_name not in overload_shape.kwonlyarg_name_frozenset:
+                return False
+
+    return True
+
+
+def build_overload_index(function_definition_list: list) -> OverloadIndex:
+    overload_shape_to_overload_index_list_dict = dict()
+
+    for overload_index, function_definition in enumerate(function_definition_list):
+        overload_shape_to_overload_index_list_dict.setdefault(get_overload_shape(function_definition), list()).append(overload_index)
+
+    return OverloadIndex(overload_shape_to_overload_index_list_dict, dict())
+
+
+# Returns the indices of the overloads compatible with the call shape, in overload order
+def get_compatible_overload_indices(overload_index: OverloadIndex, number_of_positional_arguments: int, keyword_name_iterable=()) -> list:
+    keyword_name_frozenset = frozenset(keyword_name_iterable)
+    call_shape = (number_of_positional_arguments, keyword_name_frozenset)
+
+    compatible_overload_index_list = overload_index.call_shape_to_compatible_overload_index_list_dict.get(call_shape, None)
+
+    if compatible_overload_index_list is None:
+        compatible_overload_index_list = sorted(
+            i
+            for overload_shape, overload_index_list in overload_index.overload_shape_to_overload_index_list_dict.items()
+            if is_call_shape_compatible(overload_shape, number_of_positional_arguments, keyword_name_frozenset)
+            for i in overload_index_list
+        )
+        overload_index.call_shape_to_compatible_overload_index_list_dict[call_shape] = compatible_overload_index_list
+
+    return compatible_overload_index_list
+
+
+# Cache
+# Maps the `id` of each indexed overload list to (overload list, OverloadIndex)
+# The overload list is kept alive so that its `id` is not reused; the oldest entries are dropped beyond OVERLOAD_INDEX_CACHE_MAXIMUM_SIZE
+OVERLOAD_INDEX_CACHE_MAXIMUM_SIZE = 65536
+
+function_definition_list_id_to_function_definition_list_overload_index_tuple_dict = dict()
+
+register_cache_size_function('get_overload_index', lambda: len(function_definition_list_id_to_function_definition_list_overload_index_tuple_dict))
+
+def get_overload_index(function_definition_list: list) -> OverloadIndex:
+    global function_definition_list_id_to_function_definition_list_overload_index_tuple_dict
+
+    function_definition_list_overload_index_tuple = function_definition_list_id_to_function_definition_list_overload_index_tuple_dict.get(id(function_definition_list), None)
+
+    # The overload lists of the caches of `look_up.py` are never mutated, so their indexes stay valid
+    if function_definition_list_overload_index_tuple is not None and function_definition_list_overload_index_tuple[0] is function_definition_list:
+        record_cache_hit('get_overload_index')
+        return function_definition_list_overload_index_tuple[1]
+    else:
+        record_cache_miss('get_overload_index')
+
+        overload_index = build_overload_index(function_definition_list)
+
+        while len(function_definition_list_id_to_function_definition_list_overload_index_tuple_dict) >= OVERLOAD_INDEX_CACHE_MAXIMUM_SIZE:
+            try:
+                del function_definition_list_id_to_function_definition_list_overload_index_tuple_dict[next(iter(function_definition_list_id_to_function_definition_list_overload_index_tuple_dict))]
+            # Dropped concurrently
+            except (KeyError, StopIteration, RuntimeError):
+                break
+
+        function_definition_list_id_to_function_definition_list_overload_index_tuple_dict[id(function_definition_list)] = (function_definition_list, overload_index)
+
+        return overload_index
@@ -0,0 +1,194 @@
+"""
+Persistent on-disk cache of the `ClassDefinition`'s, `FunctionDefinition`'s and looked up names of each stub module.
+
+Each stub module is stored in its own file, keyed by the hash of the whole typeshed bundle (the typeshed_client version and the contents of all stub files),
+the interpreter (`sys.implementation.cache_tag`), the Python version typeshed_client targets, and `PERSISTENT_CACHE_FORMAT_VERSION`.
+The cached entries of a module also contain members and bases resolved from other modules (e.g. `builtins` classes inherit from `typing` classes),
+so they are stale as soon as any stub file changes, not only the module's own.
+Entries are loaded lazily (once per module) by `look_up.py` on a cache miss, and only written by an explicit `save_persistent_cache()`.
+The cache is off by default; set the environment variable `TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE=1` before the engines are imported to enable it.
+
+```python
+In [1]: from look_up import *
+
+In [2]: for c in class_list: look_up_class(ConcreteClass(c.__module__, c.__name__))
+
+In [3]: save_persistent_cache()
+
+In [4]: # in a new process, look_up_class(ConcreteClass('builtins', 'int')) is now a file read
+
+In [5]: invalidate_persistent_cache() # after the bundled typeshed changes
+```
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+
+import typeshed_client.finder
+
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_INFO, trace
+
+
+# Bump this whenever the layout of the cached entries or the classes they contain change
+PERSISTENT_CACHE_FORMAT_VERSION = 12
+
+# Off by default; set the environment variable TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE to 1 to read (and, through `save_persistent_cache`, write) the cache
+PERSISTENT_CACHE_ENABLED = os.environ.get('TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE', '0') == '1'
+
+PERSISTENT_CACHE_DIRECTORY = os.environ.get(
+    'TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE_DIRECTORY',
+    os.path.join(os.path.expanduser('~'), '.cache', 'type-inference-for-python')
+)
+
+# The same (default) search context used by `typeshed_client.parser.get_stub_names`
+SEARCH_CONTEXT = typeshed_client.finder.get_search_context()
+
+# Pickles of interned type annotations and lazy member mappings are only loaded by the interpreter that wrote them
+INTERPRETER_CACHE_TAG = sys.implementation.cache_tag
+
+
+def persistent_cache_version_directory():
+    major, minor = SEARCH_CONTEXT.version[:2]
+    return os.path.join(PERSISTENT_CACHE_DIRECTORY, f'v{PERSISTENT_CACHE_FORMAT_VERSION}', INTERPRETER_CACHE_TAG, f'py{major}.{minor}')
+
+
+# Cache
+module_name_to_stub_file_content_hash_dict = dict()
+
+def stub_file_content_hash_or_none(module_name: str, indent_level=0):
+    global module_name_to_stub_file_content_hash_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'stub_file_content_hash_or_none %s', module_name)
+
+    if module_name not in module_name_to_stub_file_content_hash_dict:
+        stub_file_path = typeshed_client.finder.get_stub_file(module_name, search_context=SEARCH_CONTEXT)
+
+        if stub_file_path is None:
+            module_name_to_stub_file_content_hash_dict[module_name] = None
+        else:
+            with open(stub_file_path, 'rb') as stub_file:
+                module_name_to_stub_file_content_hash_dict[module_name] = hashlib.sha256(stub_file.read()).hexdigest()
+
+    return module_name_to_stub_file_content_hash_dict[module_name]
+
+
+# Cache
+# Computed on first use, None before
+typeshed_bundle_hash_or_none = None
+
+# The SHA-256 hash of the typeshed_client version and of the names and contents of all stub modules it knows of
+def typeshed_bundle_hash(indent_level=0) -> str:
+    global typeshed_bundle_hash_or_none
+
+    if typeshed_bundle_hash_or_none is None:
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'typeshed_bundle_hash')
+
+        bundle_hash = hashlib.sha256(f'typeshed_client {typeshed_client.__version__}\n'.encode('utf-8'))
+
+        for module_name, stub_file_path in sorted(typeshed_client.finder.get_all_stub_files(SEARCH_CONTEXT)):
+            with open(stub_file_path, 'rb') as stub_file:
+                bundle_hash.update(f'{module_name}:{hashlib.sha256(stub_file.read()).hexdigest()}\n'.encode('utf-8'))
+
+        typeshed_bundle_hash_or_none = bundle_hash.hexdigest()
+
+    return typeshed_bundle_hash_or_none
+
+
+# The key that the cached entries of `module_name` (in the persistent cache, the typeshed index and the type database) are valid for
+# The typeshed bundle hash, as the entries depend on other modules; None if there is no stub file for `module_name`
+def module_entries_key_or_none(module_name: str, indent_level=0):
+    if stub_file_content_hash_or_none(module_name, indent_level + 1) is None:
+        return None
+    else:
+        return typeshed_bundle_hash(indent_level + 1)
+
+
+def persistent_cache_file_path_or_none(module_name: str, indent_level=0):
+    module_entries_key = module_entries_key_or_none(module_name, indent_level + 1)
+
+    if module_entries_key is None:
+        return None
+    else:
+        return os.path.join(persistent_cache_version_directory(), f'{module_name}.{module_entries_key}.pickle')
+
+
+def load_module_entries_from_persistent_cache(module_name: str, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'load_module_entries_from_persistent_cache %s', module_name)
+
+    if not PERSISTENT_CACHE_ENABLED:
+        return None
+
+    file_path = persistent_cache_file_path_or_none(module_name, indent_level + 1)
+
+    if file_path is None or not os.path.isfile(file_path):
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'persistent cache miss')
+        return None
+
+    try:
+        with open(file_path, 'rb') as file:
+            module_entries = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        # A corrupted or incompatible file is treated as a miss and removed
+        trace(TRACE_LEVEL_INFO, indent_level, '%s %s', type(e).__name__, e)
+        remove_file_if_exists(file_path)
+        return None
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'persistent cache hit')
+    return module_entries
+
+
+def save_module_entries_to_persistent_cache(module_name: str, module_entries: dict, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'save_module_entries_to_persistent_cache %s', module_name)
+
+    if not PERSISTENT_CACHE_ENABLED:
+        return
+
+    file_path = persistent_cache_file_path_or_none(module_name, indent_level + 1)
+
+    if file_path is None:
+        return
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    # Remove files of previous versions of the typeshed bundle
+    invalidate_persistent_cache(module_name, indent_level + 1)
+
+    # Write to a temporary file first so that concurrent readers never see a partially written file
+    temporary_file_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(temporary_file_path, 'wb') as file:
+        pickle.dump(module_entries, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file_path, file_path)
+
+
+# Explicit invalidation
+# Removes the cached files of `module_name`, or of all modules (for all format and Python versions) if `module_name` is None
+def invalidate_persistent_cache(module_name=None, indent_level=0):
+    global module_name_to_stub_file_content_hash_dict, typeshed_bundle_hash_or_none
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'invalidate_persistent_cache %s', module_name)
+
+    if module_name is None:
+        module_name_to_stub_file_content_hash_dict.clear()
+        typeshed_bundle_hash_or_none = None
+
+        for directory_path, directory_name_list, file_name_list in os.walk(PERSISTENT_CACHE_DIRECTORY):
+            for file_name in file_name_list:
+                if file_name.endswith('.pickle'):
+                    remove_file_if_exists(os.path.join(directory_path, file_name))
+    else:
+        version_directory = persistent_cache_version_directory()
+
+        if os.path.isdir(version_directory):
+            for file_name in os.listdir(version_directory):
+                # '{module_name}.{module_entries_key}.pickle'
+                if file_name.endswith('.pickle') and file_name.rsplit('.', 2)[0] == module_name:
+                    remove_file_if_exists(os.path.join(version_directory, file_name))
+
+
+def remove_file_if_exists(file_path):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,265 @@
+"""
+Precomputed conformance of common concrete classes (`builtins` and `collections` classes) to the `typing` (and thus `collections.abc`) protocols and ABCs.
+
+For each (concrete class, protocol) pair, the table records whether the class (with its own type parameters left free) is a structural subtype of the protocol (with fresh type parameters),
+and the type variable subtyping edges binding the protocol's type parameters.
+`type_annotation_subtyping` answers queries such as `bytearray <: Iterable[T]`, `list[T1] <: Iterable[T2]` or `list <: Sized` from the table before any structural walk,
+by renaming the recorded type variables to those of the query.
+Only queries whose type arguments are all distinct type variables are answered, as these are exactly the queries the recorded structural walks are a renaming of.
+
+The table is generated once (`python protocol_conformance.py`) and persisted next to the persistent cache,
+keyed by the hash of the typeshed bundle it was generated from, the interpreter and the targeted Python version, so that it is ignored after typeshed changes.
+Like the persistent cache, it is only read with `TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE=1`.
+
+```
+$ TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE=1 python protocol_conformance.py
+```
+
+```python
+In [1]: import os; os.environ['TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE'] = '1'
+
+In [2]: from subtyping import *
+
+In [3]: t = TypeVariable()
+
+In [4]: type_annotation_subtyping(ConcreteClass('builtins', 'bytearray'), Subscription(ConcreteClass('typing', 'Iterable'), (t,))) # answered from the table
+Out[4]: (True, <networkx.classes.digraph.DiGraph at 0x7f1c3e1b5f40>)
+
+In [5]: list(_[1].predecessors(t))
+Out[5]: [ConcreteClass(module_name='builtins', class_name='int')]
+```
+"""
+
+import argparse
+import os
+import pickle
+
+from attrs import frozen
+
+from look_up import look_up_class, look_up_name
+from persistent_cache import PERSISTENT_CACHE_ENABLED, persistent_cache_version_directory, remove_file_if_exists, typeshed_bundle_hash
+from runtime_statistics import record_cache_hit, record_cache_miss, register_cache_size_function
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_INFO, trace
+from type_annotation import *
+
+
+CONCRETE_CLASS_LIST = [
+    ConcreteClass('builtins', class_name)
+    for class_name in (
+        'object', 'bool', 'int', 'float', 'complex', 'str', 'bytes', 'bytearray', 'memoryview',
+        'list', 'tuple', 'dict', 'set', 'frozenset', 'range', 'enumerate', 'reversed', 'zip', 'map', 'filter'
+    )
+] + [
+    ConcreteClass('collections', class_name)
+    for class_name in ('deque', 'defaultdict', 'OrderedDict', 'Counter')
+]
+
+# Names in `typing`
+PROTOCOL_NAME_LIST = [
+    'Hashable', 'Sized', 'Container', 'Iterable', 'Iterator', 'Reversible', 'Collection',
+    'Sequence', 'MutableSequence', 'AbstractSet', 'MutableSet', 'Mapping', 'MutableMapping',
+    'SupportsInt', 'SupportsFloat', 'SupportsComplex', 'SupportsBytes', 'SupportsIndex', 'SupportsAbs', 'SupportsRound'
+]
+
+
+@frozen
+class ProtocolConformance:
+    result: bool
+    # The type arguments the concrete class and the protocol were instantiated with (empty if not generic)
+    first_type_variable_tuple: tuple
+    second_type_variable_tuple: tuple
+    type_variable_subtyping_edge_tuple: tuple
+
+
+def protocol_conformance_table_file_path(indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'protocol_conformance_table_file_path')
+
+    return os.path.join(persistent_cache_version_directory(), f'protocol_conformance.{typeshed_bundle_hash(indent_level + 1)}.pickle')
+
+
+# (ConcreteClass, TypeVariable tuple) or (None, None)
+def split_type_annotation(type_annotation):
+    if isinstance(type_annotation, ConcreteClass):
+        return type_annotation, ()
+    elif isinstance(type_annotation, Subscription):
+        return type_annotation.concrete_class, type_annotation.type_annotation_tuple
+    else:
+        return None, None
+
+
+# The type annotation of `concrete_class` with fresh type variables as type arguments
+def create_generic_type_annotation(concrete_class: ConcreteClass, indent_level=0):
+    class_definition = look_up_class(concrete_class, indent_level + 1)
+
+    if class_definition.type_variable_list:
+        return Subscription(concrete_class, tuple(TypeVariable() for _ in class_definition.type_variable_list))
+    else:
+        return concrete_class
+
+
+# Generation
+# `type_annotation_subtyping_with_edges` is passed in by the caller, as `subtyping.py` imports this module
+# Returns a dict mapping (ConcreteClass, protocol ConcreteClass) to ProtocolConformance, and a list of errors
+def build_protocol_conformance_table(type_annotation_subtyping_with_edges, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'build_protocol_conformance_table')
+
+    concrete_class_pair_to_protocol_conformance_dict = dict()
+    error_list = list()
+
+    protocol_concrete_class_list = list()
+    for protocol_name in PROTOCOL_NAME_LIST:
+        try:
+            type_annotation, kind = look_up_name('typing', protocol_name, indent_level + 1)
+        except Exception as e:
+            error_list.append(f'typing.{protocol_name}: {type(e).__name__} {e}')
+            continue
+
+        if kind == Kind.CLASS_DEFINITION and isinstance(type_annotation, ConcreteClass):
+            protocol_concrete_class_list.append(type_annotation)
+        else:
+            error_list.append(f'typing.{protocol_name}: not a class')
+
+    for concrete_class in CONCRETE_CLASS_LIST:
+        for protocol_concrete_class in protocol_concrete_class_list:
+            try:
+                first_type_annotation = create_generic_type_annotation(concrete_class, indent_level + 1)
+                second_type_annotation = create_generic_type_annotation(protocol_concrete_class, indent_level + 1)
+
+                result, type_variable_subtyping_edge_tuple = type_annotation_subtyping_with_edges(first_type_annotation, second_type_annotation, indent_level + 1)
+            except Exception as e:
+                error_list.append(f'{concrete_class} <: {protocol_concrete_class}: {type(e).__name__} {e}')
+                continue
+
+            concrete_class_pair_to_protocol_conformance_dict[(concrete_class, protocol_concrete_class)] = ProtocolConformance(
+                result,
+                split_type_annotation(first_type_annotation)[1],
+                split_type_annotation(second_type_annotation)[1],
+                type_variable_subtyping_edge_tuple
+            )
+
+    return concrete_class_pair_to_protocol_conformance_dict, error_list
+
+
+def save_protocol_conformance_table(concrete_class_pair_to_protocol_conformance_dict: dict, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'save_protocol_conformance_table')
+
+    file_path = protocol_conformance_table_file_path(indent_level + 1)
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    # Write to a temporary file first so that concurrent readers never see a partially written file
+    temporary_file_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(temporary_file_path, 'wb') as file:
+        pickle.dump(concrete_class_pair_to_protocol_conformance_dict, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file_path, file_path)
+
+    return file_path
+
+
+# Look Up
+
+# Cache
+# Loaded on first use, None before
+concrete_class_pair_to_protocol_conformance_dict_or_none = None
+
+register_cache_size_function('protocol_conformance', lambda: len(concrete_class_pair_to_protocol_conformance_dict_or_none or ()))
+
+def get_protocol_conformance_table(indent_level=0) -> dict:
+    global concrete_class_pair_to_protocol_conformance_dict_or_none
+
+    if concrete_class_pair_to_protocol_conformance_dict_or_none is None:
+        concrete_class_pair_to_protocol_conformance_dict_or_none = load_protocol_conformance_table(indent_level + 1)
+
+    return concrete_class_pair_to_protocol_conformance_dict_or_none
+
+
+# Returns an empty table if there is no table for the current stub files
+def load_protocol_conformance_table(indent_level=0) -> dict:
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'load_protocol_conformance_table')
+
+    if not PERSISTENT_CACHE_ENABLED:
+        return dict()
+
+    file_path = protocol_conformance_table_file_path(indent_level + 1)
+
+    if not os.path.isfile(file_path):
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'no protocol conformance table')
+        return dict()
+
+    try:
+        with open(file_path, 'rb') as file:
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        # A corrupted or incompatible file is treated as a miss and removed
+        trace(TRACE_LEVEL_INFO, indent_level, '%s %s', type(e).__name__, e)
+        remove_file_if_exists(file_path)
+        return dict()
+
+
+# Replaces the table (e.g. with one just built) for the rest of the process
+def install_protocol_conformance_table(concrete_class_pair_to_protocol_conformance_dict: dict):
+    global concrete_class_pair_to_protocol_conformance_dict_or_none
+
+    concrete_class_pair_to_protocol_conformance_dict_or_none = concrete_class_pair_to_protocol_conformance_dict
+
+
+# Returns (result, type variable subtyping edge tuple) for `first_type_annotation <: second_type_annotation` if the table answers it, None otherwise
+def look_up_protocol_conformance_or_none(first_type_annotation, second_type_annotation, indent_level=0):
+    concrete_class_pair_to_protocol_conformance_dict = get_protocol_conformance_table(indent_level + 1)
+
+    if not concrete_class_pair_to_protocol_conformance_dict:
+        return None
+
+    first_concrete_class, first_type_annotation_tuple = split_type_annotation(first_type_annotation)
+    second_concrete_class, second_type_annotation_tuple = split_type_annotation(second_type_annotation)
+
+    protocol_conformance = concrete_class_pair_to_protocol_conformance_dict.get((first_concrete_class, second_concrete_class), None)
+
+    if protocol_conformance is None:
+        return None
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'look_up_protocol_conformance_or_none %s %s', first_type_annotation, second_type_annotation)
+
+    # The recorded walk is only a renaming of the query's walk if the query's type arguments are all distinct type variables
+    type_argument_tuple = first_type_annotation_tuple + second_type_annotation_tuple
+    if (
+        len(first_type_annotation_tuple) != len(protocol_conformance.first_type_variable_tuple)
+        or len(second_type_annotation_tuple) != len(protocol_conformance.second_type_variable_tuple)
+        or not all(isinstance(type_argument, TypeVariable) for type_argument in type_argument_tuple)
+        or len(set(type_argument_tuple)) != len(type_argument_tuple)
+    ):
+        record_cache_miss('protocol_conformance')
+        return None
+
+    record_cache_hit('protocol_conformance')
+
+    if not protocol_conformance.type_variable_subtyping_edge_tuple:
+        return protocol_conformance.result, ()
+
+    old_type_variable_to_new_type_annotation_dict = dict(zip(
+        protocol_conformance.first_type_variable_tuple + protocol_conformance.second_type_variable_tuple,
+        type_argument_tuple
+    ))
+
+    return protocol_conformance.result, tuple(
+        (
+            replace_type_variables_in_type_annotation(from_type_annotation, old_type_variable_to_new_type_annotation_dict, indent_level + 1),
+            replace_type_variables_in_type_annotation(to_type_annotation, old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+        )
+        for from_type_annotation, to_type_annotation in protocol_conformance.type_variable_subtyping_edge_tuple
+    )
+
+
+if __name__ == '__main__':
+    from subtyping import type_annotation_subtyping_with_edges
+
+    argument_parser = argparse.ArgumentParser(description='Generate the protocol conformance table of the current stub files.')
+    argument_parser.parse_args()
+
+    concrete_class_pair_to_protocol_conformance_dict, error_list = build_protocol_conformance_table(type_annotation_subtyping_with_edges)
+
+    for error in error_list:
+        print(error)
+
+    file_path = save_protocol_conformance_table(concrete_class_pair_to_protocol_conformance_dict)
+    print(f'recorded {len(concrete_class_pair_to_protocol_conformance_dict)} (class, protocol) pairs ({len(error_list)} failed) into {file_path}')
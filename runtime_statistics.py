@@ -0,0 +1,232 @@
+"""
+Runtime statistics of the look up and subtyping engines:
+call counts, cumulative and self time, and cache hits and misses of instrumented functions, as well as current cache sizes.
+
+Cumulative time counts each outermost call of a (possibly recursive) function once.
+Self time excludes the time spent in other instrumented functions called from it.
+The subtyping engine computes nested queries in a loop rather than recursively; each computed query is recorded as a call of `type_annotation_subtyping` (see `instrumented_steps_as`).
+
+Like tracing, runtime statistics are off by default, and cost nothing when off (`instrumented` and `instrumented_steps_as` return the function or generator itself).
+Set the environment variable `TYPE_INFERENCE_FOR_PYTHON_RUNTIME_STATISTICS=1` before the engines are imported to enable them.
+
+```python
+In [1]: from look_up import *
+
+In [2]: from runtime_statistics import *
+
+In [3]: reset_runtime_statistics()
+
+In [4]: look_up_class(ConcreteClass('builtins', 'int'))
+
+In [5]: get_runtime_statistics()
+Out[5]:
+{'function_name_to_statistics_dict': {'look_up_name': {'number_of_calls': 39,
+   'cumulative_time': 0.0121,
+   'self_time': 0.0098,
+   'number_of_cache_hits': 27,
+   'number_of_cache_misses': 12,
+   'cache_hit_ratio': 0.6923076923076923},
+  'look_up_class': {'number_of_calls': 3,
+   ...}},
+ 'cache_name_to_cache_size_dict': {'look_up_name': 94,
+  'look_up_class': 3,
+  ...}}
+```
+"""
+
+from functools import wraps
+import os
+import threading
+import time
+
+from attrs import define
+
+
+RUNTIME_STATISTICS_ENABLED = os.environ.get('TYPE_INFERENCE_FOR_PYTHON_RUNTIME_STATISTICS', '0') == '1'
+
+
+@define
+class FunctionStatistics:
+    number_of_calls: int = 0
+    cumulative_time: float = 0.0
+    self_time: float = 0.0
+    number_of_cache_hits: int = 0
+    number_of_cache_misses: int = 0
+
+
+function_name_to_function_statistics_dict = dict()
+
+cache_name_to_cache_size_function_dict = dict()
+
+# Per thread: the stack of [function_statistics, time spent in instrumented callees] of the active calls,
+# and the recursion depth of each active function
+runtime_statistics_thread_local = threading.local()
+
+
+def get_function_statistics(function_name: str) -> FunctionStatistics:
+    global function_name_to_function_statistics_dict
+
+    if function_name not in function_name_to_function_statistics_dict:
+        function_name_to_function_statistics_dict[function_name] = FunctionStatistics()
+
+    return function_name_to_function_statistics_dict[function_name]
+
+
+# Decorator recording the calls, cumulative time and self time of a function under its `__name__`
+# Returns `function` itself when runtime statistics are disabled
+def instrumented(function):
+    return instrumented_as(function.__name__)(function)
+
+
+# Decorator recording the calls, cumulative time and self time of a function under `function_name`
+# (e.g. to report an internal variant of a function, and the cache hits and misses it records, under one name)
+def instrumented_as(function_name: str):
+    def decorator(function):
+        if not RUNTIME_STATISTICS_ENABLED:
+            return function
+        else:
+            return create_instrumented_function(function, get_function_statistics(function_name))
+
+    return decorator
+
+
+def get_call_stack_and_recursion_depth_dict():
+    try:
+        return runtime_statistics_thread_local.call_stack, runtime_statistics_thread_local.function_statistics_id_to_recursion_depth_dict
+    except AttributeError:
+        runtime_statistics_thread_local.call_stack = list()
+        runtime_statistics_thread_local.function_statistics_id_to_recursion_depth_dict = dict()
+        return runtime_statistics_thread_local.call_stack, runtime_statistics_thread_local.function_statistics_id_to_recursion_depth_dict
+
+
+def create_instrumented_function(function, function_statistics: FunctionStatistics):
+    @wraps(function)
+    def instrumented_function(*args, **kwargs):
+        call_stack, function_statistics_id_to_recursion_depth_dict = get_call_stack_and_recursion_depth_dict()
+
+        call_stack_frame = [function_statistics, 0.0]
+        call_stack.append(call_stack_frame)
+
+        recursion_depth = function_statistics_id_to_recursion_depth_dict.get(id(function_statistics), 0)
+        function_statistics_id_to_recursion_depth_dict[id(function_statistics)] = recursion_depth + 1
+
+        start_time = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed_time = time.perf_counter() - start_time
+
+            call_stack.pop()
+            function_statistics_id_to_recursion_depth_dict[id(function_statistics)] = recursion_depth
+
+            function_statistics.number_of_calls += 1
+            function_statistics.self_time += elapsed_time - call_stack_frame[1]
+            if recursion_depth == 0:
+                function_statistics.cumulative_time += elapsed_time
+
+            if call_stack:
+                call_stack[-1][1] += elapsed_time
+
+    return instrumented_function
+
+
+# new
+# Records the calls, cumulative time and self time of the generator `generator` under `function_name`, like `instrumented_as`
+# For computations that run as generators driven by a loop rather than as nested calls (see `subtyping.run_subtyping_steps`)
+# Self time only counts the time spent resuming `generator`; cumulative time also counts the time it is suspended
+# Returns `generator` itself when runtime statistics are disabled
+def instrumented_steps_as(function_name: str, generator):
+    if not RUNTIME_STATISTICS_ENABLED:
+        return generator
+    else:
+        return create_instrumented_steps(generator, get_function_statistics(function_name))
+
+
+def create_instrumented_steps(generator, function_statistics: FunctionStatistics):
+    call_stack, function_statistics_id_to_recursion_depth_dict = get_call_stack_and_recursion_depth_dict()
+
+    recursion_depth = function_statistics_id_to_recursion_depth_dict.get(id(function_statistics), 0)
+    function_statistics_id_to_recursion_depth_dict[id(function_statistics)] = recursion_depth + 1
+
+    start_time = time.perf_counter()
+    try:
+        sent_value = None
+        while True:
+            call_stack_frame = [function_statistics, 0.0]
+            call_stack.append(call_stack_frame)
+
+            resume_time = time.perf_counter()
+            try:
+                yielded_value = generator.send(sent_value)
+            except StopIteration as stop_iteration:
+                return stop_iteration.value
+            finally:
+                elapsed_time = time.perf_counter() - resume_time
+
+                call_stack.pop()
+
+                function_statistics.self_time += elapsed_time - call_stack_frame[1]
+
+                if call_stack:
+                    call_stack[-1][1] += elapsed_time
+
+            sent_value = yield yielded_value
+    finally:
+        generator.close()
+
+        function_statistics_id_to_recursion_depth_dict[id(function_statistics)] = recursion_depth
+
+        function_statistics.number_of_calls += 1
+        if recursion_depth == 0:
+            function_statistics.cumulative_time += time.perf_counter() - start_time
+
+
+def record_cache_hit(function_name: str):
+    if RUNTIME_STATISTICS_ENABLED:
+        get_function_statistics(function_name).number_of_cache_hits += 1
+
+
+def record_cache_miss(function_name: str):
+    if RUNTIME_STATISTICS_ENABLED:
+        get_function_statistics(function_name).number_of_cache_misses += 1
+
+
+# `cache_size_function` is called (without arguments) by `get_runtime_statistics`
+def register_cache_size_function(cache_name: str, cache_size_function):
+    global cache_name_to_cache_size_function_dict
+
+    cache_name_to_cache_size_function_dict[cache_name] = cache_size_function
+
+
+def get_runtime_statistics() -> dict:
+    function_name_to_statistics_dict = dict()
+
+    for function_name, function_statistics in function_name_to_function_statistics_dict.items():
+        number_of_cache_lookups = function_statistics.number_of_cache_hits + function_statistics.number_of_cache_misses
+
+        function_name_to_statistics_dict[function_name] = {
+            'number_of_calls': function_statistics.number_of_calls,
+            'cumulative_time': function_statistics.cumulative_time,
+            'self_time': function_statistics.self_time,
+            'number_of_cache_hits': function_statistics.number_of_cache_hits,
+            'number_of_cache_misses': function_statistics.number_of_cache_misses,
+            'cache_hit_ratio': function_statistics.number_of_cache_hits / number_of_cache_lookups if number_of_cache_lookups else None
+        }
+
+    return {
+        'function_name_to_statistics_dict': function_name_to_statistics_dict,
+        'cache_name_to_cache_size_dict': {
+            cache_name: cache_size_function()
+            for cache_name, cache_size_function in cache_name_to_cache_size_function_dict.items()
+        }
+    }
+
+
+# Zeroes all counters (caches are left untouched), e.g. before inferring the next function in a batch
+def reset_runtime_statistics():
+    for function_statistics in function_name_to_function_statistics_dict.values():
+        function_statistics.number_of_calls = 0
+        function_statistics.cumulative_time = 0.0
+        function_statistics.self_time = 0.0
+        function_statistics.number_of_cache_hits = 0
+        function_statistics.number_of_cache_misses = 0
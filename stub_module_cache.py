@@ -0,0 +1,207 @@
+"""
+Project-level, bounded cache of the per-module name dictionaries (and the ASTs they hold) returned by `typeshed_client.parser.get_stub_names`.
+
+Modules are evicted in LRU order once their estimated memory exceeds the memory budget.
+Optionally, the AST of a module is dropped as soon as all of its names have been converted into the caches of `look_up.py`.
+
+```python
+In [1]: from stub_module_cache import *
+
+In [2]: configure_stub_module_cache(memory_budget_in_bytes=64 * 1024 * 1024, drop_converted_asts=True)
+
+In [3]: from look_up import *
+
+In [4]: look_up_class(ConcreteClass('builtins', 'int'))
+
+In [5]: get_stub_module_cache_statistics()
+Out[5]:
+{'hits': 7,
+ 'misses': 3,
+ 'evictions': 0,
+ 'dropped_asts': 0,
+ 'number_of_modules': 3,
+ 'estimated_memory_in_bytes': 8700000,
+ 'memory_budget_in_bytes': 67108864}
+```
+"""
+
+import ast
+from collections import OrderedDict
+import os
+import threading
+
+from attrs import define
+import typeshed_client.finder
+import typeshed_client.parser
+
+from persistent_cache import SEARCH_CONTEXT
+from runtime_statistics import register_cache_size_function
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_INFO, trace
+
+
+# Measured with tracemalloc on typeshed's `builtins`, `typing`, `os`, `collections` and `json` stubs (31 - 53 bytes per byte)
+ESTIMATED_MEMORY_IN_BYTES_PER_STUB_FILE_BYTE = 45
+
+STUB_MODULE_CACHE_MEMORY_BUDGET_IN_BYTES = int(os.environ.get('TYPE_INFERENCE_FOR_PYTHON_STUB_MODULE_CACHE_MEMORY_BUDGET_IN_BYTES', 256 * 1024 * 1024))
+
+STUB_MODULE_CACHE_DROP_CONVERTED_ASTS = False
+
+
+@define
+class StubModuleCacheEntry:
+    # None if no stub file is found
+    stub_names_dict: object
+    estimated_memory_in_bytes: int
+    # Names that still have to be converted by `look_up.look_up_name`
+    names_to_convert_by_look_up_name_set: set
+    # Names of classes and global functions that still have to be converted by `look_up.look_up_class` or `look_up.look_up_global_function`
+    names_to_convert_to_definition_set: set
+
+
+# Cache
+module_name_to_stub_module_cache_entry_ordered_dict = OrderedDict()
+
+# Modules whose ASTs have been dropped
+# Only the names they define are kept, so that membership tests still work
+module_name_to_converted_stub_names_dict = dict()
+
+register_cache_size_function('get_stub_names', lambda: len(module_name_to_stub_module_cache_entry_ordered_dict))
+
+# Held while a module is parsed as well, so that concurrent misses of the same module parse it only once
+stub_module_cache_lock = threading.RLock()
+
+stub_module_cache_counter_dict = {
+    'hits': 0,
+    'misses': 0,
+    'evictions': 0,
+    'dropped_asts': 0
+}
+
+
+def configure_stub_module_cache(memory_budget_in_bytes=None, drop_converted_asts=None):
+    global STUB_MODULE_CACHE_MEMORY_BUDGET_IN_BYTES, STUB_MODULE_CACHE_DROP_CONVERTED_ASTS
+
+    with stub_module_cache_lock:
+        if memory_budget_in_bytes is not None:
+            STUB_MODULE_CACHE_MEMORY_BUDGET_IN_BYTES = memory_budget_in_bytes
+
+        if drop_converted_asts is not None:
+            STUB_MODULE_CACHE_DROP_CONVERTED_ASTS = drop_converted_asts
+
+        evict_stub_modules_over_memory_budget()
+
+
+# Drop-in replacement for `typeshed_client.parser.get_stub_names(module_name)`
+# For modules whose ASTs have been dropped, returns a dict mapping each name to None
+def get_stub_names(module_name: str, indent_level=0):
+    global module_name_to_stub_module_cache_entry_ordered_dict, module_name_to_converted_stub_names_dict, stub_module_cache_counter_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'get_stub_names %s', module_name)
+
+    with stub_module_cache_lock:
+        if module_name in module_name_to_stub_module_cache_entry_ordered_dict:
+            stub_module_cache_counter_dict['hits'] += 1
+            module_name_to_stub_module_cache_entry_ordered_dict.move_to_end(module_name)
+            return module_name_to_stub_module_cache_entry_ordered_dict[module_name].stub_names_dict
+        elif module_name in module_name_to_converted_stub_names_dict:
+            stub_module_cache_counter_dict['hits'] += 1
+            return module_name_to_converted_stub_names_dict[module_name]
+        else:
+            stub_module_cache_counter_dict['misses'] += 1
+
+            stub_file_path = typeshed_client.finder.get_stub_file(module_name, search_context=SEARCH_CONTEXT)
+            stub_names_dict = typeshed_client.parser.get_stub_names(module_name, search_context=SEARCH_CONTEXT)
+
+            if stub_names_dict is None:
+                stub_module_cache_entry = StubModuleCacheEntry(None, 0, set(), set())
+            else:
+                stub_module_cache_entry = StubModuleCacheEntry(
+                    stub_names_dict,
+                    os.path.getsize(stub_file_path) * ESTIMATED_MEMORY_IN_BYTES_PER_STUB_FILE_BYTE,
+                    set(stub_names_dict),
+                    {
+                        name
+                        for name, name_info in stub_names_dict.items()
+                        if isinstance(name_info.ast, (ast.ClassDef, ast.FunctionDef, typeshed_client.parser.OverloadedName))
+                    }
+                )
+
+            module_name_to_stub_module_cache_entry_ordered_dict[module_name] = stub_module_cache_entry
+
+            evict_stub_modules_over_memory_budget(indent_level + 1)
+
+            return stub_names_dict
+
+
+def estimated_stub_module_cache_memory_in_bytes():
+    return sum(
+        stub_module_cache_entry.estimated_memory_in_bytes
+        for stub_module_cache_entry in module_name_to_stub_module_cache_entry_ordered_dict.values()
+    )
+
+
+# Evict least recently used modules until the estimated memory is within the budget
+# The most recently used module is never evicted
+def evict_stub_modules_over_memory_budget(indent_level=0):
+    global module_name_to_stub_module_cache_entry_ordered_dict, stub_module_cache_counter_dict
+
+    with stub_module_cache_lock:
+        estimated_memory_in_bytes = estimated_stub_module_cache_memory_in_bytes()
+
+        while estimated_memory_in_bytes > STUB_MODULE_CACHE_MEMORY_BUDGET_IN_BYTES and len(module_name_to_stub_module_cache_entry_ordered_dict) > 1:
+            module_name, stub_module_cache_entry = module_name_to_stub_module_cache_entry_ordered_dict.popitem(last=False)
+            estimated_memory_in_bytes -= stub_module_cache_entry.estimated_memory_in_bytes
+            stub_module_cache_counter_dict['evictions'] += 1
+
+            trace(TRACE_LEVEL_INFO, indent_level, 'evicted %s', module_name)
+
+
+# Called by `look_up.look_up_name` once `(module_name, name)` is cached
+def mark_name_converted_by_look_up_name(module_name: str, name: str):
+    with stub_module_cache_lock:
+        if module_name in module_name_to_stub_module_cache_entry_ordered_dict:
+            module_name_to_stub_module_cache_entry_ordered_dict[module_name].names_to_convert_by_look_up_name_set.discard(name)
+            drop_stub_module_ast_if_converted(module_name)
+
+
+# Called by `look_up.look_up_class` and `look_up.look_up_global_function` once the definition is cached
+def mark_name_converted_to_definition(module_name: str, name: str):
+    with stub_module_cache_lock:
+        if module_name in module_name_to_stub_module_cache_entry_ordered_dict:
+            module_name_to_stub_module_cache_entry_ordered_dict[module_name].names_to_convert_to_definition_set.discard(name)
+            drop_stub_module_ast_if_converted(module_name)
+
+
+def drop_stub_module_ast_if_converted(module_name: str):
+    global module_name_to_stub_module_cache_entry_ordered_dict, module_name_to_converted_stub_names_dict, stub_module_cache_counter_dict
+
+    stub_module_cache_entry = module_name_to_stub_module_cache_entry_ordered_dict[module_name]
+
+    if (
+        STUB_MODULE_CACHE_DROP_CONVERTED_ASTS
+        and stub_module_cache_entry.stub_names_dict is not None
+        and not stub_module_cache_entry.names_to_convert_by_look_up_name_set
+        and not stub_module_cache_entry.names_to_convert_to_definition_set
+    ):
+        module_name_to_converted_stub_names_dict[module_name] = dict.fromkeys(stub_module_cache_entry.stub_names_dict)
+        del module_name_to_stub_module_cache_entry_ordered_dict[module_name]
+        stub_module_cache_counter_dict['dropped_asts'] += 1
+
+
+def get_stub_module_cache_statistics() -> dict:
+    with stub_module_cache_lock:
+        statistics = dict(stub_module_cache_counter_dict)
+        statistics['number_of_modules'] = len(module_name_to_stub_module_cache_entry_ordered_dict)
+        statistics['estimated_memory_in_bytes'] = estimated_stub_module_cache_memory_in_bytes()
+        statistics['memory_budget_in_bytes'] = STUB_MODULE_CACHE_MEMORY_BUDGET_IN_BYTES
+        return statistics
+
+
+def clear_stub_module_cache(reset_counters=True):
+    with stub_module_cache_lock:
+        module_name_to_stub_module_cache_entry_ordered_dict.clear()
+        module_name_to_converted_stub_names_dict.clear()
+
+        if reset_counters:
+            for key in stub_module_cache_counter_dict:
+                stub_module_cache_counter_dict[key] = 0
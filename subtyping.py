@@ -64,26 +64,52 @@ Out[18]: [ConcreteClass(module_name='builtins', class_name='int')]
 """
 
 import importlib
-import sys
+import os
+import warnings
 
 import networkx as nx
 
-from class_definition import ClassDefinition, instantiate_type_variables_in_class_definition
-from look_up import look_up_class
-from function_definition import FunctionDefinition
+from class_definition import ClassDefinition, has_all_member_names
+from class_hierarchy import is_nominal_subclass
+from look_up import is_nominal_class, look_up_class, look_up_instantiated_class
+from function_definition import FunctionDefinition, get_function_definition_fingerprint, has_all_kwonlyargs_names
+from memo_table import MemoTable
+from protocol_conformance import look_up_protocol_conformance_or_none
+from runtime_statistics import instrumented_steps_as, record_cache_hit, record_cache_miss, register_cache_size_function
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_INFO, trace
+import type_lattice
 from type_annotation import *
 
 
+# new
+# Nominal subtyping is decided by the parsed stub bases only (see `class_hierarchy.py`); two nominal (non-protocol) classes are not compared structurally
+# Set the environment variable TYPE_INFERENCE_FOR_PYTHON_RUNTIME_NOMINAL_SUBTYPING to 1 to also compare the `__mro__`'s of the runtime classes (importing their modules) before falling back to structural subtyping
+RUNTIME_NOMINAL_SUBTYPING_ENABLED = os.environ.get('TYPE_INFERENCE_FOR_PYTHON_RUNTIME_NOMINAL_SUBTYPING', '0') == '1'
+
+
+# Cache
+concrete_class_to_runtime_class_or_none_dict = dict()
+
+register_cache_size_function('resolve_runtime_class_or_none', lambda: len(concrete_class_to_runtime_class_or_none_dict))
+
 def resolve_runtime_class_or_none(concrete_class, indent_level=0):
-    indent = '    ' * indent_level
-    
-    print(indent, f'resolve_runtime_class_or_none {concrete_class}', file=sys.stderr)
-    
+    global concrete_class_to_runtime_class_or_none_dict
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'resolve_runtime_class_or_none %s', concrete_class)
+
+    if concrete_class not in concrete_class_to_runtime_class_or_none_dict:
+        concrete_class_to_runtime_class_or_none_dict[concrete_class] = compute_runtime_class_or_none(concrete_class, indent_level + 1)
+
+    return concrete_class_to_runtime_class_or_none_dict[concrete_class]
+
+
+# Import the runtime class of `concrete_class` (called by `resolve_runtime_class_or_none` on a cache miss)
+def compute_runtime_class_or_none(concrete_class, indent_level=0):
     module_name = concrete_class.module_name
     class_name = concrete_class.class_name
     
     if module_name in ('typing', 'typing_extensions', 'collections.abc', '_collections_abc'):
-        print(indent, 'the runtime class only serves typing purposes and would not have the information we want', file=sys.stderr)
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'the runtime class only serves typing purposes and would not have the information we want')
         return None
     else:
         try:
@@ -91,93 +117,156 @@ def resolve_runtime_class_or_none(concrete_class, indent_level=0):
             runtime_class = getattr(module, concrete_class.class_name)
             return runtime_class
         except (ModuleNotFoundError, AttributeError) as e:
-            print(indent, type(e).__name__, str(e), file=sys.stderr)
+            trace(TRACE_LEVEL_DEBUG, indent_level, '%s %s', type(e).__name__, e)
             return None
 
 
-def class_definition_subtyping(
+# new
+ANY_CONCRETE_CLASS_SET = frozenset((ConcreteClass('typing', 'Any'), ConcreteClass('typing_extensions', 'Any')))
+
+
+# new
+# Internally, type variable subtyping constraints are accumulated as immutable tuples of (subtype, supertype) edges
+# An `nx.DiGraph` is only created at the public API (`type_annotation_subtyping`, `function_definition_subtyping`, `class_definition_subtyping`)
+EMPTY_EDGE_TUPLE = ()
+
+# new
+# The structural checks (`class_definition_subtyping_steps`, `function_definition_subtyping_steps` and `compute_type_annotation_subtyping`) are generators
+# Instead of recursing into `type_annotation_subtyping_with_edges`, they yield each sub-query as
+# (first type annotation, second type annotation, self_or_cls_type_annotation_pair, indent_level),
+# are sent back its (result, type variable subtyping edge tuple), and return their own (result, type variable subtyping edge tuple)
+# `run_subtyping_steps` drives them with an explicit stack, so that deeply nested type annotations do not exhaust the Python stack
+
+
+# Deduplicated, in first-seen order
+def create_edge_tuple(edge_list: list) -> tuple:
+    if edge_list:
+        return tuple(dict.fromkeys(edge_list))
+    else:
+        return EMPTY_EDGE_TUPLE
+
+
+def create_type_variable_subtyping_digraph(edge_tuple: tuple) -> nx.DiGraph:
+    type_variable_subtyping_digraph = nx.DiGraph()
+    type_variable_subtyping_digraph.add_edges_from(edge_tuple)
+    return type_variable_subtyping_digraph
+
+
+# new
+# Lower for pairs of signatures that are more likely to fail `function_definition_subtyping`, judged from their fingerprints only
+# 0: the classes of the return values are known and not nominally related
+# 1: the signatures differ in the number of parameters or in the presence of `*args` or `**kwargs`
+# 2: otherwise
+# Neither implies failure, as type variables match anything and classes may be related structurally
+def get_function_definition_pair_selectivity(first_function_definition: FunctionDefinition, second_function_definition: FunctionDefinition) -> int:
+    first_function_definition_fingerprint = get_function_definition_fingerprint(first_function_definition)
+    second_function_definition_fingerprint = get_function_definition_fingerprint(second_function_definition)
+
+    if (
+        first_function_definition_fingerprint.return_value_concrete_class_or_none is not None
+        and second_function_definition_fingerprint.return_value_concrete_class_or_none is not None
+        and not is_nominal_subclass(first_function_definition_fingerprint.return_value_concrete_class_or_none, second_function_definition_fingerprint.return_value_concrete_class_or_none)
+    ):
+        return 0
+    elif (
+        first_function_definition_fingerprint.number_of_parameters != second_function_definition_fingerprint.number_of_parameters
+        or first_function_definition_fingerprint.has_vararg_type_annotation != second_function_definition_fingerprint.has_vararg_type_annotation
+        or first_function_definition_fingerprint.has_kwarg_type_annotation != second_function_definition_fingerprint.has_kwarg_type_annotation
+    ):
+        return 1
+    else:
+        return 2
+
+
+def class_definition_subtyping_steps(
     first_class_type_annotation_of_self_or_cls,
     first_class_definition: ClassDefinition,
     second_class_type_annotation_of_self_or_cls,
     second_class_definition: ClassDefinition,
     indent_level=0
-) -> bool:
-    indent = '    ' * indent_level
-
-    print(indent, f'class_definition_subtyping {first_class_type_annotation_of_self_or_cls} {second_class_type_annotation_of_self_or_cls}', file=sys.stderr)
+):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'class_definition_subtyping %s %s', first_class_type_annotation_of_self_or_cls, second_class_type_annotation_of_self_or_cls)
     
-    type_variable_subtyping_digraph = nx.DiGraph()
+    type_variable_subtyping_edge_list = list()
 
-    is_equal = lambda first_type_annotation, second_type_annotation: (first_type_annotation == second_type_annotation) or (first_type_annotation == first_class_type_annotation_of_self_or_cls and second_type_annotation == second_class_type_annotation_of_self_or_cls)
-    
-    for second_class_method_name, second_class_method_list in second_class_definition.method_name_to_method_list_dict.items():
-        if second_class_method_name not in first_class_definition.method_name_to_method_list_dict:
-            print(indent, f'{second_class_method_name} not in {first_class_definition.method_name_to_method_list_dict.keys()}', file=sys.stderr)
-            return False, nx.DiGraph()
-        else:
-            first_class_method_list = first_class_definition.method_name_to_method_list_dict[second_class_method_name]
-            
-            # assert len(first_class_method_list) == 1 and len(second_class_method_list) == 1
-            
-            first_class_method = first_class_method_list[0]
-            second_class_method = second_class_method_list[0]
-
-            result_, type_variable_subtyping_digraph_ = function_definition_subtyping(first_class_method, second_class_method, indent_level + 1, is_equal=is_equal, is_method=True)
-            if not result_:
-                print(indent, f'not function_definition_subtyping({first_class_method}, {second_class_method})', file=sys.stderr)
-                return False, nx.DiGraph()
-            else:
-                type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+    # new
+    # The types of `self` or `cls` of both classes are considered equal (see `is_equal`)
+    # Passed down as part of the memo key, instead of as an opaque closure
+    self_or_cls_type_annotation_pair = (first_class_type_annotation_of_self_or_cls, second_class_type_annotation_of_self_or_cls)
     
-    for second_class_staticmethod_name, second_class_staticmethod_list in second_class_definition.staticmethod_name_to_staticmethod_list_dict.items():
-        if second_class_staticmethod_name not in first_class_definition.staticmethod_name_to_staticmethod_list_dict:
-            print(indent, f'{second_class_staticmethod_name} not in {first_class_definition.staticmethod_name_to_staticmethod_list_dict.keys()}', file=sys.stderr)
-            return False, nx.DiGraph()
+    # new
+    # Classes missing members of the second class are rejected from their fingerprints, before any structural work
+    if not has_all_member_names(first_class_definition, second_class_definition):
+        trace(TRACE_LEVEL_DEBUG, indent_level, '%s lacks members of %s', first_class_type_annotation_of_self_or_cls, second_class_type_annotation_of_self_or_cls)
+        return False, EMPTY_EDGE_TUPLE
+
+    # (first class method, second class method, is_method) for each method and staticmethod of the second class
+    # assert len(first_class_method_list) == 1 and len(second_class_method_list) == 1
+    function_definition_pair_list = [
+        (first_class_definition.method_name_to_method_list_dict[second_class_method_name][0], second_class_method_list[0], True)
+        for second_class_method_name, second_class_method_list in second_class_definition.method_name_to_method_list_dict.items()
+    ] + [
+        (first_class_definition.staticmethod_name_to_staticmethod_list_dict[second_class_staticmethod_name][0], second_class_staticmethod_list[0], False)
+        for second_class_staticmethod_name, second_class_staticmethod_list in second_class_definition.staticmethod_name_to_staticmethod_list_dict.items()
+    ]
+
+    for first_function_definition, second_function_definition, is_method in function_definition_pair_list:
+        if not has_all_kwonlyargs_names(first_function_definition, second_function_definition):
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'keyword-only parameters of %s not in %s', second_function_definition, first_function_definition)
+            return False, EMPTY_EDGE_TUPLE
+
+    # The checks most likely to fail run first (in their original order on ties)
+    # The edges are still combined in the original order
+    index_list = sorted(
+        range(len(function_definition_pair_list)),
+        key=lambda index: get_function_definition_pair_selectivity(function_definition_pair_list[index][0], function_definition_pair_list[index][1])
+    )
+
+    type_variable_subtyping_edge_tuple_list = [ EMPTY_EDGE_TUPLE ] * len(function_definition_pair_list)
+
+    for index in index_list:
+        first_function_definition, second_function_definition, is_method = function_definition_pair_list[index]
+
+        result_, type_variable_subtyping_edge_tuple_ = yield from function_definition_subtyping_steps(first_function_definition, second_function_definition, indent_level + 1, self_or_cls_type_annotation_pair=self_or_cls_type_annotation_pair, is_method=is_method)
+        if not result_:
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'not function_definition_subtyping(%s, %s)', first_function_definition, second_function_definition)
+            return False, EMPTY_EDGE_TUPLE
         else:
-            first_class_staticmethod_list = first_class_definition.staticmethod_name_to_staticmethod_list_dict[second_class_staticmethod_name]
-            
-            # assert len(first_class_staticmethod_list) == 1 and len(second_class_staticmethod_list) == 1
-            
-            first_class_staticmethod = first_class_staticmethod_list[0]
-            second_class_staticmethod = second_class_staticmethod_list[0]
-
-            result_, type_variable_subtyping_digraph_ = function_definition_subtyping(first_class_staticmethod, second_class_staticmethod, indent_level + 1, is_equal=is_equal)
-            if not result_:
-                print(indent, f'not function_definition_subtyping({first_class_staticmethod}, {second_class_staticmethod})', file=sys.stderr)
-                return False, nx.DiGraph()
-            else:
-                type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+            type_variable_subtyping_edge_tuple_list[index] = type_variable_subtyping_edge_tuple_
+
+    for type_variable_subtyping_edge_tuple_ in type_variable_subtyping_edge_tuple_list:
+        type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
     
     for second_class_property_name, second_class_property_type_annotation in second_class_definition.property_name_to_property_type_annotation_dict.items():
-        if second_class_property_name not in first_class_definition.property_name_to_property_type_annotation_dict:
-            print(indent, f'{second_class_property_name} not in {first_class_definition.property_name_to_property_type_annotation_dict.keys}', file=sys.stderr)
-            return False
-        else:
-            first_class_property_type_annotation = first_class_definition.property_name_to_property_type_annotation_dict[second_class_property_name]
+        first_class_property_type_annotation = first_class_definition.property_name_to_property_type_annotation_dict[second_class_property_name]
 
-            result_, type_variable_subtyping_digraph_ = type_annotation_subtyping(first_class_property_type_annotation, second_class_property_type_annotation, indent_level + 1, is_equal=is_equal)
-            if not result_:
-                print(indent, f'not type_annotation_subtyping({first_class_property_type_annotation}, {second_class_property_type_annotation})', file=sys.stderr)
-                return False, nx.DiGraph()
-            else:
-                type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+        result_, type_variable_subtyping_edge_tuple_ = yield (first_class_property_type_annotation, second_class_property_type_annotation, self_or_cls_type_annotation_pair, indent_level + 1)
+        if not result_:
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'not type_annotation_subtyping(%s, %s)', first_class_property_type_annotation, second_class_property_type_annotation)
+            return False, EMPTY_EDGE_TUPLE
+        else:
+            type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
     
-    return True, type_variable_subtyping_digraph
+    return True, create_edge_tuple(type_variable_subtyping_edge_list)
 
 
-def function_definition_subtyping(
+def function_definition_subtyping_steps(
     first_function_definition: FunctionDefinition,
     second_function_definition: FunctionDefinition,
     indent_level=0,
     *,
-    is_equal=lambda first_type_annotation, second_type_annotation: first_type_annotation == second_type_annotation,
+    self_or_cls_type_annotation_pair=None,
     is_method=False
-) -> bool:
-    indent = '    ' * indent_level
-
-    print(indent, f'function_definition_subtyping {first_function_definition} {second_function_definition}', file=sys.stderr)
+):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'function_definition_subtyping %s %s', first_function_definition, second_function_definition)
     
-    type_variable_subtyping_digraph = nx.DiGraph()
+    type_variable_subtyping_edge_list = list()
+
+    # new
+    # Missing keyword-only parameters are rejected from the fingerprints, before any structural work
+    if not has_all_kwonlyargs_names(first_function_definition, second_function_definition):
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'keyword-only parameters of %s not in %s', second_function_definition, first_function_definition)
+        return False, EMPTY_EDGE_TUPLE
 
     for (
         first_function_definition_parameter_type_annotation, 
@@ -186,85 +275,83 @@ def function_definition_subtyping(
         first_function_definition.parameter_type_annotation_list[1:] if is_method else first_function_definition.parameter_type_annotation_list,
         second_function_definition.parameter_type_annotation_list[1:] if is_method else second_function_definition.parameter_type_annotation_list
     ):
-        result_, type_variable_subtyping_digraph_ = type_annotation_subtyping(
+        result_, type_variable_subtyping_edge_tuple_ = yield (
             second_function_definition_parameter_type_annotation,
             first_function_definition_parameter_type_annotation,
-            indent_level + 1,
-            is_equal=is_equal
+            self_or_cls_type_annotation_pair,
+            indent_level + 1
         )
         if not result_:
-            print(indent, f'not type_annotation_subtyping({second_function_definition_parameter_type_annotation}, {first_function_definition_parameter_type_annotation})', file=sys.stderr)
-            return False, nx.DiGraph()
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'not type_annotation_subtyping(%s, %s)', second_function_definition_parameter_type_annotation, first_function_definition_parameter_type_annotation)
+            return False, EMPTY_EDGE_TUPLE
         else:
-            type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+            type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
     
     if second_function_definition.vararg_type_annotation != ConcreteClass(module_name='builtins', class_name='NoneType'):
-        result_, type_variable_subtyping_digraph_ = type_annotation_subtyping(
+        result_, type_variable_subtyping_edge_tuple_ = yield (
             second_function_definition.vararg_type_annotation,
             first_function_definition.vararg_type_annotation,
-            indent_level + 1,
-            is_equal=is_equal
+            self_or_cls_type_annotation_pair,
+            indent_level + 1
         )
         if not result_:
-            print(indent, f'not type_annotation_subtyping({second_function_definition.vararg_type_annotation}, {first_function_definition.vararg_type_annotation})', file=sys.stderr)
-            return False, nx.DiGraph()
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'not type_annotation_subtyping(%s, %s)', second_function_definition.vararg_type_annotation, first_function_definition.vararg_type_annotation)
+            return False, EMPTY_EDGE_TUPLE
         else:
-            type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+            type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
     
     for (
         second_function_kwonlyargs_name,
         second_function_kwonlyargs_type_annotation
     ) in second_function_definition.kwonlyargs_name_to_type_annotation_dict.items():
         if second_function_kwonlyargs_name not in first_function_definition.kwonlyargs_name_to_type_annotation_dict:
-            print(indent, f'{second_function_kwonlyargs_name} not in {first_function_definition.kwonlyargs_name_to_type_annotation_dict.keys()}', file=sys.stderr)
-            return False
+            trace(TRACE_LEVEL_DEBUG, indent_level, '%s not in %s', second_function_kwonlyargs_name, first_function_definition.kwonlyargs_name_to_type_annotation_dict.keys())
+            return False, EMPTY_EDGE_TUPLE
         else:
             first_function_kwonlyargs_type_annotation = first_function_definition.kwonlyargs_name_to_type_annotation_dict[second_function_kwonlyargs_name]
 
-            result_, type_variable_subtyping_digraph_ = type_annotation_subtyping(
+            result_, type_variable_subtyping_edge_tuple_ = yield (
                 second_function_kwonlyargs_type_annotation,
                 first_function_kwonlyargs_type_annotation,
-                indent_level + 1,
-                is_equal=is_equal
+                self_or_cls_type_annotation_pair,
+                indent_level + 1
             )
             if not result_:
-                print(indent, f'not type_annotation_subtyping({second_function_kwonlyargs_type_annotation}, {first_function_kwonlyargs_type_annotation})', file=sys.stderr)
-                return False, nx.DiGraph()
+                trace(TRACE_LEVEL_DEBUG, indent_level, 'not type_annotation_subtyping(%s, %s)', second_function_kwonlyargs_type_annotation, first_function_kwonlyargs_type_annotation)
+                return False, EMPTY_EDGE_TUPLE
             else:
-                type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+                type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
     
     if second_function_definition.kwarg_type_annotation != ConcreteClass(module_name='builtins', class_name='NoneType'):
-        result_, type_variable_subtyping_digraph_ = type_annotation_subtyping(
+        result_, type_variable_subtyping_edge_tuple_ = yield (
             second_function_definition.kwarg_type_annotation,
             first_function_definition.kwarg_type_annotation,
-            indent_level + 1,
-            is_equal=is_equal
+            self_or_cls_type_annotation_pair,
+            indent_level + 1
         )
         if not result_:
-            print(indent, f'not type_annotation_subtyping({second_function_definition.kwarg_type_annotation}, {first_function_definition.kwarg_type_annotation})', file=sys.stderr)
-            return False, nx.DiGraph()
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'not type_annotation_subtyping(%s, %s)', second_function_definition.kwarg_type_annotation, first_function_definition.kwarg_type_annotation)
+            return False, EMPTY_EDGE_TUPLE
         else:
-            type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+            type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
     
-    result_, type_variable_subtyping_digraph_ = type_annotation_subtyping(
+    result_, type_variable_subtyping_edge_tuple_ = yield (
         first_function_definition.return_value_type_annotation,
         second_function_definition.return_value_type_annotation,
-        indent_level + 1,
-        is_equal=is_equal
+        self_or_cls_type_annotation_pair,
+        indent_level + 1
     )
     if not result_:
-        print(indent, f'not type_annotation_subtyping({first_function_definition.return_value_type_annotation}, {second_function_definition.return_value_type_annotation})', file=sys.stderr)
-        return False, nx.DiGraph()
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'not type_annotation_subtyping(%s, %s)', first_function_definition.return_value_type_annotation, second_function_definition.return_value_type_annotation)
+        return False, EMPTY_EDGE_TUPLE
     else:
-        type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
+        type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
     
-    return True, type_variable_subtyping_digraph
+    return True, create_edge_tuple(type_variable_subtyping_edge_list)
 
 
 def type_of_self_or_cls(concrete_class: ConcreteClass, class_definition: ClassDefinition, indent_level=0):
-    indent = '    ' * indent_level
-    
-    print(indent, f'type_of_self_or_cls {concrete_class}', file=sys.stderr)
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'type_of_self_or_cls %s', concrete_class)
     
     if class_definition.type_variable_list:
         return Subscription(concrete_class, tuple(class_definition.type_variable_list))
@@ -272,207 +359,529 @@ def type_of_self_or_cls(concrete_class: ConcreteClass, class_definition: ClassDe
         return concrete_class
 
 
-TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT = dict()
+# new
+# Two type annotations are equal if they are identical, or if they are the types of `self` or `cls` of the two classes being compared
+# `self_or_cls_type_annotation_pair` may also be a deprecated `is_equal` predicate (see `resolve_is_equal_keyword`)
+def is_equal(first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair=None) -> bool:
+    if callable(self_or_cls_type_annotation_pair):
+        return self_or_cls_type_annotation_pair(first_type_annotation, second_type_annotation)
 
-def type_annotation_subtyping(
+    return (first_type_annotation == second_type_annotation) or (
+        self_or_cls_type_annotation_pair is not None
+        and first_type_annotation == self_or_cls_type_annotation_pair[0]
+        and second_type_annotation == self_or_cls_type_annotation_pair[1]
+    )
+
+
+# new
+# Bounded memo of `type_annotation_subtyping`
+# Maps (first type annotation, second type annotation, self_or_cls_type_annotation_pair) to (result, type variable subtyping edge tuple)
+TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE = MemoTable(
+    'type_annotation_subtyping',
+    int(os.environ.get('TYPE_INFERENCE_FOR_PYTHON_SUBTYPING_MEMO_TABLE_MAXIMUM_SIZE', 65536))
+)
+
+register_cache_size_function('type_annotation_subtyping', lambda: len(TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE))
+
+# Each call of `run_subtyping_steps` gives up after this many sub-queries
+SUBTYPING_MAXIMUM_NUMBER_OF_STEPS = int(os.environ.get('TYPE_INFERENCE_FOR_PYTHON_SUBTYPING_MAXIMUM_NUMBER_OF_STEPS', 1000000))
+
+
+# The root generator of `type_annotation_subtyping_with_edges`
+def type_annotation_subtyping_query_steps(first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair=None, indent_level=0):
+    return (yield (first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair, indent_level))
+
+
+# Drives the structural check `generator`, computing each sub-query it yields (and, in turn, their sub-queries) with an explicit stack of generators
+# Sub-queries are answered, in order, by the memo, by assumption (if they are in progress, i.e. recursive), by the protocol conformance table, or by `compute_type_annotation_subtyping`
+# Returns the (result, type variable subtyping edge tuple) `generator` returns,
+# or (False, EMPTY_EDGE_TUPLE) if more than `maximum_number_of_steps` sub-queries are needed
+# Each computed sub-query, and each class comparison within it, is recorded as a call of `type_annotation_subtyping` or `class_definition_subtyping` in the runtime statistics
+def run_subtyping_steps(generator, indent_level=0, maximum_number_of_steps=None):
+    if maximum_number_of_steps is None:
+        maximum_number_of_steps = SUBTYPING_MAXIMUM_NUMBER_OF_STEPS
+
+    in_progress_query_set = set()
+
+    # Each frame is [query (None for `generator`), generator, assumption set]
+    # The assumption set of a frame contains the in-progress queries whose results were assumed while computing it (and its descendants)
+    frame_list = [[None, generator, set()]]
+    result_and_type_variable_subtyping_edge_tuple_tuple = None
+    number_of_steps = 0
+
+    try:
+        while True:
+            frame = frame_list[-1]
+
+            try:
+                sub_query = frame[1].send(result_and_type_variable_subtyping_edge_tuple_tuple)
+            except StopIteration as stop_iteration:
+                query, _, assumption_set = frame_list.pop()
+                result_and_type_variable_subtyping_edge_tuple_tuple = stop_iteration.value
+
+                if not frame_list:
+                    return result_and_type_variable_subtyping_edge_tuple_tuple
+
+                in_progress_query_set.discard(query)
+                assumption_set.discard(query)
+
+                # Assuming that queries hold can only make more queries hold,
+                # so negative results are final, and positive results are final if they do not depend on queries still in progress
+                # Other results are only valid within the queries they depend on, and are not memoized
+                if not result_and_type_variable_subtyping_edge_tuple_tuple[0] or not assumption_set:
+                    TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE.put(query, result_and_type_variable_subtyping_edge_tuple_tuple)
+                else:
+                    frame_list[-1][2].update(assumption_set)
+
+                continue
+
+            number_of_steps += 1
+            if number_of_steps > maximum_number_of_steps:
+                trace(TRACE_LEVEL_INFO, indent_level, 'gave up after %s steps', maximum_number_of_steps)
+                return False, EMPTY_EDGE_TUPLE
+
+            first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair, sub_query_indent_level = sub_query
+
+            query = (first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair)
+
+            result_and_type_variable_subtyping_edge_tuple_tuple = TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE.get(query)
+
+            if result_and_type_variable_subtyping_edge_tuple_tuple is not None:
+                record_cache_hit('type_annotation_subtyping')
+                continue
+
+            record_cache_miss('type_annotation_subtyping')
+
+            # coinduction: recursive queries are assumed to hold
+            if query in in_progress_query_set:
+                trace(TRACE_LEVEL_DEBUG, sub_query_indent_level, 'recursive query assumed to hold')
+                frame[2].add(query)
+                result_and_type_variable_subtyping_edge_tuple_tuple = (True, EMPTY_EDGE_TUPLE)
+                continue
+
+            # new
+            # Conformance of common classes to `typing` protocols is precomputed (see `protocol_conformance.py`)
+            if self_or_cls_type_annotation_pair is None:
+                result_and_type_variable_subtyping_edge_tuple_tuple = look_up_protocol_conformance_or_none(first_type_annotation, second_type_annotation, sub_query_indent_level + 1)
+
+                if result_and_type_variable_subtyping_edge_tuple_tuple is not None:
+                    trace(TRACE_LEVEL_DEBUG, sub_query_indent_level, 'answered by the protocol conformance table')
+                    TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE.put(query, result_and_type_variable_subtyping_edge_tuple_tuple)
+                    continue
+
+            trace(TRACE_LEVEL_DEBUG, sub_query_indent_level, 'type_annotation_subtyping %s %s', first_type_annotation, second_type_annotation)
+
+            in_progress_query_set.add(query)
+            frame_list.append([
+                query,
+                instrumented_steps_as(
+                    'type_annotation_subtyping',
+                    compute_type_annotation_subtyping(first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair, sub_query_indent_level)
+                ),
+                set()
+            ])
+    finally:
+        # innermost first
+        for frame in reversed(frame_list):
+            frame[1].close()
+
+
+# Queries that need more than SUBTYPING_MAXIMUM_NUMBER_OF_STEPS sub-queries are conservatively assumed not to hold, and are not memoized
+def type_annotation_subtyping_with_edges(
     first_type_annotation,
     second_type_annotation,
     indent_level=0,
     *,
-    is_equal=lambda first_type_annotation, second_type_annotation: first_type_annotation == second_type_annotation
+    self_or_cls_type_annotation_pair=None
 ):
-    global TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT
-    
-    if indent_level > 100:
-        assert False
-    
-    indent = '    ' * indent_level
+    return run_subtyping_steps(
+        type_annotation_subtyping_query_steps(first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair, indent_level),
+        indent_level
+    )
 
-    print(indent, f'type_annotation_subtyping {first_type_annotation} {second_type_annotation}', file=sys.stderr)
-    
-    if (first_type_annotation, second_type_annotation) in TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT:
-        return TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT[(first_type_annotation, second_type_annotation)]
+
+def class_definition_subtyping_with_edges(
+    first_class_type_annotation_of_self_or_cls,
+    first_class_definition: ClassDefinition,
+    second_class_type_annotation_of_self_or_cls,
+    second_class_definition: ClassDefinition,
+    indent_level=0
+):
+    return run_subtyping_steps(
+        instrumented_steps_as(
+            'class_definition_subtyping',
+            class_definition_subtyping_steps(
+                first_class_type_annotation_of_self_or_cls,
+                first_class_definition,
+                second_class_type_annotation_of_self_or_cls,
+                second_class_definition,
+                indent_level
+            )
+        ),
+        indent_level
+    )
+
+
+def function_definition_subtyping_with_edges(
+    first_function_definition: FunctionDefinition,
+    second_function_definition: FunctionDefinition,
+    indent_level=0,
+    *,
+    self_or_cls_type_annotation_pair=None,
+    is_method=False
+):
+    return run_subtyping_steps(
+        function_definition_subtyping_steps(
+            first_function_definition,
+            second_function_definition,
+            indent_level,
+            self_or_cls_type_annotation_pair=self_or_cls_type_annotation_pair,
+            is_method=is_method
+        ),
+        indent_level
+    )
+
+
+# Compute `type_annotation_subtyping` without memoizing (called by `run_subtyping_steps` on a miss)
+def compute_type_annotation_subtyping(
+    first_type_annotation,
+    second_type_annotation,
+    self_or_cls_type_annotation_pair=None,
+    indent_level=0
+):
+    type_variable_subtyping_edge_list = list()
+
+    # handle equalities
+    # no modification of `type_variable_subtyping_edge_list`
+    if is_equal(first_type_annotation, second_type_annotation, self_or_cls_type_annotation_pair):
+        trace(TRACE_LEVEL_DEBUG, indent_level, 'is_equal(%s, %s)', first_type_annotation, second_type_annotation)
+        result = True
     else:
-        # reject recursive lookups of the same parameters
-        type_variable_subtyping_digraph = nx.DiGraph()
-        
-        TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT[(first_type_annotation, second_type_annotation)] = (True, type_variable_subtyping_digraph)
-
-        # handle equalities
-        # no modification of `type_variable_subtyping_digraph`
-        if is_equal(first_type_annotation, second_type_annotation):
-            print(indent, f'is_equal({first_type_annotation}, {second_type_annotation})', file=sys.stderr)
+        # handle `TypeVariable`'s
+        if isinstance(first_type_annotation, TypeVariable) or isinstance(second_type_annotation, TypeVariable):
+            result = True
+            type_variable_subtyping_edge_list.append((first_type_annotation, second_type_annotation))
+        # new
+        # handle `Any`
+        # `Any` is both a supertype and a subtype of every type annotation
+        # no modification of `type_variable_subtyping_edge_list`
+        elif first_type_annotation in ANY_CONCRETE_CLASS_SET or second_type_annotation in ANY_CONCRETE_CLASS_SET:
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'Any')
             result = True
         else:
-            # handle `TypeVariable`'s
-            if isinstance(first_type_annotation, TypeVariable) or isinstance(second_type_annotation, TypeVariable):
-                result = True
-                type_variable_subtyping_digraph.add_edge(first_type_annotation, second_type_annotation)
-            else:
-                # handle `Subscription`'s
-                if isinstance(first_type_annotation, ConcreteClass) and isinstance(second_type_annotation, Subscription):
-                    first_type_concrete_class = first_type_annotation
-                    second_type_concrete_class = second_type_annotation.concrete_class
+            # handle `Subscription`'s
+            if isinstance(first_type_annotation, ConcreteClass) and isinstance(second_type_annotation, Subscription):
+                first_type_concrete_class = first_type_annotation
+                second_type_concrete_class = second_type_annotation.concrete_class
 
-                    first_type_type_annotation_list = []
-                    second_type_type_annotation_list = list(second_type_annotation.type_annotation_tuple)
+                first_type_type_annotation_list = []
+                second_type_type_annotation_list = list(second_type_annotation.type_annotation_tuple)
 
-                    first_type_class_definition = look_up_class(first_type_concrete_class, indent_level + 1)
-                    second_type_class_definition = look_up_class(second_type_concrete_class, indent_level + 1)
+                first_type_class_definition = look_up_class(first_type_concrete_class, indent_level + 1)
+                second_type_class_definition = look_up_class(second_type_concrete_class, indent_level + 1)
 
-                    instantiated_first_type_class_definition = first_type_class_definition
+                instantiated_first_type_class_definition = first_type_class_definition
 
-                    instantiated_second_type_class_definition = instantiate_type_variables_in_class_definition(
-                        second_type_class_definition,
-                        second_type_type_annotation_list,
-                        indent_level + 1
-                    )
+                instantiated_second_type_class_definition = look_up_instantiated_class(
+                    second_type_concrete_class,
+                    second_type_type_annotation_list,
+                    indent_level + 1
+                )
 
-                    result, type_variable_subtyping_digraph_ = class_definition_subtyping(
+                result, type_variable_subtyping_edge_tuple_ = yield from instrumented_steps_as(
+                    'class_definition_subtyping',
+                    class_definition_subtyping_steps(
                         first_type_annotation,
                         instantiated_first_type_class_definition,
                         second_type_annotation,
                         instantiated_second_type_class_definition,
                         indent_level + 1
                     )
-                    
-                    type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
-                elif isinstance(first_type_annotation, Subscription) and isinstance(second_type_annotation, ConcreteClass):
-                    first_type_concrete_class = first_type_annotation.concrete_class
-                    second_type_concrete_class = second_type_annotation
-
-                    first_type_type_annotation_list = list(first_type_annotation.type_annotation_tuple)
-                    second_type_type_annotation_list = []
-
-                    first_type_class_definition = look_up_class(first_type_concrete_class, indent_level + 1)
-                    second_type_class_definition = look_up_class(second_type_concrete_class, indent_level + 1)
-
-                    instantiated_first_type_class_definition = instantiate_type_variables_in_class_definition(
-                        first_type_class_definition,
-                        first_type_type_annotation_list,
-                        indent_level + 1
-                    )
-
-                    instantiated_second_type_class_definition = second_type_class_definition
-
-                    result, type_variable_subtyping_digraph_ = class_definition_subtyping(
+                )
+                
+                type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
+            elif isinstance(first_type_annotation, Subscription) and isinstance(second_type_annotation, ConcreteClass):
+                first_type_concrete_class = first_type_annotation.concrete_class
+                second_type_concrete_class = second_type_annotation
+
+                first_type_type_annotation_list = list(first_type_annotation.type_annotation_tuple)
+                second_type_type_annotation_list = []
+
+                first_type_class_definition = look_up_class(first_type_concrete_class, indent_level + 1)
+                second_type_class_definition = look_up_class(second_type_concrete_class, indent_level + 1)
+
+                instantiated_first_type_class_definition = look_up_instantiated_class(
+                    first_type_concrete_class,
+                    first_type_type_annotation_list,
+                    indent_level + 1
+                )
+
+                instantiated_second_type_class_definition = second_type_class_definition
+
+                result, type_variable_subtyping_edge_tuple_ = yield from instrumented_steps_as(
+                    'class_definition_subtyping',
+                    class_definition_subtyping_steps(
                         first_type_annotation,
                         instantiated_first_type_class_definition,
                         second_type_annotation,
                         instantiated_second_type_class_definition,
                         indent_level + 1
                     )
-                    
-                    type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
-                elif isinstance(first_type_annotation, Subscription) and isinstance(second_type_annotation, Subscription):
-                    first_type_concrete_class = first_type_annotation.concrete_class
-                    second_type_concrete_class = second_type_annotation.concrete_class
-
-                    first_type_type_annotation_list = list(first_type_annotation.type_annotation_tuple)
-                    second_type_type_annotation_list = list(second_type_annotation.type_annotation_tuple)
-
-                    first_type_class_definition = look_up_class(first_type_concrete_class, indent_level + 1)
-                    second_type_class_definition = look_up_class(second_type_concrete_class, indent_level + 1)
-
-                    instantiated_first_type_class_definition = instantiate_type_variables_in_class_definition(
-                        first_type_class_definition,
-                        first_type_type_annotation_list,
-                        indent_level + 1
-                    )
-
-                    instantiated_second_type_class_definition = instantiate_type_variables_in_class_definition(
-                        second_type_class_definition,
-                        second_type_type_annotation_list,
-                        indent_level + 1
-                    )
-
-                    result, type_variable_subtyping_digraph_ = class_definition_subtyping(
+                )
+                
+                type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
+            elif isinstance(first_type_annotation, Subscription) and isinstance(second_type_annotation, Subscription):
+                first_type_concrete_class = first_type_annotation.concrete_class
+                second_type_concrete_class = second_type_annotation.concrete_class
+
+                first_type_type_annotation_list = list(first_type_annotation.type_annotation_tuple)
+                second_type_type_annotation_list = list(second_type_annotation.type_annotation_tuple)
+
+                first_type_class_definition = look_up_class(first_type_concrete_class, indent_level + 1)
+                second_type_class_definition = look_up_class(second_type_concrete_class, indent_level + 1)
+
+                instantiated_first_type_class_definition = look_up_instantiated_class(
+                    first_type_concrete_class,
+                    first_type_type_annotation_list,
+                    indent_level + 1
+                )
+
+                instantiated_second_type_class_definition = look_up_instantiated_class(
+                    second_type_concrete_class,
+                    second_type_type_annotation_list,
+                    indent_level + 1
+                )
+
+                result, type_variable_subtyping_edge_tuple_ = yield from instrumented_steps_as(
+                    'class_definition_subtyping',
+                    class_definition_subtyping_steps(
                         first_type_annotation,
                         instantiated_first_type_class_definition,
                         second_type_annotation,
                         instantiated_second_type_class_definition,
                         indent_level + 1
                     )
-                    
-                    type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
-                # handle `ConcreteClass`'s
-                # no modification of `type_variable_subtyping_digraph`
-                elif isinstance(first_type_annotation, ConcreteClass) and isinstance(second_type_annotation, ConcreteClass):
-                    first_type_annotation_runtime_class_or_none = resolve_runtime_class_or_none(first_type_annotation, indent_level + 1)
-                    second_type_annotation_runtime_class_or_none = resolve_runtime_class_or_none(second_type_annotation, indent_level + 1)
+                )
+                
+                type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
+            # handle `ConcreteClass`'s
+            # no modification of `type_variable_subtyping_edge_list`
+            elif isinstance(first_type_annotation, ConcreteClass) and isinstance(second_type_annotation, ConcreteClass):
+                # new
+                # Looking up `first_type_annotation` registers its stub bases (and, recursively, theirs) in the class table,
+                # so that nominal subtyping according to the parsed stub bases is a single bit test
+                first_type_class_definition = look_up_class(first_type_annotation, indent_level + 1)
+                second_type_class_definition = look_up_class(second_type_annotation, indent_level + 1)
+
+                if is_nominal_subclass(first_type_annotation, second_type_annotation):
+                    trace(TRACE_LEVEL_DEBUG, indent_level, '%s is a nominal ancestor of %s', second_type_annotation, first_type_annotation)
+                    result = True
+                else:
+                    # new
+                    # Runtime classes are only imported if RUNTIME_NOMINAL_SUBTYPING_ENABLED
+                    if RUNTIME_NOMINAL_SUBTYPING_ENABLED:
+                        first_type_annotation_runtime_class_or_none = resolve_runtime_class_or_none(first_type_annotation, indent_level + 1)
+                        second_type_annotation_runtime_class_or_none = resolve_runtime_class_or_none(second_type_annotation, indent_level + 1)
+                    else:
+                        first_type_annotation_runtime_class_or_none = None
+                        second_type_annotation_runtime_class_or_none = None
 
                     if first_type_annotation_runtime_class_or_none is not None and second_type_annotation_runtime_class_or_none is not None:
                         if second_type_annotation_runtime_class_or_none in first_type_annotation_runtime_class_or_none.__mro__:
-                            print(indent, f'{second_type_annotation_runtime_class_or_none} in {first_type_annotation_runtime_class_or_none}.__mro__', file=sys.stderr)
+                            trace(TRACE_LEVEL_DEBUG, indent_level, '%s in %s.__mro__', second_type_annotation_runtime_class_or_none, first_type_annotation_runtime_class_or_none)
                             result = True
                         else:
-                            print(indent, f'{second_type_annotation_runtime_class_or_none} not in {first_type_annotation_runtime_class_or_none}.__mro__', file=sys.stderr)
+                            trace(TRACE_LEVEL_DEBUG, indent_level, '%s not in %s.__mro__', second_type_annotation_runtime_class_or_none, first_type_annotation_runtime_class_or_none)
                             result = False
+                    # new
+                    # The stub bases of two nominal (non-protocol) classes are known, and `second_type_annotation` is not among the ancestors of `first_type_annotation`
+                    elif is_nominal_class(first_type_annotation, indent_level + 1) and is_nominal_class(second_type_annotation, indent_level + 1):
+                        trace(TRACE_LEVEL_DEBUG, indent_level, '%s is not a nominal ancestor of %s', second_type_annotation, first_type_annotation)
+                        result = False
                     else:
-                        first_type_class_definition = look_up_class(first_type_annotation)
-                        second_type_class_definition = look_up_class(second_type_annotation)
-
                         new_first_type_annotation = type_of_self_or_cls(first_type_annotation, first_type_class_definition, indent_level + 1)
                         new_second_type_annotation = type_of_self_or_cls(second_type_annotation, second_type_class_definition, indent_level + 1)
 
-                        if (new_first_type_annotation, new_second_type_annotation) in TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT:
-                            result = TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT[(new_first_type_annotation, new_second_type_annotation)]
+                        result_and_type_variable_subtyping_edge_tuple_tuple_or_none = TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE.get((new_first_type_annotation, new_second_type_annotation, None))
+
+                        if result_and_type_variable_subtyping_edge_tuple_tuple_or_none is not None:
+                            result, type_variable_subtyping_edge_tuple_ = result_and_type_variable_subtyping_edge_tuple_tuple_or_none
                         else:
-                            result = class_definition_subtyping(
-                                new_first_type_annotation,
-                                first_type_class_definition,
-                                new_second_type_annotation,
-                                second_type_class_definition,
-                                indent_level + 1
+                            result, type_variable_subtyping_edge_tuple_ = yield from instrumented_steps_as(
+                                'class_definition_subtyping',
+                                class_definition_subtyping_steps(
+                                    new_first_type_annotation,
+                                    first_type_class_definition,
+                                    new_second_type_annotation,
+                                    second_type_class_definition,
+                                    indent_level + 1
+                                )
                             )
-                # handle `Union`'s
-                elif isinstance(first_type_annotation, (Subscription, ConcreteClass)) and isinstance(second_type_annotation, Union):
-                    for type_annotation in second_type_annotation:
-                        result_, type_variable_subtyping_digraph_ = type_annotation_subtyping(
-                            first_type_annotation,
-                            type_annotation,
-                            indent_level + 1
-                        )
-                        if result_:
-                            type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
-                            result = True
-                elif isinstance(first_type_annotation, Union) and isinstance(second_type_annotation, Union):
-                    result_ = True
-                    type_variable_subtyping_digraph_ = nx.DiGraph()
-                    for type_annotation in first_type_annotation:
-                        result__, type_variable_subtyping_digraph__ = type_annotation_subtyping(
-                            type_annotation,
-                            second_type_annotation,
-                            indent_level + 1
-                        )
-                        if result__:
-                            type_variable_subtyping_digraph_.add_edges_from(type_variable_subtyping_digraph__.edges)
-                        else:
-                            result_ = False
-                            type_variable_subtyping_digraph_ = nx.DiGraph()
-                            break
-                    
-                    result = result_
-                    type_variable_subtyping_digraph.add_edges_from(type_variable_subtyping_digraph_.edges)
-                            
-                else:
-                    assert False, (first_type_annotation, second_type_annotation)
 
-        if not result:
-            TYPE_ANNOTATION_SUBTYPING_QUERIES_DICT[(first_type_annotation, second_type_annotation)] = (False, type_variable_subtyping_digraph)
-        
-        return result, type_variable_subtyping_digraph
+                        type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
+            # handle `Union`'s
+            # new
+            # A `Union` is a subtype of a type annotation if all of its elements are
+            elif isinstance(first_type_annotation, Union):
+                result_ = True
+                type_variable_subtyping_edge_list_ = list()
+                for type_annotation in first_type_annotation.element_tuple:
+                    result__, type_variable_subtyping_edge_tuple__ = yield (
+                        type_annotation,
+                        second_type_annotation,
+                        self_or_cls_type_annotation_pair,
+                        indent_level + 1
+                    )
+                    if result__:
+                        type_variable_subtyping_edge_list_.extend(type_variable_subtyping_edge_tuple__)
+                    else:
+                        result_ = False
+                        type_variable_subtyping_edge_list_ = list()
+                        break
+                
+                result = result_
+                type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_list_)
+            elif isinstance(first_type_annotation, (Subscription, ConcreteClass)) and isinstance(second_type_annotation, Union):
+                result = False
+                for type_annotation in second_type_annotation.element_tuple:
+                    result_, type_variable_subtyping_edge_tuple_ = yield (
+                        first_type_annotation,
+                        type_annotation,
+                        self_or_cls_type_annotation_pair,
+                        indent_level + 1
+                    )
+                    if result_:
+                        type_variable_subtyping_edge_list.extend(type_variable_subtyping_edge_tuple_)
+                        result = True
+                        
+            else:
+                assert False, (first_type_annotation, second_type_annotation)
+
+    return result, create_edge_tuple(type_variable_subtyping_edge_list)
 
 
-def find_lowest_subtype_of_type_annotations_or_none(type_annotation_list):
-    if len(type_annotation_list) == 0:
-        subtype = None
-    elif len(type_annotation_list) == 1:
-        subtype = type_annotation_list[0]
+# new
+# Batches
+
+def get_concrete_class_or_none(type_annotation):
+    if isinstance(type_annotation, ConcreteClass):
+        return type_annotation
+    elif isinstance(type_annotation, Subscription):
+        return type_annotation.concrete_class
     else:
-        subtype = type_annotation_list[0]
-        for type_annotation in type_annotation_list[1:]:
-            if type_annotation_subtyping(type_annotation, subtype)[0]:
-                subtype = type_annotation
-    
-    return subtype
+        return None
+
+
+# Computes `type_annotation_subtyping_with_edges` for each (first type annotation, second type annotation) pair
+# Identical pairs are computed once; the class definitions pairs instantiate are shared through `look_up_instantiated_class`
+# Returns the (result, type variable subtyping edge tuple)'s in input order
+def type_annotation_subtyping_many_with_edges(type_annotation_pair_iterable, indent_level=0) -> list:
+    type_annotation_pair_list = list(type_annotation_pair_iterable)
+
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'type_annotation_subtyping_many_with_edges %s', len(type_annotation_pair_list))
+
+    type_annotation_pair_to_result_and_type_variable_subtyping_edge_tuple_tuple_dict = dict()
+
+    for first_type_annotation, second_type_annotation in dict.fromkeys(type_annotation_pair_list):
+        type_annotation_pair_to_result_and_type_variable_subtyping_edge_tuple_tuple_dict[(first_type_annotation, second_type_annotation)] = type_annotation_subtyping_with_edges(
+            first_type_annotation,
+            second_type_annotation,
+            indent_level + 1
+        )
+
+    return [
+        type_annotation_pair_to_result_and_type_variable_subtyping_edge_tuple_tuple_dict[type_annotation_pair]
+        for type_annotation_pair in type_annotation_pair_list
+    ]
+
+
+# Public API
+# Returns (result, type variable subtyping nx.DiGraph)
+
+# new
+# `type_annotation_subtyping` and `function_definition_subtyping` used to take an `is_equal` keyword,
+# a predicate (first type annotation, second type annotation) -> bool deciding which type annotations are equal
+# It is still accepted (with a DeprecationWarning) and takes the place of `self_or_cls_type_annotation_pair`:
+# it is called on every sub-query in place of the comparison with the pair, and is part of the memo key (so pass the same function across calls)
+# `is_equal=lambda a, b: a == b or (a == first_self and b == second_self)` is `self_or_cls_type_annotation_pair=(first_self, second_self)`
+def resolve_is_equal_keyword(self_or_cls_type_annotation_pair, is_equal_or_none):
+    if is_equal_or_none is None:
+        return self_or_cls_type_annotation_pair
+
+    warnings.warn(
+        'the `is_equal` keyword is deprecated, pass `self_or_cls_type_annotation_pair` instead',
+        DeprecationWarning,
+        stacklevel=3
+    )
+
+    if self_or_cls_type_annotation_pair is not None:
+        raise TypeError('`is_equal` and `self_or_cls_type_annotation_pair` are mutually exclusive')
+
+    return is_equal_or_none
+
+
+def class_definition_subtyping(
+    first_class_type_annotation_of_self_or_cls,
+    first_class_definition: ClassDefinition,
+    second_class_type_annotation_of_self_or_cls,
+    second_class_definition: ClassDefinition,
+    indent_level=0
+):
+    result, type_variable_subtyping_edge_tuple = class_definition_subtyping_with_edges(
+        first_class_type_annotation_of_self_or_cls,
+        first_class_definition,
+        second_class_type_annotation_of_self_or_cls,
+        second_class_definition,
+        indent_level
+    )
+    return result, create_type_variable_subtyping_digraph(type_variable_subtyping_edge_tuple)
+
+
+def function_definition_subtyping(
+    first_function_definition: FunctionDefinition,
+    second_function_definition: FunctionDefinition,
+    indent_level=0,
+    *,
+    self_or_cls_type_annotation_pair=None,
+    is_method=False,
+    is_equal=None
+):
+    result, type_variable_subtyping_edge_tuple = function_definition_subtyping_with_edges(
+        first_function_definition,
+        second_function_definition,
+        indent_level,
+        self_or_cls_type_annotation_pair=resolve_is_equal_keyword(self_or_cls_type_annotation_pair, is_equal),
+        is_method=is_method
+    )
+    return result, create_type_variable_subtyping_digraph(type_variable_subtyping_edge_tuple)
+
+
+def type_annotation_subtyping(
+    first_type_annotation,
+    second_type_annotation,
+    indent_level=0,
+    *,
+    self_or_cls_type_annotation_pair=None,
+    is_equal=None
+):
+    result, type_variable_subtyping_edge_tuple = type_annotation_subtyping_with_edges(
+        first_type_annotation,
+        second_type_annotation,
+        indent_level,
+        self_or_cls_type_annotation_pair=resolve_is_equal_keyword(self_or_cls_type_annotation_pair, is_equal)
+    )
+    return result, create_type_variable_subtyping_digraph(type_variable_subtyping_edge_tuple)
+
+
+# Returns a list of (result, type variable subtyping nx.DiGraph), in input order
+def type_annotation_subtyping_many(type_annotation_pair_iterable, indent_level=0) -> list:
+    return [
+        (result, create_type_variable_subtyping_digraph(type_variable_subtyping_edge_tuple))
+        for result, type_variable_subtyping_edge_tuple in type_annotation_subtyping_many_with_edges(type_annotation_pair_iterable, indent_level)
+    ]
+
+
+# new
+# The meet of `type_annotation_list` over the class hierarchy (see `type_lattice.py`), independent of the order of `type_annotation_list`
+def find_lowest_subtype_of_type_annotations_or_none(type_annotation_list):
+    return type_lattice.meet_type_annotations_or_none(type_annotation_list)
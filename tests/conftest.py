@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# The tests parse typeshed afresh instead of reading (or writing) the persistent cache
+os.environ.setdefault('TYPE_INFERENCE_FOR_PYTHON_PERSISTENT_CACHE', '0')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Tests using this fixture need the stubs of the installed `typeshed_client` to be parseable
+# (`parse_node_to_type_annotation` expects the `ast.Index` nodes of Python 3.8 and the stubs of `typeshed_client` 2.1)
+@pytest.fixture(scope='session')
+def typeshed():
+    from look_up import look_up_class
+    from type_annotation import ConcreteClass
+
+    try:
+        look_up_class(ConcreteClass('builtins', 'bool'))
+    except Exception as e:
+        pytest.skip(f'the installed typeshed stubs cannot be parsed: {type(e).__name__} {e}')
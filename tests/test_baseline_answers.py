@@ -0,0 +1,108 @@
+import pytest
+
+from look_up import look_up_class
+from subtyping import *
+from type_lattice import join_type_annotations_or_none, meet_type_annotations_or_none
+
+
+# The answers of the original (uncached, recursive) implementation of `type_annotation_subtyping` and `find_lowest_subtype_of_type_annotations_or_none`,
+# recorded on Python 3.8 with `typeshed_client` 2.1
+
+
+def builtin(class_name):
+    return ConcreteClass('builtins', class_name)
+
+
+def typing_(class_name):
+    return ConcreteClass('typing', class_name)
+
+
+def list_of(type_annotation):
+    return Subscription(builtin('list'), (type_annotation,))
+
+
+def iterable_of(type_annotation):
+    return Subscription(typing_('Iterable'), (type_annotation,))
+
+
+# The class table only orders classes it has seen, so all classes are looked up first
+@pytest.fixture(scope='module')
+def looked_up_classes(typeshed):
+    for concrete_class in (
+        builtin('object'), builtin('bool'), builtin('int'), builtin('float'), builtin('complex'), builtin('str'), builtin('bytes'),
+        builtin('list'), builtin('tuple'), builtin('dict'), builtin('set'), builtin('frozenset'), builtin('range'),
+        typing_('Sized'), typing_('Iterable'), typing_('Sequence'), typing_('MutableSequence'), typing_('Mapping'), typing_('MutableMapping'),
+        typing_('AbstractSet'), typing_('MutableSet'), typing_('SupportsInt'), typing_('SupportsAbs'),
+    ):
+        look_up_class(concrete_class)
+
+
+@pytest.mark.parametrize('first_type_annotation, second_type_annotation, expected_result', [
+    (builtin('bool'), builtin('int'), True),
+    (builtin('int'), builtin('bool'), False),
+    (builtin('int'), builtin('float'), False),
+    (builtin('int'), builtin('complex'), False),
+    (builtin('float'), builtin('complex'), False),
+    (builtin('int'), builtin('str'), False),
+    (builtin('str'), builtin('bytes'), False),
+    (builtin('bool'), builtin('object'), True),
+    (builtin('int'), builtin('object'), True),
+    (builtin('list'), typing_('Sized'), True),
+    (builtin('list'), typing_('Iterable'), True),
+    (builtin('dict'), typing_('Mapping'), True),
+    (builtin('int'), typing_('SupportsInt'), True),
+    (builtin('float'), typing_('SupportsInt'), True),
+    (builtin('int'), typing_('SupportsAbs'), True),
+    (builtin('set'), typing_('AbstractSet'), True),
+    (builtin('frozenset'), typing_('MutableSet'), False),
+    (builtin('tuple'), typing_('Sequence'), True),
+    (builtin('bytes'), typing_('Sequence'), True),
+    (builtin('range'), typing_('Sequence'), True),
+    (builtin('list'), typing_('MutableSequence'), True),
+    (builtin('tuple'), typing_('MutableSequence'), False),
+    (builtin('dict'), typing_('MutableMapping'), True),
+    (list_of(builtin('int')), iterable_of(builtin('int')), True),
+    (list_of(builtin('int')), iterable_of(builtin('str')), False),
+    (list_of(builtin('int')), list_of(builtin('int')), True),
+    (list_of(builtin('bool')), list_of(builtin('int')), False),
+])
+def test_subtyping_as_baseline(looked_up_classes, first_type_annotation, second_type_annotation, expected_result):
+    assert type_annotation_subtyping(first_type_annotation, second_type_annotation)[0] == expected_result
+
+
+# Answers fixed on purpose
+@pytest.mark.parametrize('first_type_annotation, second_type_annotation, expected_result, baseline_result', [
+    # `str` is a `Sequence[str]`
+    (builtin('str'), typing_('Sequence'), True, False),
+    # `str` has no `__int__`
+    (builtin('str'), typing_('SupportsInt'), False, True),
+])
+def test_subtyping_fixed_since_baseline(looked_up_classes, first_type_annotation, second_type_annotation, expected_result, baseline_result):
+    assert type_annotation_subtyping(first_type_annotation, second_type_annotation)[0] == expected_result != baseline_result
+
+
+@pytest.mark.parametrize('type_annotation_list, expected_meet', [
+    ([builtin('int'), builtin('bool')], builtin('bool')),
+    ([builtin('bool'), builtin('int')], builtin('bool')),
+    ([list_of(builtin('int')), iterable_of(builtin('int'))], list_of(builtin('int'))),
+    # Fixed on purpose: the original implementation returned `Sized`, which is not a subtype of `list`
+    ([builtin('list'), typing_('Sized')], builtin('list')),
+])
+def test_meet_as_baseline(looked_up_classes, type_annotation_list, expected_meet):
+    assert find_lowest_subtype_of_type_annotations_or_none(type_annotation_list) == expected_meet
+    assert meet_type_annotations_or_none(type_annotation_list) == expected_meet
+
+
+# The original implementation had no join; joins are upper bounds of all type annotations, and the lowest of the candidates
+@pytest.mark.parametrize('type_annotation_list, expected_join', [
+    ([builtin('int'), builtin('bool')], builtin('int')),
+    ([builtin('bool'), builtin('int')], builtin('int')),
+    ([builtin('int'), builtin('str')], builtin('object')),
+    ([list_of(builtin('int')), iterable_of(builtin('int'))], iterable_of(builtin('int'))),
+    ([builtin('list'), typing_('Sized')], typing_('Sized')),
+])
+def test_join(looked_up_classes, type_annotation_list, expected_join):
+    join = join_type_annotations_or_none(type_annotation_list)
+
+    assert join == expected_join
+    assert all(type_annotation_subtyping(type_annotation, join)[0] for type_annotation in type_annotation_list)
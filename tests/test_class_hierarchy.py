@@ -0,0 +1,55 @@
+from class_hierarchy import *
+from type_annotation import ConcreteClass
+
+
+MODULE_NAME = '_test_class_hierarchy'
+
+
+def test_ancestor_bitset_is_recomputed_when_bases_are_added():
+    a, b, c, d = (ConcreteClass(MODULE_NAME, name) for name in ('A', 'B', 'C', 'D'))
+
+    add_base_classes(b, (a,))
+    add_base_classes(c, (b,))
+
+    assert is_nominal_subclass(c, a)
+    assert not is_nominal_subclass(c, d)
+
+    # Adding a base to an ancestor invalidates the bitsets of its descendants
+    add_base_classes(a, (d,))
+
+    assert is_nominal_subclass(c, d)
+    assert is_nominal_subclass(b, d)
+    assert not is_nominal_subclass(d, a)
+
+
+def test_adding_bases_only_invalidates_descendants():
+    e, f, g = (ConcreteClass(MODULE_NAME, name) for name in ('E', 'F', 'G'))
+
+    add_base_classes(f, (e,))
+    f_ancestor_bitset = get_ancestor_bitset(get_class_id(f))
+
+    add_base_classes(g, (e,))
+
+    assert class_id_to_ancestor_bitset_or_none_list[get_class_id(f)] == f_ancestor_bitset
+
+
+def test_cyclic_bases_terminate():
+    h, i = (ConcreteClass(MODULE_NAME, name) for name in ('H', 'I'))
+
+    add_base_classes(h, (i,))
+    add_base_classes(i, (h,))
+
+    # Malformed stubs must not hang the traversal
+    assert is_nominal_subclass(h, i)
+
+
+def test_implicit_object_base(typeshed):
+    # The example in the module docstring
+    assert is_nominal_subclass(ConcreteClass('builtins', 'bool'), ConcreteClass('builtins', 'int'))
+    assert list(iterate_ancestor_classes(ConcreteClass('builtins', 'bool'))) == [
+        ConcreteClass('builtins', 'bool'),
+        ConcreteClass('builtins', 'int'),
+        ConcreteClass('builtins', 'object')
+    ]
+    assert ConcreteClass('builtins', 'object') in iterate_base_classes(ConcreteClass('builtins', 'int'))
+    assert list(iterate_base_classes(ConcreteClass('builtins', 'object'))) == []
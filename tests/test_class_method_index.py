@@ -0,0 +1,35 @@
+from class_method_index import *
+
+
+def test_class_method_index(tmp_path):
+    concrete_class_list = [ConcreteClass('test_class_method_index', class_name) for class_name in ('Sized', 'Sequence', 'List')]
+    method_name_set_list = [
+        {'__len__'},
+        {'__len__', '__getitem__'},
+        {'__len__', '__getitem__', 'append'},
+    ]
+
+    class_method_index = create_class_method_index(concrete_class_list, method_name_set_list)
+
+    # Ranked by the number of methods (fewest first)
+    assert get_classes_with_methods(class_method_index, ['__len__']) == concrete_class_list
+    assert get_classes_with_methods(class_method_index, ['__getitem__', '__len__']) == concrete_class_list[1:]
+    assert get_classes_with_methods(class_method_index, ['append']) == concrete_class_list[2:]
+    assert get_classes_with_methods(class_method_index, ['append', 'pop']) == []
+    assert get_classes_with_methods(class_method_index, []) == concrete_class_list
+
+    file_path = str(tmp_path / 'class_method_index.npz')
+    save_class_method_index(class_method_index, file_path)
+    loaded_class_method_index = load_class_method_index(file_path)
+
+    assert loaded_class_method_index.concrete_class_list == concrete_class_list
+    assert get_classes_with_methods(loaded_class_method_index, ['__getitem__']) == concrete_class_list[1:]
+
+
+def test_build_class_method_index(typeshed):
+    concrete_class_list = [ConcreteClass('builtins', class_name) for class_name in ('int', 'list', 'dict')]
+
+    class_method_index = build_class_method_index(concrete_class_list)
+
+    assert get_classes_with_methods(class_method_index, ['__getitem__', 'append']) == [ConcreteClass('builtins', 'list')]
+    assert set(get_classes_with_methods(class_method_index, ['__len__'])) == {ConcreteClass('builtins', 'list'), ConcreteClass('builtins', 'dict')}
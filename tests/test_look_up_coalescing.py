@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from look_up_coalescing import *
+
+
+# Concurrent misses of the same key compute the value once
+def test_concurrent_misses_are_coalesced():
+    cache_dict = dict()
+    number_of_computations_list = [0]
+    computing = threading.Event()
+    release = threading.Event()
+
+    def compute_value():
+        number_of_computations_list[0] += 1
+        computing.set()
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(8) as executor:
+        future_list = [executor.submit(coalesce_look_up, cache_dict, ('test', 'key'), compute_value)]
+        computing.wait(5)
+        future_list.extend(executor.submit(coalesce_look_up, cache_dict, ('test', 'key'), compute_value) for _ in range(7))
+        release.set()
+        value_list = [future.result(5) for future in future_list]
+
+    assert number_of_computations_list[0] == 1
+    assert all(value is value_list[0] for value in value_list)
+    assert cache_dict[('test', 'key')] is value_list[0]
+
+
+# A recursive lookup of an in-flight key gets its placeholder, which is never cached
+def test_recursive_look_up_gets_placeholder():
+    cache_dict = dict()
+    placeholder = object()
+    recursive_value_list = list()
+
+    def compute_value():
+        recursive_value_list.append(coalesce_look_up(cache_dict, 'recursive', compute_value, placeholder))
+        return 'value'
+
+    assert coalesce_look_up(cache_dict, 'recursive', compute_value, placeholder) == 'value'
+    assert recursive_value_list == [placeholder]
+    assert cache_dict == {'recursive': 'value'}
+
+
+# Failures are not cached, and waiting threads get the exception
+def test_failures_are_not_cached():
+    cache_dict = dict()
+
+    def compute_value():
+        raise ValueError('failed')
+
+    with pytest.raises(ValueError):
+        coalesce_look_up(cache_dict, 'failing', compute_value)
+
+    assert 'failing' not in cache_dict
+    assert 'failing' not in cache_key_to_in_flight_look_up_dict
+    assert coalesce_look_up(cache_dict, 'failing', lambda: 'value') == 'value'
+
+
+def test_cache_dict_key():
+    cache_dict = {'key': 'cached'}
+
+    assert coalesce_look_up(cache_dict, ('test_cache_dict_key', 'key'), lambda: 'computed', cache_dict_key='key') == 'cached'
@@ -0,0 +1,70 @@
+from memo_table import *
+
+
+def test_lru_eviction():
+    memo_table = MemoTable('test_lru_eviction', 2)
+
+    memo_table.put('a', 1)
+    memo_table.put('b', 2)
+    assert memo_table.get('a') == 1
+    memo_table.put('c', 3)
+
+    # 'b' was the least recently used
+    assert 'b' not in memo_table
+    assert memo_table.get('b') is None
+    assert memo_table.get('a') == 1 and memo_table.get('c') == 3
+
+    statistics = get_memo_table_statistics(memo_table)
+    assert statistics['hits'] == 3
+    assert statistics['misses'] == 1
+    assert statistics['evictions'] == 1
+    assert statistics['number_of_entries'] == 2
+    assert statistics['hit_ratio'] == 0.75
+
+
+def test_configure_memo_table():
+    memo_table = MemoTable('test_configure_memo_table', 4)
+
+    for key in range(4):
+        memo_table.put(key, key)
+
+    configure_memo_table(memo_table, maximum_size=1)
+
+    assert len(memo_table) == 1
+    assert 3 in memo_table
+    assert get_memo_table_statistics(memo_table)['evictions'] == 3
+
+
+def test_memo_table_scope():
+    memo_table = MemoTable('test_memo_table_scope', 16)
+
+    memo_table.put('outside', 0)
+
+    with memo_table_scope(memo_table):
+        memo_table.put('outer', 1)
+
+        with memo_table_scope(memo_table):
+            memo_table.put('inner', 2)
+
+        assert 'inner' not in memo_table
+        assert 'outer' in memo_table
+
+    assert 'outer' not in memo_table
+    assert 'outside' in memo_table
+    assert not memo_table.scope_key_set_list
+
+
+def test_clear_memo_table():
+    memo_table = MemoTable('test_clear_memo_table', 16)
+
+    memo_table.put('a', 1)
+    memo_table.get('a')
+    clear_memo_table(memo_table, reset_counters=False)
+
+    assert len(memo_table) == 0
+    assert get_memo_table_statistics(memo_table)['hits'] == 1
+
+    clear_memo_table(memo_table)
+
+    assert get_memo_table_statistics(memo_table)['hits'] == 0
+    assert get_memo_table_statistics(memo_table)['hit_ratio'] is None
@@ -0,0 +1,51 @@
+import pytest
+
+from look_up import look_up_class
+from overload_index import *
+from type_annotation import ConcreteClass
+
+
+def get_method_list(class_name, method_name):
+    return look_up_class(ConcreteClass('builtins', class_name)).method_name_to_method_list_dict[method_name]
+
+
+# The indices kept by the check `create_satisfying_method` used to rely on alone
+def get_overload_indices_with_enough_parameters(method_list, number_of_parameters):
+    return [i for i, method in enumerate(method_list) if len(method.parameter_type_annotation_list) >= number_of_parameters]
+
+
+# dict.get(self, __key) and dict.get(self, __key, __default)
+@pytest.mark.parametrize('number_of_positional_arguments, expected_overload_index_list, expected_overload_index_list_with_enough_parameters', [
+    # Overloads with more required parameters than observed are dropped, unlike by the length check
+    (1, [], [0, 1]),
+    (2, [0], [0, 1]),
+    (3, [1], [1]),
+    (4, [], []),
+])
+def test_dict_get(typeshed, number_of_positional_arguments, expected_overload_index_list, expected_overload_index_list_with_enough_parameters):
+    method_list = get_method_list('dict', 'get')
+
+    assert get_compatible_overload_indices(get_overload_index(method_list), number_of_positional_arguments) == expected_overload_index_list
+    assert get_overload_indices_with_enough_parameters(method_list, number_of_positional_arguments) == expected_overload_index_list_with_enough_parameters
+
+
+# str.split(self, sep=..., maxsplit=...), twice
+@pytest.mark.parametrize('number_of_positional_arguments, keyword_name_tuple, expected_overload_index_list', [
+    (1, (), [0, 1]),
+    (2, (), [0, 1]),
+    (3, (), [0, 1]),
+    (4, (), []),
+    (1, ('sep', 'maxsplit'), [0, 1]),
+    (2, ('sep',), []),
+    (1, ('separator',), []),
+])
+def test_str_split(typeshed, number_of_positional_arguments, keyword_name_tuple, expected_overload_index_list):
+    method_list = get_method_list('str', 'split')
+
+    assert get_compatible_overload_indices(get_overload_index(method_list), number_of_positional_arguments, keyword_name_tuple) == expected_overload_index_list
+
+
+def test_overload_index_is_cached(typeshed):
+    method_list = get_method_list('dict', 'get')
+
+    assert get_overload_index(method_list) is get_overload_index(method_list)
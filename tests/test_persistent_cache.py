@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from look_up import collect_module_entries, look_up_class
+import persistent_cache
+from persistent_cache import *
+from type_annotation import ConcreteClass
+
+
+@pytest.fixture
+def enabled_persistent_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(persistent_cache, 'PERSISTENT_CACHE_ENABLED', True)
+    monkeypatch.setattr(persistent_cache, 'PERSISTENT_CACHE_DIRECTORY', str(tmp_path))
+    return tmp_path
+
+
+def test_disabled_by_default():
+    assert not PERSISTENT_CACHE_ENABLED
+
+
+def test_version_directory_is_keyed_on_the_interpreter(enabled_persistent_cache):
+    version_directory = persistent_cache_version_directory()
+
+    assert version_directory.startswith(str(enabled_persistent_cache))
+    assert f'v{PERSISTENT_CACHE_FORMAT_VERSION}' in version_directory.split(os.sep)
+    assert INTERPRETER_CACHE_TAG in version_directory.split(os.sep)
+
+
+def test_round_trip(typeshed, enabled_persistent_cache):
+    look_up_class(ConcreteClass('builtins', 'int'))
+    module_entries = collect_module_entries('builtins')
+
+    assert load_module_entries_from_persistent_cache('builtins') is None
+
+    save_module_entries_to_persistent_cache('builtins', module_entries)
+    loaded_module_entries = load_module_entries_from_persistent_cache('builtins')
+
+    assert set(loaded_module_entries['concrete_class_to_class_definition_dict']) == set(module_entries['concrete_class_to_class_definition_dict'])
+    assert loaded_module_entries['class_inheritance_edge_list'] == module_entries['class_inheritance_edge_list']
+
+    invalidate_persistent_cache('builtins')
+
+    assert load_module_entries_from_persistent_cache('builtins') is None
+
+
+# A corrupted file is a miss, and is removed
+def test_corrupted_file(typeshed, enabled_persistent_cache):
+    file_path = persistent_cache_file_path_or_none('builtins')
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as file:
+        file.write(b'not a pickle')
+
+    assert load_module_entries_from_persistent_cache('builtins') is None
+    assert not os.path.exists(file_path)
+
+
+def test_disabled_persistent_cache_is_not_written(typeshed, monkeypatch, tmp_path):
+    monkeypatch.setattr(persistent_cache, 'PERSISTENT_CACHE_DIRECTORY', str(tmp_path))
+
+    save_module_entries_to_persistent_cache('builtins', collect_module_entries('builtins'))
+
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,50 @@
+import pytest
+
+from memo_table import clear_memo_table
+import protocol_conformance
+from protocol_conformance import *
+from subtyping import TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, type_annotation_subtyping_with_edges
+
+
+@pytest.fixture
+def protocol_conformance_table(typeshed, monkeypatch):
+    monkeypatch.setattr(protocol_conformance, 'CONCRETE_CLASS_LIST', [ConcreteClass('builtins', 'bytearray'), ConcreteClass('builtins', 'int')])
+    monkeypatch.setattr(protocol_conformance, 'PROTOCOL_NAME_LIST', ['Iterable', 'Sized'])
+    monkeypatch.setattr(protocol_conformance, 'concrete_class_pair_to_protocol_conformance_dict_or_none', dict())
+
+    concrete_class_pair_to_protocol_conformance_dict, error_list = build_protocol_conformance_table(type_annotation_subtyping_with_edges)
+    assert not error_list
+
+    install_protocol_conformance_table(concrete_class_pair_to_protocol_conformance_dict)
+    clear_memo_table(TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, reset_counters=False)
+    yield concrete_class_pair_to_protocol_conformance_dict
+    clear_memo_table(TYPE_ANNOTATION_SUBTYPING_MEMO_TABLE, reset_counters=False)
+
+
+def test_table(protocol_conformance_table):
+    iterable, sized = ConcreteClass('typing', 'Iterable'), ConcreteClass('typing', 'Sized')
+
+    assert protocol_conformance_table[(ConcreteClass('builtins', 'bytearray'), iterable)].result
+    assert protocol_conformance_table[(ConcreteClass('builtins', 'bytearray'), sized)].result
+    assert not protocol_conformance_table[(ConcreteClass('builtins', 'int'), iterable)].result
+
+
+# The recorded type variables are renamed to those of the query
+def test_look_up_renames_type_variables(protocol_conformance_table):
+    type_variable = TypeVariable()
+
+    result, type_variable_subtyping_edge_tuple = look_up_protocol_conformance_or_none(
+        ConcreteClass('builtins', 'bytearray'),
+        Subscription(ConcreteClass('typing', 'Iterable'), (type_variable,))
+    )
+
+    assert result
+    assert (ConcreteClass('builtins', 'int'), type_variable) in type_variable_subtyping_edge_tuple
+
+
+# Only queries whose type arguments are all distinct type variables are answered
+def test_look_up_of_other_queries(protocol_conformance_table):
+    type_variable = TypeVariable()
+
+    assert look_up_protocol_conformance_or_none(ConcreteClass('builtins', 'bytearray'), Subscription(ConcreteClass('typing', 'Iterable'), (ConcreteClass('builtins', 'int'),))) is None
+    assert look_up_protocol_conformance_or_none(ConcreteClass('builtins', 'list'), Subscription(ConcreteClass('typing', 'Iterable'), (type_variable,))) is None
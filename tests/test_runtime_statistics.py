@@ -0,0 +1,71 @@
+import pytest
+
+import runtime_statistics
+from runtime_statistics import *
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(runtime_statistics, 'RUNTIME_STATISTICS_ENABLED', True)
+    yield
+    for function_name in [function_name for function_name in function_name_to_function_statistics_dict if function_name.startswith('test_')]:
+        del function_name_to_function_statistics_dict[function_name]
+
+
+def test_disabled_instrumentation_returns_function_itself(monkeypatch):
+    monkeypatch.setattr(runtime_statistics, 'RUNTIME_STATISTICS_ENABLED', False)
+
+    def function():
+        pass
+
+    generator = iter(())
+
+    assert instrumented(function) is function
+    assert instrumented_steps_as('test_disabled', generator) is generator
+
+
+def test_recursive_calls(enabled):
+    @instrumented_as('test_factorial')
+    def factorial(n):
+        record_cache_miss('test_factorial')
+        return 1 if n <= 1 else n * factorial(n - 1)
+
+    assert factorial(5) == 120
+
+    statistics = get_runtime_statistics()['function_name_to_statistics_dict']['test_factorial']
+    assert statistics['number_of_calls'] == 5
+    assert statistics['number_of_cache_misses'] == 5
+    assert statistics['cache_hit_ratio'] == 0.0
+    # Cumulative time counts the outermost call once
+    assert statistics['cumulative_time'] > 0.0
+    assert statistics['self_time'] > 0.0
+
+
+def test_instrumented_steps(enabled):
+    def steps():
+        received = yield 1
+        return received + 1
+
+    generator = instrumented_steps_as('test_steps', steps())
+
+    assert next(generator) == 1
+    with pytest.raises(StopIteration) as stop_iteration:
+        generator.send(41)
+    assert stop_iteration.value.value == 42
+
+    assert get_runtime_statistics()['function_name_to_statistics_dict']['test_steps']['number_of_calls'] == 1
+
+
+def test_cache_sizes_and_reset(enabled):
+    register_cache_size_function('test_cache', lambda: 3)
+    record_cache_hit('test_hits')
+
+    runtime_statistics_dict = get_runtime_statistics()
+    assert runtime_statistics_dict['cache_name_to_cache_size_dict']['test_cache'] == 3
+    assert runtime_statistics_dict['function_name_to_statistics_dict']['test_hits']['cache_hit_ratio'] == 1.0
+
+    reset_runtime_statistics()
+
+    assert get_runtime_statistics()['function_name_to_statistics_dict']['test_hits']['number_of_cache_hits'] == 0
+
+    del runtime_statistics.cache_name_to_cache_size_function_dict['test_cache']
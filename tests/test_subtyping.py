@@ -0,0 +1,101 @@
+import pytest
+
+from subtyping import *
+
+
+def builtin(class_name):
+    return ConcreteClass('builtins', class_name)
+
+
+def typing_(class_name):
+    return ConcreteClass('typing', class_name)
+
+
+@pytest.mark.parametrize('first_type_annotation, second_type_annotation, expected_result', [
+    # Regressions: `object` is an ancestor of every class
+    (builtin('int'), builtin('object'), True),
+    (builtin('list'), builtin('object'), True),
+    (typing_('Iterable'), builtin('object'), True),
+    # Regression: used to walk `complex` structurally and assert on `Union[...] <: object`
+    (builtin('bool'), builtin('complex'), False),
+    (builtin('bool'), builtin('int'), True),
+    (builtin('int'), builtin('bool'), False),
+    (builtin('int'), builtin('str'), False),
+    # Protocols are compared structurally
+    (builtin('int'), typing_('SupportsInt'), True),
+    (builtin('str'), typing_('SupportsInt'), False),
+    # `typing_extensions.Protocol` does not resolve to a class, so protocols are recognized by their `class` statements
+    (builtin('int'), ConcreteClass('typing_extensions', 'SupportsIndex'), True),
+])
+def test_concrete_class_subtyping(typeshed, first_type_annotation, second_type_annotation, expected_result):
+    assert type_annotation_subtyping(first_type_annotation, second_type_annotation)[0] == expected_result
+
+
+def test_union_subtyping(typeshed):
+    int_or_bool = create_union_type_annotation([builtin('int'), builtin('bool')])
+    int_or_str = create_union_type_annotation([builtin('int'), builtin('str')])
+
+    # A `Union` is a subtype if all of its elements are
+    assert type_annotation_subtyping(int_or_bool, builtin('int'))[0]
+    assert not type_annotation_subtyping(int_or_str, builtin('int'))[0]
+    assert type_annotation_subtyping(int_or_str, builtin('object'))[0]
+
+    # A `Union` is a supertype if any of its elements is
+    assert type_annotation_subtyping(builtin('bool'), int_or_str)[0]
+    assert not type_annotation_subtyping(builtin('float'), int_or_str)[0]
+
+    assert type_annotation_subtyping(int_or_bool, int_or_str)[0]
+    assert not type_annotation_subtyping(int_or_str, int_or_bool)[0]
+
+
+# The baseline assigned the (result, digraph) tuple of `class_definition_subtyping` to `result` in the structural `ConcreteClass` path,
+# so any two classes it compared structurally were subtypes
+@pytest.mark.parametrize('first_type_annotation, second_type_annotation, expected_result', [
+    (builtin('int'), typing_('Iterable'), False),
+    (builtin('str'), typing_('Mapping'), False),
+    (builtin('str'), typing_('Iterable'), True),
+    (builtin('list'), typing_('Sized'), True),
+])
+def test_structural_concrete_class_subtyping(typeshed, first_type_annotation, second_type_annotation, expected_result):
+    assert type_annotation_subtyping(first_type_annotation, second_type_annotation)[0] == expected_result
+
+
+@pytest.mark.parametrize('type_annotation', [
+    builtin('int'),
+    Subscription(builtin('list'), (builtin('int'),)),
+    create_union_type_annotation([builtin('int'), builtin('str')]),
+])
+def test_any_is_top_and_bottom(typeshed, type_annotation):
+    assert type_annotation_subtyping(type_annotation, typing_('Any'))[0]
+    assert type_annotation_subtyping(typing_('Any'), type_annotation)[0]
+
+
+def test_any_parameters(typeshed):
+    # `Sequence.index(value: Any)` accepts `list.index(value: bool)`
+    assert type_annotation_subtyping(Subscription(builtin('list'), (builtin('bool'),)), Subscription(typing_('Sequence'), (builtin('int'),)))[0]
+    assert not type_annotation_subtyping(Subscription(builtin('list'), (builtin('int'),)), Subscription(typing_('Mapping'), (builtin('int'), builtin('int'))))[0]
+
+
+# The deprecated `is_equal` keyword of the baseline API
+def test_is_equal_keyword():
+    first_class = ConcreteClass('test_subtyping', 'First')
+    second_class = ConcreteClass('test_subtyping', 'Second')
+    none_type = builtin('NoneType')
+
+    def is_equal(first_type_annotation, second_type_annotation):
+        return first_type_annotation == second_type_annotation or (first_type_annotation, second_type_annotation) == (first_class, second_class)
+
+    with pytest.warns(DeprecationWarning):
+        assert type_annotation_subtyping(first_class, second_class, is_equal=is_equal)[0]
+
+    first_function_definition = FunctionDefinition([], [second_class], none_type, dict(), none_type, first_class)
+    second_function_definition = FunctionDefinition([], [first_class], none_type, dict(), none_type, second_class)
+
+    with pytest.warns(DeprecationWarning):
+        assert function_definition_subtyping(first_function_definition, second_function_definition, is_equal=is_equal)[0]
+
+    # The same as the pair of `self` or `cls` types
+    assert type_annotation_subtyping(first_class, second_class, self_or_cls_type_annotation_pair=(first_class, second_class))[0]
+
+    with pytest.raises(TypeError), pytest.warns(DeprecationWarning):
+        type_annotation_subtyping(first_class, second_class, self_or_cls_type_annotation_pair=(first_class, second_class), is_equal=is_equal)
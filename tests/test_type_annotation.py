@@ -0,0 +1,48 @@
+import ast
+import pickle
+
+import pytest
+
+from look_up import parse_node_to_type_annotation
+from type_annotation import *
+
+
+def builtin(class_name):
+    return ConcreteClass('builtins', class_name)
+
+
+def test_union_canonical_order():
+    assert create_union_type_annotation([builtin('str'), builtin('int')]) is create_union_type_annotation([builtin('int'), builtin('str')])
+    assert create_union_type_annotation([builtin('int'), create_union_type_annotation([builtin('str'), builtin('int')])]) is create_union_type_annotation([builtin('str'), builtin('int')])
+    assert create_union_type_annotation([builtin('int'), builtin('int')]) is builtin('int')
+
+
+# `TypeVariable`'s keep the order they are first seen in, which is the same in every process
+def test_union_type_variable_order():
+    first_type_variable = TypeVariable()
+    second_type_variable = TypeVariable()
+
+    union = create_union_type_annotation([second_type_variable, builtin('int'), first_type_variable])
+
+    assert union.element_tuple == (builtin('int'), second_type_variable, first_type_variable)
+
+    unpickled_union = pickle.loads(pickle.dumps(union))
+    assert unpickled_union.element_tuple[0] is builtin('int')
+    assert all(isinstance(element, TypeVariable) for element in unpickled_union.element_tuple[1:])
+
+
+def test_canonical_sort_key_of_unknown_element():
+    with pytest.raises(TypeError):
+        get_canonical_sort_key(object())
+
+
+# The elements of a `Union` spliced into the type arguments of a `Subscription` are in source order
+@pytest.mark.parametrize('source, expected_type_annotation_tuple', [
+    ('Callable[[str | int, bytes], bool]', (builtin('str'), builtin('int'), builtin('bytes'), builtin('bool'))),
+    ('dict[str | int, bytes | bool]', (builtin('str'), builtin('int'), builtin('bytes'), builtin('bool'))),
+    ('tuple[str | int, float]', (builtin('str'), builtin('int'), builtin('float'))),
+])
+def test_subscription_type_arguments_in_source_order(typeshed, source, expected_type_annotation_tuple):
+    subscription = parse_node_to_type_annotation('builtins', ast.parse(source, mode='eval').body)
+
+    assert subscription.type_annotation_tuple == expected_type_annotation_tuple
@@ -0,0 +1,36 @@
+from look_up import look_up_class, look_up_global_function, save_type_database
+from type_annotation import *
+from type_database import open_type_database_or_none
+
+
+def test_round_trip(typeshed, tmp_path):
+    int_class_definition = look_up_class(ConcreteClass('builtins', 'int'))
+    len_function_definition_list = look_up_global_function(GlobalFunction('builtins', 'len'))
+
+    file_path = str(tmp_path / 'typeshed.tifdb')
+    save_type_database(file_path)
+
+    type_database = open_type_database_or_none(file_path)
+    assert type_database is not None
+
+    try:
+        class_definition, base_class_list = type_database.look_up_class_or_none(ConcreteClass('builtins', 'int'))
+
+        assert base_class_list == [ConcreteClass('builtins', 'object')]
+        assert set(class_definition.method_name_to_method_list_dict) == set(int_class_definition.method_name_to_method_list_dict)
+        assert class_definition.method_name_to_method_list_dict['__add__'] == int_class_definition.method_name_to_method_list_dict['__add__']
+
+        assert type_database.look_up_global_function_or_none(GlobalFunction('builtins', 'len')) == len_function_definition_list
+        assert type_database.look_up_name_or_none('builtins', 'int') == (ConcreteClass('builtins', 'int'), Kind.CLASS_DEFINITION)
+
+        assert type_database.look_up_class_or_none(ConcreteClass('builtins', 'NotAClass')) is None
+        assert type_database.look_up_class_or_none(ConcreteClass('not_a_module', 'int')) is None
+    finally:
+        type_database.close()
+
+
+def test_incompatible_file_is_ignored(tmp_path):
+    file_path = tmp_path / 'typeshed.tifdb'
+    file_path.write_bytes(b'\0' * 4096)
+
+    assert open_type_database_or_none(str(file_path)) is None
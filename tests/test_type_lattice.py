@@ -0,0 +1,102 @@
+import pytest
+
+import benchmark
+from class_definition import ClassDefinition
+from class_hierarchy import add_base_classes
+from function_definition import FunctionDefinition
+import look_up
+import subtyping
+import type_lattice
+from type_annotation import *
+from type_lattice import *
+
+
+def builtin(class_name):
+    return ConcreteClass('builtins', class_name)
+
+
+def fail_structurally(type_annotation_list, indent_level=0):
+    pytest.fail(f'{type_annotation_list} was not ordered by the class table')
+
+
+# The examples in the module docstring, which are answered by the class table alone
+def test_docstring_examples(typeshed, monkeypatch):
+    for class_name in ('bool', 'int', 'str'):
+        look_up.look_up_class(builtin(class_name))
+
+    monkeypatch.setattr(type_lattice, 'meet_type_annotations_structurally', fail_structurally)
+    monkeypatch.setattr(type_lattice, 'join_type_annotations_structurally', fail_structurally)
+
+    assert meet_type_annotations_or_none([builtin('int'), builtin('bool'), builtin('object')]) == builtin('bool')
+    assert join_type_annotations_or_none([builtin('bool'), builtin('str')]) == builtin('object')
+    assert join_type_annotations_or_none([builtin('bool'), builtin('int')]) == builtin('int')
+
+
+def test_order_independence(typeshed):
+    type_annotation_list = [builtin('object'), builtin('bool'), builtin('int')]
+
+    assert meet_type_annotations_or_none(type_annotation_list) == meet_type_annotations_or_none(type_annotation_list[::-1]) == builtin('bool')
+    assert join_type_annotations_or_none(type_annotation_list) == join_type_annotations_or_none(type_annotation_list[::-1]) == builtin('object')
+
+
+def test_type_variables_and_empty_lists():
+    type_variable = TypeVariable()
+
+    assert meet_type_annotations_or_none([]) is None
+    assert join_type_annotations_or_none([]) is None
+    assert meet_type_annotations_or_none([builtin('int'), type_variable]) is type_variable
+    assert join_type_annotations_or_none([type_variable, builtin('int')]) is type_variable
+
+
+# G[T] is invariant in T, so combining the type arguments of G[A] and G[B] component-wise is unsound
+def test_invariant_subscriptions_are_not_combined():
+    none_type_annotation = type_annotation_from_instance(None)
+
+    def method_list(parameter_type_annotation_list, return_value_type_annotation):
+        return [
+            FunctionDefinition(
+                type_variable_list=[],
+                parameter_type_annotation_list=parameter_type_annotation_list,
+                vararg_type_annotation=none_type_annotation,
+                kwonlyargs_name_to_type_annotation_dict=dict(),
+                kwarg_type_annotation=none_type_annotation,
+                return_value_type_annotation=return_value_type_annotation
+            )
+        ]
+
+    def class_definition(type_variable_list, method_name_to_method_list_dict):
+        return ClassDefinition(
+            type_variable_list=type_variable_list,
+            method_name_to_method_list_dict=method_name_to_method_list_dict,
+            staticmethod_name_to_staticmethod_list_dict=dict(),
+            property_name_to_property_type_annotation_dict=dict()
+        )
+
+    a, b, g = (ConcreteClass(benchmark.BENCHMARK_MODULE_NAME, class_name) for class_name in ('LatticeA', 'LatticeB', 'LatticeG'))
+    type_variable = TypeVariable()
+
+    look_up.concrete_class_to_class_definition_dict[b] = class_definition([], {'b': method_list([b], b)})
+    look_up.concrete_class_to_class_definition_dict[a] = class_definition([], {'a': method_list([a], a), 'b': method_list([a], b)})
+    look_up.concrete_class_to_class_definition_dict[g] = class_definition([type_variable], {'m': method_list([Subscription(g, (type_variable,)), type_variable], type_variable)})
+    add_base_classes(a, (b,))
+
+    g_of_a, g_of_b = Subscription(g, (a,)), Subscription(g, (b,))
+
+    assert meet_type_annotations_or_none([a, b]) == a
+    assert join_type_annotations_or_none([a, b]) == b
+    assert not subtyping.type_annotation_subtyping_with_edges(g_of_a, g_of_b)[0]
+
+    # Not G[B], which is not a supertype of G[A]
+    join = join_type_annotations_or_none([g_of_a, g_of_b])
+    assert all(subtyping.type_annotation_subtyping_with_edges(type_annotation, join)[0] for type_annotation in (g_of_a, g_of_b))
+
+
+# The join is the `Subscription` of the least common ancestor, not the bare class
+def test_join_keeps_type_arguments_of_least_common_ancestor(typeshed):
+    for concrete_class in (builtin('list'), ConcreteClass('typing', 'Iterable')):
+        look_up.look_up_class(concrete_class)
+
+    list_of_int = Subscription(builtin('list'), (builtin('int'),))
+    iterable_of_int = Subscription(ConcreteClass('typing', 'Iterable'), (builtin('int'),))
+
+    assert join_type_annotations_or_none([list_of_int, iterable_of_int]) == join_type_annotations_or_none([iterable_of_int, list_of_int]) == iterable_of_int
@@ -0,0 +1,68 @@
+"""
+Leveled tracing of the type inference.
+
+Trace points pass a %-style format string and its arguments instead of an f-string,
+so that nothing (in particular, no `repr` of a large `ClassDefinition`) is formatted unless the trace level is enabled.
+A disabled trace point costs a function call and an integer comparison.
+
+The trace level defaults to `TRACE_LEVEL_OFF` and can be set with the environment variable `TYPE_INFERENCE_FOR_PYTHON_TRACE_LEVEL` (`DEBUG`, `INFO` or `OFF`).
+
+```python
+In [1]: from tracing import *
+
+In [2]: set_trace_level(TRACE_LEVEL_DEBUG)
+
+In [3]: from look_up import *
+
+In [4]: look_up_class(ConcreteClass('builtins', 'int'))
+ look_up_class ConcreteClass(module_name='builtins', class_name='int')
+ cache miss
+...
+
+In [5]: set_trace_level(TRACE_LEVEL_OFF)
+```
+"""
+
+import os
+import sys
+
+
+TRACE_LEVEL_DEBUG = 10
+TRACE_LEVEL_INFO = 20
+TRACE_LEVEL_OFF = 100
+
+TRACE_LEVEL_NAME_TO_TRACE_LEVEL_DICT = {
+    'DEBUG': TRACE_LEVEL_DEBUG,
+    'INFO': TRACE_LEVEL_INFO,
+    'OFF': TRACE_LEVEL_OFF
+}
+
+TRACE_LEVEL = TRACE_LEVEL_NAME_TO_TRACE_LEVEL_DICT[os.environ.get('TYPE_INFERENCE_FOR_PYTHON_TRACE_LEVEL', 'OFF').upper()]
+
+# None means `sys.stderr` at the time of tracing (so that `contextlib.redirect_stderr` works)
+TRACE_FILE = None
+
+
+def set_trace_level(trace_level, trace_file=None):
+    global TRACE_LEVEL, TRACE_FILE
+
+    if isinstance(trace_level, str):
+        trace_level = TRACE_LEVEL_NAME_TO_TRACE_LEVEL_DICT[trace_level.upper()]
+
+    TRACE_LEVEL = trace_level
+    TRACE_FILE = trace_file
+
+
+def is_trace_level_enabled(trace_level) -> bool:
+    return trace_level >= TRACE_LEVEL
+
+
+# Formats `message % args` only if `trace_level` is enabled
+def trace(trace_level, indent_level, message, *args):
+    if trace_level < TRACE_LEVEL:
+        return
+
+    if args:
+        message = message % args
+
+    print('    ' * indent_level, message, file=sys.stderr if TRACE_FILE is None else TRACE_FILE)
@@ -1,7 +1,10 @@
 from enum import Enum
-import sys
+from threading import Lock
+from weakref import WeakValueDictionary
 
-from attrs import define, frozen
+from attrs import define, field, fields, frozen
+
+from tracing import TRACE_LEVEL_DEBUG, trace
 
 
 Kind = Enum('Kind', ['CLASS_DEFINITION', 'GLOBAL_FUNCTION_DEFINITION', 'UNION', 'SUBSCRIBED_CLASS', 'TYPE_VARIABLE', 'OBJECT'])
@@ -13,25 +16,132 @@ class TypeVariable(object):
     pass
 
 
-@frozen
-class ConcreteClass:
+# new
+# `ConcreteClass`, `GlobalFunction`, `Subscription` and `Union` are hash-consed:
+# constructing an instance whose fields equal those of a live instance returns that instance.
+# Thus, equality is an identity check, and hashing is `id`-based (no rehashing of whole trees).
+class InternedTypeAnnotationMeta(type):
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        cls._field_name_tuple = None
+        cls._fields_tuple_to_instance_weak_value_dict = WeakValueDictionary()
+        cls._interning_lock = Lock()
+
+    def __call__(cls, *args, **kwargs):
+        if kwargs:
+            if cls._field_name_tuple is None:
+                cls._field_name_tuple = tuple(attribute.name for attribute in fields(cls) if attribute.init)
+            fields_tuple = args + tuple(kwargs[field_name] for field_name in cls._field_name_tuple[len(args):])
+        else:
+            fields_tuple = args
+
+        instance = cls._fields_tuple_to_instance_weak_value_dict.get(fields_tuple, None)
+
+        if instance is None:
+            with cls._interning_lock:
+                instance = cls._fields_tuple_to_instance_weak_value_dict.get(fields_tuple, None)
+                if instance is None:
+                    instance = super().__call__(*fields_tuple)
+                    cls._fields_tuple_to_instance_weak_value_dict[fields_tuple] = instance
+
+        return instance
+
+
+class InternedTypeAnnotation(metaclass=InternedTypeAnnotationMeta):
+    __slots__ = ()
+
+    # Re-intern when unpickled or copied
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, attribute.name) for attribute in fields(type(self)) if attribute.init)
+
+
+@frozen(eq=False)
+class ConcreteClass(InternedTypeAnnotation):
     module_name: str
     class_name: str
 
 
-@frozen
-class GlobalFunction:
+@frozen(eq=False)
+class GlobalFunction(InternedTypeAnnotation):
     module_name: str
     function_name: str
 
 
-@frozen
-class Subscription:
+@frozen(eq=False)
+class Subscription(InternedTypeAnnotation):
     concrete_class: ConcreteClass
     type_annotation_tuple: tuple
+    # new
+    # The type variables occurring in `type_annotation_tuple`, computed once when the instance is interned
+    # Empty for ground `Subscription`'s (most `typeshed` annotations), which substitution returns as is
+    free_type_variable_frozenset: frozenset = field(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        object.__setattr__(self, 'free_type_variable_frozenset', get_free_type_variable_frozenset_of_type_annotation_iterable(self.type_annotation_tuple))
+
+
+EMPTY_FROZENSET = frozenset()
 
 
-Union = tuple
+# new
+# The elements of a `Union` are flattened (`Union`'s in the elements are replaced by their elements), deduplicated and in canonical order (see `get_canonical_sort_key`),
+# so that unions of the same elements written in any order or nesting are the same key in the memo tables and lookup caches
+# `Union`'s are created through `create_union_type_annotation`, which establishes this form
+@frozen(eq=False)
+class Union(InternedTypeAnnotation):
+    element_tuple: tuple
+    # The type variables occurring in `element_tuple`, computed once when the instance is interned
+    free_type_variable_frozenset: frozenset = field(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        object.__setattr__(self, 'free_type_variable_frozenset', get_free_type_variable_frozenset_of_type_annotation_iterable(self.element_tuple))
+
+    # Re-normalize when unpickled or copied
+    def __reduce__(self):
+        return create_union_type_annotation, (self.element_tuple,)
+
+
+# new
+# The `Union` of the type annotations in `type_annotation_iterable`
+# A `Union` of a single element is that element
+def create_union_type_annotation(type_annotation_iterable):
+    element_list = list()
+    for type_annotation in type_annotation_iterable:
+        if isinstance(type_annotation, Union):
+            element_list.extend(type_annotation.element_tuple)
+        else:
+            element_list.append(type_annotation)
+
+    # Deduplicated in first-seen order, and then stably sorted
+    element_tuple = tuple(sorted(dict.fromkeys(element_list), key=get_canonical_sort_key))
+
+    if len(element_tuple) == 1:
+        return element_tuple[0]
+    else:
+        return Union(element_tuple)
+
+
+# new
+# The canonical order of the elements of a `Union`:
+# `ConcreteClass`'s, `GlobalFunction`'s and `Subscription`'s by name (and type arguments), then `TypeVariable`'s, then nested tuples and `Union`'s
+# `TypeVariable`'s have no name and compare equal, so (as the sort is stable) they keep the order they are first seen in,
+# which does not depend on the process (unlike their `id`'s); unions of the same `TypeVariable`'s in different orders are different keys
+# Only the elements of a `Union` are sorted, never the type arguments of a `Subscription`
+def get_canonical_sort_key(type_annotation) -> tuple:
+    if isinstance(type_annotation, ConcreteClass):
+        return (0, type_annotation.module_name, type_annotation.class_name)
+    elif isinstance(type_annotation, GlobalFunction):
+        return (1, type_annotation.module_name, type_annotation.function_name)
+    elif isinstance(type_annotation, Subscription):
+        return (2, type_annotation.concrete_class.module_name, type_annotation.concrete_class.class_name, tuple(get_canonical_sort_key(child_type_annotation) for child_type_annotation in type_annotation.type_annotation_tuple))
+    elif isinstance(type_annotation, TypeVariable):
+        return (3,)
+    elif isinstance(type_annotation, tuple):
+        return (4, tuple(get_canonical_sort_key(child_type_annotation) for child_type_annotation in type_annotation))
+    elif isinstance(type_annotation, Union):
+        return (5, tuple(get_canonical_sort_key(child_type_annotation) for child_type_annotation in type_annotation.element_tuple))
+    else:
+        raise TypeError(f'not a type annotation: {type_annotation!r}')
 
 
 def is_type_annotation(o):
@@ -42,10 +152,44 @@ def type_annotation_from_instance(instance):
     return ConcreteClass(type(instance).__module__, type(instance).__name__)
 
 
-def iterate_type_variables_in_type_annotation(type_annotation, indent_level=0):
-    indent = '    ' * indent_level
+# new
+def get_free_type_variable_frozenset(type_annotation) -> frozenset:
+    if isinstance(type_annotation, (ConcreteClass, GlobalFunction)):
+        return EMPTY_FROZENSET
+    elif isinstance(type_annotation, TypeVariable):
+        return frozenset((type_annotation,))
+    elif isinstance(type_annotation, Subscription):
+        return type_annotation.free_type_variable_frozenset
+    elif isinstance(type_annotation, Union):
+        return type_annotation.free_type_variable_frozenset
+    else:
+        assert False, type_annotation
+
+
+def get_free_type_variable_frozenset_of_type_annotation_iterable(type_annotation_iterable) -> frozenset:
+    free_type_variable_frozenset = EMPTY_FROZENSET
 
-    print(indent, f'iterate_type_variables_in_type_annotation {type_annotation}', file=sys.stderr)
+    for type_annotation in type_annotation_iterable:
+        child_free_type_variable_frozenset = get_free_type_variable_frozenset(type_annotation)
+
+        # The frozenset of the only child with free type variables is shared
+        if child_free_type_variable_frozenset and child_free_type_variable_frozenset is not free_type_variable_frozenset:
+            if free_type_variable_frozenset:
+                free_type_variable_frozenset = free_type_variable_frozenset | child_free_type_variable_frozenset
+            else:
+                free_type_variable_frozenset = child_free_type_variable_frozenset
+
+    return free_type_variable_frozenset
+
+
+# new
+# Whether substituting `old_type_variable_to_new_type_annotation_dict` may change a type annotation with free type variables `free_type_variable_frozenset`
+def is_affected_by_substitution(free_type_variable_frozenset: frozenset, old_type_variable_to_new_type_annotation_dict) -> bool:
+    return any(type_variable in old_type_variable_to_new_type_annotation_dict for type_variable in free_type_variable_frozenset)
+
+
+def iterate_type_variables_in_type_annotation(type_annotation, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'iterate_type_variables_in_type_annotation %s', type_annotation)
 
     # type_annotation is a ConcreteClass
     if isinstance(type_annotation, ConcreteClass):
@@ -55,21 +199,23 @@ def iterate_type_variables_in_type_annotation(type_annotation, indent_level=0):
         yield type_annotation
     # type_annotation is a Subscription
     elif isinstance(type_annotation, Subscription):
-        for child_type_annotation in type_annotation.type_annotation_tuple:
-            yield from iterate_type_variables_in_type_annotation(child_type_annotation, indent_level + 1)
+        # Ground subtrees are skipped
+        if type_annotation.free_type_variable_frozenset:
+            for child_type_annotation in type_annotation.type_annotation_tuple:
+                yield from iterate_type_variables_in_type_annotation(child_type_annotation, indent_level + 1)
     # new
     # type_annotation is a Union
     elif isinstance(type_annotation, Union):
-        for child_type_annotation in type_annotation:
-            yield from iterate_type_variables_in_type_annotation(child_type_annotation, indent_level + 1)
+        # Ground subtrees are skipped
+        if type_annotation.free_type_variable_frozenset:
+            for child_type_annotation in type_annotation.element_tuple:
+                yield from iterate_type_variables_in_type_annotation(child_type_annotation, indent_level + 1)
     else:
         assert False, type_annotation
 
 
 def replace_type_variables_in_type_annotation(type_annotation, old_type_variable_to_new_type_annotation_dict, indent_level=0):
-    indent = '    ' * indent_level
-
-    print(indent, f'replace_type_variables_in_type_annotation {type_annotation}, {old_type_variable_to_new_type_annotation_dict}', file=sys.stderr)
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'replace_type_variables_in_type_annotation %s, %s', type_annotation, old_type_variable_to_new_type_annotation_dict)
 
     # type_annotation is a ConcreteClass
     if isinstance(type_annotation, ConcreteClass):
@@ -81,20 +227,47 @@ def replace_type_variables_in_type_annotation(type_annotation, old_type_variable
         else:
             return type_annotation
     # type_annotation is a Subscription
+    # Subtrees without substituted type variables are returned as is, so that only the paths to substituted type variables are rebuilt
     elif isinstance(type_annotation, Subscription):
+        if not is_affected_by_substitution(type_annotation.free_type_variable_frozenset, old_type_variable_to_new_type_annotation_dict):
+            return type_annotation
+
         new_concrete_class= type_annotation.concrete_class
-        new_type_annotation_list = [
-            replace_type_variables_in_type_annotation(old_type_annotation, old_type_variable_to_new_type_annotation_dict, indent_level + 1)
-            for old_type_annotation in type_annotation.type_annotation_tuple
-        ]
-        return Subscription(new_concrete_class, tuple(new_type_annotation_list))
+        new_type_annotation_tuple = replace_type_variables_in_type_annotation_tuple(type_annotation.type_annotation_tuple, old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+        if new_type_annotation_tuple is type_annotation.type_annotation_tuple:
+            return type_annotation
+        else:
+            return Subscription(new_concrete_class, new_type_annotation_tuple)
     # new
     # type_annotation is a Union
+    # The new `Union` is normalized again, as substituted elements may be `Union`'s or equal to other elements
     elif isinstance(type_annotation, Union):
-        return Union([
-            replace_type_variables_in_type_annotation(child_type_annotation, old_type_variable_to_new_type_annotation_dict, indent_level + 1)
-            for child_type_annotation in type_annotation
-        ])
+        if not is_affected_by_substitution(type_annotation.free_type_variable_frozenset, old_type_variable_to_new_type_annotation_dict):
+            return type_annotation
+
+        new_element_tuple = replace_type_variables_in_type_annotation_tuple(type_annotation.element_tuple, old_type_variable_to_new_type_annotation_dict, indent_level + 1)
+        if new_element_tuple is type_annotation.element_tuple:
+            return type_annotation
+        else:
+            return create_union_type_annotation(new_element_tuple)
     else:
         assert False, type_annotation
 
+
+
+# new
+# Returns `type_annotation_tuple` itself if no element changes
+def replace_type_variables_in_type_annotation_tuple(type_annotation_tuple: tuple, old_type_variable_to_new_type_annotation_dict, indent_level=0) -> tuple:
+    new_type_annotation_list = None
+
+    for i, old_type_annotation in enumerate(type_annotation_tuple):
+        new_type_annotation = replace_type_variables_in_type_annotation(old_type_annotation, old_type_variable_to_new_type_annotation_dict, indent_level)
+        if new_type_annotation is not old_type_annotation and new_type_annotation_list is None:
+            new_type_annotation_list = list(type_annotation_tuple[:i])
+        if new_type_annotation_list is not None:
+            new_type_annotation_list.append(new_type_annotation)
+
+    if new_type_annotation_list is None:
+        return type_annotation_tuple
+    else:
+        return tuple(new_type_annotation_list)
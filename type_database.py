@@ -0,0 +1,562 @@
+"""
+Compact, read-only binary database of the contents of the caches in `look_up.py`
+(looked up names, `ClassDefinition`'s, `FunctionDefinition`'s and the base classes of each class).
+
+A database file is opened with `mmap`, so that all processes on a host opening the same file share one page-cache copy.
+Entries are decoded lazily with `struct.unpack_from` directly from the mapping: opening a database reads only its header,
+a lookup binary searches a sorted index, and the members of a class are only decoded when they are first read.
+
+Layout (all integers are little-endian unsigned 32-bit integers):
+
+- header (`HEADER_STRUCT`)
+- string table: `number_of_strings + 1` offsets into the UTF-8 string data, followed by the string data
+- annotation node table: one `NODE_STRUCT` (kind, a, b, c) per distinct type annotation
+  - `ConcreteClass`, `GlobalFunction`: a = module name string ID, b = class or function name string ID
+  - `TypeVariable`: a = type variable ID (distinct type variables are decoded to distinct `TypeVariable`'s)
+  - `Subscription`: a = node ID of the `ConcreteClass`, b = offset of the node IDs of the type arguments in the record area, c = their number
+  - `Union`: b = offset of the node IDs of the elements in the record area, c = their number (decoded through `create_union_type_annotation`, which re-establishes the canonical order, as the order of `TypeVariable`'s is per process)
+- record area: the variable-length records of classes and functions, and the child lists of annotation nodes
+- module index, name index, class index, function index: `INDEX_ENTRY_STRUCT`'s sorted by (module name, name)
+
+```python
+In [1]: from look_up import *
+
+In [2]: for c in class_list: look_up_class(ConcreteClass(c.__module__, c.__name__))
+
+In [3]: save_type_database('typeshed.tifdb')
+
+In [4]: # in each worker process
+   ...: open_type_database('typeshed.tifdb')
+
+In [5]: look_up_class(ConcreteClass('builtins', 'int')) # decoded from the shared mapping
+```
+"""
+
+from array import array
+import mmap
+import os
+import struct
+import sys
+import threading
+
+from class_definition import ClassDefinition, LazyMemberMapping
+from function_definition import FunctionDefinition
+from persistent_cache import PERSISTENT_CACHE_FORMAT_VERSION, SEARCH_CONTEXT, module_entries_key_or_none
+from tracing import TRACE_LEVEL_DEBUG, TRACE_LEVEL_INFO, trace
+from type_annotation import *
+
+
+TYPE_DATABASE_MAGIC = b'TIFPYDB\x00'
+
+# magic, format version, python major version, python minor version,
+# number of strings, string offset table offset, string data offset,
+# number of nodes, node table offset,
+# record area offset, record area length (in integers),
+# number of type variables,
+# number of modules, module index offset,
+# number of names, name index offset,
+# number of classes, class index offset,
+# number of functions, function index offset
+HEADER_STRUCT = struct.Struct('<8s19I')
+
+NODE_STRUCT = struct.Struct('<4I')
+
+# module name string ID, name string ID, value, extra value
+INDEX_ENTRY_STRUCT = struct.Struct('<4I')
+
+UINT32_STRUCT = struct.Struct('<I')
+
+NODE_KIND_CONCRETE_CLASS = 0
+NODE_KIND_GLOBAL_FUNCTION = 1
+NODE_KIND_TYPE_VARIABLE = 2
+NODE_KIND_SUBSCRIPTION = 3
+NODE_KIND_UNION = 4
+
+# Node ID representing None (e.g. a missing `vararg_type_annotation`)
+NONE_NODE_ID = 0xFFFFFFFF
+
+# Length representing a None list (e.g. an unknown `parameter_name_list`)
+NONE_LENGTH = 0xFFFFFFFF
+
+
+# Writer
+
+class TypeDatabaseBuilder:
+    def __init__(self):
+        self.string_list = list()
+        self.string_to_string_id_dict = dict()
+        self.node_list = list()
+        self.type_annotation_to_node_id_dict = dict()
+        self.type_variable_to_type_variable_id_dict = dict()
+        self.record_array = array('I')
+
+    def add_string(self, string: str) -> int:
+        string_id = self.string_to_string_id_dict.get(string, None)
+
+        if string_id is None:
+            string_id = len(self.string_list)
+            self.string_list.append(string)
+            self.string_to_string_id_dict[string] = string_id
+
+        return string_id
+
+    def add_type_annotation(self, type_annotation) -> int:
+        if type_annotation is None:
+            return NONE_NODE_ID
+
+        node_id = self.type_annotation_to_node_id_dict.get(type_annotation, None)
+
+        if node_id is None:
+            if isinstance(type_annotation, ConcreteClass):
+                node = (NODE_KIND_CONCRETE_CLASS, self.add_string(type_annotation.module_name), self.add_string(type_annotation.class_name), 0)
+            elif isinstance(type_annotation, GlobalFunction):
+                node = (NODE_KIND_GLOBAL_FUNCTION, self.add_string(type_annotation.module_name), self.add_string(type_annotation.function_name), 0)
+            elif isinstance(type_annotation, TypeVariable):
+                type_variable_id = self.type_variable_to_type_variable_id_dict.setdefault(type_annotation, len(self.type_variable_to_type_variable_id_dict))
+                node = (NODE_KIND_TYPE_VARIABLE, type_variable_id, 0, 0)
+            elif isinstance(type_annotation, Subscription):
+                concrete_class_node_id = self.add_type_annotation(type_annotation.concrete_class)
+                node = (NODE_KIND_SUBSCRIPTION, concrete_class_node_id, *self.add_node_id_list(type_annotation.type_annotation_tuple))
+            elif isinstance(type_annotation, Union):
+                node = (NODE_KIND_UNION, 0, *self.add_node_id_list(type_annotation.element_tuple))
+            else:
+                assert False, type_annotation
+
+            node_id = len(self.node_list)
+            self.node_list.append(node)
+            self.type_annotation_to_node_id_dict[type_annotation] = node_id
+
+        return node_id
+
+    # Returns (offset, number of node IDs)
+    def add_node_id_list(self, type_annotation_iterable):
+        node_id_list = [ self.add_type_annotation(type_annotation) for type_annotation in type_annotation_iterable ]
+        offset = len(self.record_array)
+        self.record_array.extend(node_id_list)
+        return offset, len(node_id_list)
+
+    def add_function_definition(self, function_definition: FunctionDefinition) -> int:
+        record = [len(function_definition.type_variable_list)]
+        record.extend(self.add_type_annotation(type_variable) for type_variable in function_definition.type_variable_list)
+        record.append(len(function_definition.parameter_type_annotation_list))
+        record.extend(self.add_type_annotation(type_annotation) for type_annotation in function_definition.parameter_type_annotation_list)
+        record.append(self.add_type_annotation(function_definition.vararg_type_annotation))
+        record.append(len(function_definition.kwonlyargs_name_to_type_annotation_dict))
+        for kwonlyarg_name, type_annotation in function_definition.kwonlyargs_name_to_type_annotation_dict.items():
+            record.append(self.add_string(kwonlyarg_name))
+            record.append(self.add_type_annotation(type_annotation))
+        record.append(self.add_type_annotation(function_definition.kwarg_type_annotation))
+        record.append(self.add_type_annotation(function_definition.return_value_type_annotation))
+        # The shape of the signature (an unknown shape has NONE_LENGTH parameter names)
+        if function_definition.parameter_name_list is None:
+            record.append(NONE_LENGTH)
+        else:
+            record.append(len(function_definition.parameter_name_list))
+            record.extend(self.add_string(parameter_name) for parameter_name in function_definition.parameter_name_list)
+        record.append(function_definition.number_of_defaulted_parameters)
+        record.append(int(function_definition.has_vararg))
+        record.append(int(function_definition.has_kwarg))
+
+        offset = len(self.record_array)
+        self.record_array.extend(record)
+        return offset
+
+    # Returns (offset, number of function definitions)
+    def add_function_definition_list(self, function_definition_list: list):
+        function_definition_offset_list = [ self.add_function_definition(function_definition) for function_definition in function_definition_list ]
+        offset = len(self.record_array)
+        self.record_array.extend(function_definition_offset_list)
+        return offset, len(function_definition_offset_list)
+
+    def add_class_definition(self, class_definition: ClassDefinition, base_class_list: list) -> int:
+        record = [len(class_definition.type_variable_list)]
+        record.extend(self.add_type_annotation(type_variable) for type_variable in class_definition.type_variable_list)
+        record.append(len(base_class_list))
+        record.extend(self.add_type_annotation(base_class) for base_class in base_class_list)
+
+        for member_name_to_function_definition_list_dict in (class_definition.method_name_to_method_list_dict, class_definition.staticmethod_name_to_staticmethod_list_dict):
+            record.append(len(member_name_to_function_definition_list_dict))
+            for member_name, function_definition_list in member_name_to_function_definition_list_dict.items():
+                record.append(self.add_string(member_name))
+                record.extend(self.add_function_definition_list(function_definition_list))
+
+        record.append(len(class_definition.property_name_to_property_type_annotation_dict))
+        for property_name, property_type_annotation in class_definition.property_name_to_property_type_annotation_dict.items():
+            record.append(self.add_string(property_name))
+            record.append(self.add_type_annotation(property_type_annotation))
+
+        offset = len(self.record_array)
+        self.record_array.extend(record)
+        return offset
+
+    # `key_value_list` is a list of ((module name, name), (value, extra value))
+    def build_index(self, key_value_list: list) -> bytes:
+        return b''.join(
+            INDEX_ENTRY_STRUCT.pack(self.add_string(module_name), self.add_string(name), value, extra_value)
+            for (module_name, name), (value, extra_value) in sorted(key_value_list, key=lambda key_value: key_value[0])
+        )
+
+
+def write_type_database(
+    file_path: str,
+    module_name_name_tuple_to_kind_type_annotation_tuple_dict: dict,
+    concrete_class_to_class_definition_dict: dict,
+    global_function_to_function_definition_dict: dict,
+    get_base_class_list,
+    indent_level=0
+):
+    trace(TRACE_LEVEL_INFO, indent_level, 'write_type_database %s', file_path)
+
+    type_database_builder = TypeDatabaseBuilder()
+
+    name_key_value_list = [
+        ((module_name, name), (type_database_builder.add_type_annotation(type_annotation), kind.value))
+        for (module_name, name), (type_annotation, kind) in module_name_name_tuple_to_kind_type_annotation_tuple_dict.items()
+    ]
+
+    class_key_value_list = [
+        ((concrete_class.module_name, concrete_class.class_name), (type_database_builder.add_class_definition(class_definition, get_base_class_list(concrete_class)), 0))
+        for concrete_class, class_definition in concrete_class_to_class_definition_dict.items()
+    ]
+
+    function_key_value_list = [
+        ((global_function.module_name, global_function.function_name), type_database_builder.add_function_definition_list(function_definition_list))
+        for global_function, function_definition_list in global_function_to_function_definition_dict.items()
+    ]
+
+    # The key each module's entries are valid for (the typeshed bundle hash, see `persistent_cache.py`), so that entries are ignored once any stub file changed
+    module_name_set = { module_name for (module_name, name), value in (*name_key_value_list, *class_key_value_list, *function_key_value_list) }
+    module_key_value_list = list()
+    for module_name in module_name_set:
+        module_entries_key = module_entries_key_or_none(module_name, indent_level + 1)
+        if module_entries_key is not None:
+            module_key_value_list.append(((module_name, ''), (type_database_builder.add_string(module_entries_key), 0)))
+
+    module_index = type_database_builder.build_index(module_key_value_list)
+    name_index = type_database_builder.build_index(name_key_value_list)
+    class_index = type_database_builder.build_index(class_key_value_list)
+    function_index = type_database_builder.build_index(function_key_value_list)
+
+    # All strings are added by now
+    string_data_list = [ string.encode('utf-8') for string in type_database_builder.string_list ]
+    string_offset_array = array('I', [0])
+    for string_data in string_data_list:
+        string_offset_array.append(string_offset_array[-1] + len(string_data))
+
+    node_table = b''.join(NODE_STRUCT.pack(*node) for node in type_database_builder.node_list)
+
+    record_array = type_database_builder.record_array
+    if sys.byteorder != 'little':
+        string_offset_array.byteswap()
+        record_array.byteswap()
+
+    section_list = [
+        string_offset_array.tobytes(),
+        b''.join(string_data_list),
+        node_table,
+        record_array.tobytes(),
+        module_index,
+        name_index,
+        class_index,
+        function_index
+    ]
+
+    section_offset_list = list()
+    offset = HEADER_STRUCT.size
+    for section in section_list:
+        # Align each section to 4 bytes
+        offset += -offset % 4
+        section_offset_list.append(offset)
+        offset += len(section)
+
+    (
+        string_offset_table_offset,
+        string_data_offset,
+        node_table_offset,
+        record_area_offset,
+        module_index_offset,
+        name_index_offset,
+        class_index_offset,
+        function_index_offset
+    ) = section_offset_list
+
+    major, minor = SEARCH_CONTEXT.version[:2]
+
+    header = HEADER_STRUCT.pack(
+        TYPE_DATABASE_MAGIC, PERSISTENT_CACHE_FORMAT_VERSION, major, minor,
+        len(type_database_builder.string_list), string_offset_table_offset, string_data_offset,
+        len(type_database_builder.node_list), node_table_offset,
+        record_area_offset, len(record_array),
+        len(type_database_builder.type_variable_to_type_variable_id_dict),
+        len(module_key_value_list), module_index_offset,
+        len(name_key_value_list), name_index_offset,
+        len(class_key_value_list), class_index_offset,
+        len(function_key_value_list), function_index_offset
+    )
+
+    # Write to a temporary file first so that processes never map a partially written file
+    temporary_file_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(temporary_file_path, 'wb') as file:
+        file.write(header)
+        written = HEADER_STRUCT.size
+        for section_offset, section in zip(section_offset_list, section_list):
+            file.write(b'\x00' * (section_offset - written))
+            file.write(section)
+            written = section_offset + len(section)
+    os.replace(temporary_file_path, file_path)
+
+
+# Reader
+
+class TypeDatabase:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+        with open(file_path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic, format_version, major, minor,
+            self.number_of_strings, self.string_offset_table_offset, self.string_data_offset,
+            self.number_of_nodes, self.node_table_offset,
+            self.record_area_offset, self.record_area_length,
+            self.number_of_type_variables,
+            self.number_of_modules, self.module_index_offset,
+            self.number_of_names, self.name_index_offset,
+            self.number_of_classes, self.class_index_offset,
+            self.number_of_functions, self.function_index_offset
+        ) = HEADER_STRUCT.unpack_from(self.buffer, 0)
+
+        self.is_compatible = (
+            magic == TYPE_DATABASE_MAGIC
+            and format_version == PERSISTENT_CACHE_FORMAT_VERSION
+            and (major, minor) == tuple(SEARCH_CONTEXT.version[:2])
+        )
+
+        # Decoded strings, annotations and type variables (shared by all entries, so that identities are preserved)
+        self.string_id_to_string_dict = dict()
+        self.node_id_to_type_annotation_dict = dict()
+        self.type_variable_id_to_type_variable_dict = dict()
+        # Whether the entries of each module are up to date
+        self.module_name_to_is_up_to_date_dict = dict()
+
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.buffer.close()
+
+    def get_string(self, string_id: int) -> str:
+        string = self.string_id_to_string_dict.get(string_id, None)
+
+        if string is None:
+            start, end = struct.unpack_from('<2I', self.buffer, self.string_offset_table_offset + 4 * string_id)
+            string = str(self.buffer[self.string_data_offset + start:self.string_data_offset + end], 'utf-8')
+            self.string_id_to_string_dict[string_id] = string
+
+        return string
+
+    def get_uint32_tuple(self, offset: int, length: int) -> tuple:
+        return struct.unpack_from(f'<{length}I', self.buffer, self.record_area_offset + 4 * offset)
+
+    def get_type_annotation(self, node_id: int):
+        if node_id == NONE_NODE_ID:
+            return None
+
+        type_annotation = self.node_id_to_type_annotation_dict.get(node_id, None)
+
+        if type_annotation is None:
+            node_kind, a, b, c = NODE_STRUCT.unpack_from(self.buffer, self.node_table_offset + NODE_STRUCT.size * node_id)
+
+            if node_kind == NODE_KIND_CONCRETE_CLASS:
+                type_annotation = ConcreteClass(self.get_string(a), self.get_string(b))
+            elif node_kind == NODE_KIND_GLOBAL_FUNCTION:
+                type_annotation = GlobalFunction(self.get_string(a), self.get_string(b))
+            elif node_kind == NODE_KIND_TYPE_VARIABLE:
+                with self.lock:
+                    type_annotation = self.type_variable_id_to_type_variable_dict.setdefault(a, TypeVariable())
+            elif node_kind == NODE_KIND_SUBSCRIPTION:
+                type_annotation = Subscription(
+                    self.get_type_annotation(a),
+                    tuple(self.get_type_annotation(child_node_id) for child_node_id in self.get_uint32_tuple(b, c))
+                )
+            elif node_kind == NODE_KIND_UNION:
+                type_annotation = create_union_type_annotation(self.get_type_annotation(child_node_id) for child_node_id in self.get_uint32_tuple(b, c))
+            else:
+                assert False, node_kind
+
+            self.node_id_to_type_annotation_dict[node_id] = type_annotation
+
+        return type_annotation
+
+    # Binary search of the index entry of (module_name, name)
+    # Returns (value, extra value) or None
+    def find_index_entry_or_none(self, index_offset: int, number_of_entries: int, module_name: str, name: str):
+        key = (module_name, name)
+
+        low, high = 0, number_of_entries
+        while low < high:
+            middle = (low + high) // 2
+            module_name_string_id, name_string_id, value, extra_value = INDEX_ENTRY_STRUCT.unpack_from(self.buffer, index_offset + INDEX_ENTRY_STRUCT.size * middle)
+            middle_key = (self.get_string(module_name_string_id), self.get_string(name_string_id))
+
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return value, extra_value
+
+        return None
+
+    def is_module_up_to_date(self, module_name: str, indent_level=0) -> bool:
+        is_up_to_date = self.module_name_to_is_up_to_date_dict.get(module_name, None)
+
+        if is_up_to_date is None:
+            index_entry_or_none = self.find_index_entry_or_none(self.module_index_offset, self.number_of_modules, module_name, '')
+            is_up_to_date = (
+                self.is_compatible
+                and index_entry_or_none is not None
+                and self.get_string(index_entry_or_none[0]) == module_entries_key_or_none(module_name, indent_level + 1)
+            )
+            self.module_name_to_is_up_to_date_dict[module_name] = is_up_to_date
+
+        return is_up_to_date
+
+    def decode_function_definition(self, offset: int) -> FunctionDefinition:
+        (number_of_type_variables,) = self.get_uint32_tuple(offset, 1)
+        type_variable_list = [ self.get_type_annotation(node_id) for node_id in self.get_uint32_tuple(offset + 1, number_of_type_variables) ]
+        offset += 1 + number_of_type_variables
+
+        (number_of_parameters,) = self.get_uint32_tuple(offset, 1)
+        parameter_type_annotation_list = [ self.get_type_annotation(node_id) for node_id in self.get_uint32_tuple(offset + 1, number_of_parameters) ]
+        offset += 1 + number_of_parameters
+
+        vararg_node_id, number_of_kwonlyargs = self.get_uint32_tuple(offset, 2)
+        offset += 2
+
+        kwonlyargs_name_to_type_annotation_dict = dict()
+        kwonlyargs_uint32_tuple = self.get_uint32_tuple(offset, 2 * number_of_kwonlyargs)
+        for i in range(number_of_kwonlyargs):
+            kwonlyargs_name_to_type_annotation_dict[self.get_string(kwonlyargs_uint32_tuple[2 * i])] = self.get_type_annotation(kwonlyargs_uint32_tuple[2 * i + 1])
+        offset += 2 * number_of_kwonlyargs
+
+        kwarg_node_id, return_value_node_id, number_of_parameter_names = self.get_uint32_tuple(offset, 3)
+        offset += 3
+
+        if number_of_parameter_names == NONE_LENGTH:
+            parameter_name_list = None
+        else:
+            parameter_name_list = [ self.get_string(string_id) for string_id in self.get_uint32_tuple(offset, number_of_parameter_names) ]
+            offset += number_of_parameter_names
+
+        number_of_defaulted_parameters, has_vararg, has_kwarg = self.get_uint32_tuple(offset, 3)
+
+        return FunctionDefinition(
+            type_variable_list=type_variable_list,
+            parameter_type_annotation_list=parameter_type_annotation_list,
+            vararg_type_annotation=self.get_type_annotation(vararg_node_id),
+            kwonlyargs_name_to_type_annotation_dict=kwonlyargs_name_to_type_annotation_dict,
+            kwarg_type_annotation=self.get_type_annotation(kwarg_node_id),
+            return_value_type_annotation=self.get_type_annotation(return_value_node_id),
+            parameter_name_list=parameter_name_list,
+            number_of_defaulted_parameters=number_of_defaulted_parameters,
+            has_vararg=bool(has_vararg),
+            has_kwarg=bool(has_kwarg)
+        )
+
+    # `offset_length_tuple` is (offset, number of function definitions)
+    def decode_function_definition_list(self, offset_length_tuple) -> list:
+        return [ self.decode_function_definition(function_definition_offset) for function_definition_offset in self.get_uint32_tuple(*offset_length_tuple) ]
+
+    # Returns (ClassDefinition, base class list)
+    # Methods, staticmethods and properties are decoded when they are first read
+    def decode_class_definition(self, offset: int):
+        (number_of_type_variables,) = self.get_uint32_tuple(offset, 1)
+        type_variable_list = [ self.get_type_annotation(node_id) for node_id in self.get_uint32_tuple(offset + 1, number_of_type_variables) ]
+        offset += 1 + number_of_type_variables
+
+        (number_of_base_classes,) = self.get_uint32_tuple(offset, 1)
+        base_class_list = [ self.get_type_annotation(node_id) for node_id in self.get_uint32_tuple(offset + 1, number_of_base_classes) ]
+        offset += 1 + number_of_base_classes
+
+        member_mapping_list = list()
+
+        for _ in range(2):
+            (number_of_members,) = self.get_uint32_tuple(offset, 1)
+            offset += 1
+
+            member_name_to_offset_length_tuple_dict = dict()
+            for _ in range(number_of_members):
+                member_name_string_id, function_definition_list_offset, number_of_function_definitions = self.get_uint32_tuple(offset, 3)
+                member_name_to_offset_length_tuple_dict[self.get_string(member_name_string_id)] = (function_definition_list_offset, number_of_function_definitions)
+                offset += 3
+
+            member_mapping_list.append(LazyMemberMapping(dict(), [(member_name_to_offset_length_tuple_dict, self.decode_function_definition_list)]))
+
+        (number_of_properties,) = self.get_uint32_tuple(offset, 1)
+        property_uint32_tuple = self.get_uint32_tuple(offset + 1, 2 * number_of_properties)
+        property_name_to_node_id_dict = {
+            self.get_string(property_uint32_tuple[2 * i]): property_uint32_tuple[2 * i + 1]
+            for i in range(number_of_properties)
+        }
+
+        method_mapping, staticmethod_mapping = member_mapping_list
+
+        class_definition = ClassDefinition(
+            type_variable_list,
+            method_mapping,
+            staticmethod_mapping,
+            LazyMemberMapping(dict(), [(property_name_to_node_id_dict, self.get_type_annotation)])
+        )
+
+        return class_definition, base_class_list
+
+    # Returns (type annotation, Kind) or None
+    def look_up_name_or_none(self, module_name: str, name: str, indent_level=0):
+        if not self.is_module_up_to_date(module_name, indent_level):
+            return None
+
+        index_entry_or_none = self.find_index_entry_or_none(self.name_index_offset, self.number_of_names, module_name, name)
+
+        if index_entry_or_none is None:
+            return None
+        else:
+            node_id, kind_value = index_entry_or_none
+            return self.get_type_annotation(node_id), Kind(kind_value)
+
+    # Returns (ClassDefinition, base class list) or None
+    def look_up_class_or_none(self, concrete_class: ConcreteClass, indent_level=0):
+        if not self.is_module_up_to_date(concrete_class.module_name, indent_level):
+            return None
+
+        index_entry_or_none = self.find_index_entry_or_none(self.class_index_offset, self.number_of_classes, concrete_class.module_name, concrete_class.class_name)
+
+        if index_entry_or_none is None:
+            return None
+        else:
+            return self.decode_class_definition(index_entry_or_none[0])
+
+    # Returns a list of FunctionDefinition's or None
+    def look_up_global_function_or_none(self, global_function: GlobalFunction, indent_level=0):
+        if not self.is_module_up_to_date(global_function.module_name, indent_level):
+            return None
+
+        index_entry_or_none = self.find_index_entry_or_none(self.function_index_offset, self.number_of_functions, global_function.module_name, global_function.function_name)
+
+        if index_entry_or_none is None:
+            return None
+        else:
+            return self.decode_function_definition_list(index_entry_or_none)
+
+
+def open_type_database_or_none(file_path: str, indent_level=0):
+    trace(TRACE_LEVEL_INFO, indent_level, 'open_type_database_or_none %s', file_path)
+
+    type_database = TypeDatabase(file_path)
+
+    if type_database.is_compatible:
+        return type_database
+    else:
+        trace(TRACE_LEVEL_INFO, indent_level, 'incompatible type database ignored: %s', file_path)
+        type_database.close()
+        return None
@@ -0,0 +1,221 @@
+"""
+Meets (greatest lower bounds) and joins (least upper bounds) of lists of type annotations.
+
+Classes are ordered by the ancestor bitsets of the class table (`class_hierarchy.py`), so the meet or join of a whole list of classes is computed in one pass with bitwise ANDs and ORs.
+`Subscription`'s of the resulting class are combined component-wise; as this is only sound for covariant type variables, the combined `Subscription` is checked with `type_annotation_subtyping`.
+Type annotations the class table cannot order (classes related only structurally, e.g. through `typing` protocols, or `Union`'s), and combined `Subscription`'s that fail the check, fall back to `type_annotation_subtyping` (which consults the protocol conformance table).
+`TypeVariable`'s are subtypes and supertypes of any type annotation, so the meet or join of a list containing a `TypeVariable` is that `TypeVariable`.
+Results do not depend on the order of the type annotations, except for breaking ties between incomparable type annotations.
+
+```python
+In [1]: from look_up import *
+
+In [2]: from type_lattice import *
+
+In [3]: for c in (bool, int, str): look_up_class(ConcreteClass('builtins', c.__name__))
+
+In [4]: meet_type_annotations_or_none([ConcreteClass('builtins', 'int'), ConcreteClass('builtins', 'bool'), ConcreteClass('builtins', 'object')])
+Out[4]: ConcreteClass(module_name='builtins', class_name='bool')
+
+In [5]: join_type_annotations_or_none([ConcreteClass('builtins', 'bool'), ConcreteClass('builtins', 'str')])
+Out[5]: ConcreteClass(module_name='builtins', class_name='object')
+```
+"""
+
+from class_hierarchy import get_ancestor_bitset, get_class_id_or_none, get_concrete_class, iterate_class_ids_in_bitset
+import subtyping
+from tracing import TRACE_LEVEL_DEBUG, trace
+from type_annotation import *
+
+
+# Class IDs of the concrete classes of `type_annotation_list`, or None if any of them is not a `ConcreteClass` or `Subscription` in the class table
+def get_class_id_list_or_none(type_annotation_list):
+    class_id_list = list()
+
+    for type_annotation in type_annotation_list:
+        concrete_class_or_none = subtyping.get_concrete_class_or_none(type_annotation)
+        if concrete_class_or_none is None:
+            return None
+
+        class_id_or_none = get_class_id_or_none(concrete_class_or_none)
+        if class_id_or_none is None:
+            return None
+
+        class_id_list.append(class_id_or_none)
+
+    return class_id_list
+
+
+# Combines `Subscription`'s of `concrete_class` component-wise with `combine_type_annotations_or_none`
+# Returns `concrete_class` if there are none, or if they do not all have the same number of type arguments
+def combine_subscriptions(concrete_class: ConcreteClass, subscription_list, combine_type_annotations_or_none, indent_level=0):
+    if not subscription_list:
+        return concrete_class
+    elif len(subscription_list) == 1:
+        return subscription_list[0]
+
+    number_of_type_arguments = len(subscription_list[0].type_annotation_tuple)
+    if any(len(subscription.type_annotation_tuple) != number_of_type_arguments for subscription in subscription_list):
+        return concrete_class
+
+    new_type_annotation_list = list()
+    for i in range(number_of_type_arguments):
+        new_type_annotation_or_none = combine_type_annotations_or_none([ subscription.type_annotation_tuple[i] for subscription in subscription_list ], indent_level + 1)
+        if new_type_annotation_or_none is None:
+            return concrete_class
+        new_type_annotation_list.append(new_type_annotation_or_none)
+
+    return Subscription(concrete_class, tuple(new_type_annotation_list))
+
+
+# Meet
+
+# The greatest type annotation in `type_annotation_list` that is a subtype of all of them (with `Subscription`'s of it combined component-wise),
+# None if `type_annotation_list` is empty
+# If `type_annotation_list` contains a `TypeVariable`, that `TypeVariable` (a `TypeVariable` is a subtype of any type annotation; `find_lowest_subtype_of_type_annotations_or_none` returned it before it became the meet)
+# If there is no such type annotation, the type annotation that is a subtype of the most others (the first of them on ties)
+def meet_type_annotations_or_none(type_annotation_list, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'meet_type_annotations_or_none %s', type_annotation_list)
+
+    unique_type_annotation_list = list(dict.fromkeys(type_annotation_list))
+
+    if not unique_type_annotation_list:
+        return None
+    elif len(unique_type_annotation_list) == 1:
+        return unique_type_annotation_list[0]
+
+    for type_annotation in unique_type_annotation_list:
+        if isinstance(type_annotation, TypeVariable):
+            return type_annotation
+
+    class_id_list_or_none = get_class_id_list_or_none(unique_type_annotation_list)
+
+    if class_id_list_or_none is not None:
+        # The class whose ancestors include all classes
+        class_bitset = 0
+        for class_id in class_id_list_or_none:
+            class_bitset |= 1 << class_id
+
+        for class_id in dict.fromkeys(class_id_list_or_none):
+            if get_ancestor_bitset(class_id) & class_bitset == class_bitset:
+                concrete_class = get_concrete_class(class_id)
+                trace(TRACE_LEVEL_DEBUG, indent_level, 'nominal meet %s', concrete_class)
+
+                # `Subscription`'s are lower than the bare class
+                subscription_list = [
+                    type_annotation
+                    for type_annotation in unique_type_annotation_list
+                    if isinstance(type_annotation, Subscription) and type_annotation.concrete_class == concrete_class
+                ]
+
+                if len(subscription_list) < 2:
+                    return subscription_list[0] if subscription_list else concrete_class
+
+                # Combining type arguments component-wise is only sound for covariant type variables, so the result is checked
+                meet = combine_subscriptions(concrete_class, subscription_list, meet_type_annotations_or_none, indent_level + 1)
+                if all(subtyping.type_annotation_subtyping_with_edges(meet, type_annotation, indent_level + 1)[0] for type_annotation in unique_type_annotation_list):
+                    return meet
+
+                trace(TRACE_LEVEL_DEBUG, indent_level, 'combined meet %s is not a lower bound', meet)
+                break
+
+    return meet_type_annotations_structurally(unique_type_annotation_list, indent_level + 1)
+
+
+def meet_type_annotations_structurally(type_annotation_list, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'meet_type_annotations_structurally %s', type_annotation_list)
+
+    number_of_supertypes_list = [
+        sum(
+            1
+            for other_type_annotation in type_annotation_list
+            if other_type_annotation is not type_annotation and subtyping.type_annotation_subtyping_with_edges(type_annotation, other_type_annotation, indent_level + 1)[0]
+        )
+        for type_annotation in type_annotation_list
+    ]
+
+    # `max` returns the first maximum
+    return type_annotation_list[max(range(len(type_annotation_list)), key=number_of_supertypes_list.__getitem__)]
+
+
+# Join
+
+# The least class that is an ancestor of the classes of all type annotations in `type_annotation_list` (with `Subscription`'s of it combined component-wise),
+# None if `type_annotation_list` is empty
+# If `type_annotation_list` contains a `TypeVariable`, that `TypeVariable`; if the class table cannot order the type annotations, their `Union`
+def join_type_annotations_or_none(type_annotation_list, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'join_type_annotations_or_none %s', type_annotation_list)
+
+    unique_type_annotation_list = list(dict.fromkeys(type_annotation_list))
+
+    if not unique_type_annotation_list:
+        return None
+    elif len(unique_type_annotation_list) == 1:
+        return unique_type_annotation_list[0]
+
+    for type_annotation in unique_type_annotation_list:
+        if isinstance(type_annotation, TypeVariable):
+            return type_annotation
+
+    class_id_list_or_none = get_class_id_list_or_none(unique_type_annotation_list)
+
+    if class_id_list_or_none is not None:
+        common_ancestor_bitset = -1
+        for class_id in class_id_list_or_none:
+            common_ancestor_bitset &= get_ancestor_bitset(class_id)
+
+        # The least common ancestor has the most ancestors (the lowest class ID on ties)
+        least_common_ancestor_class_id_or_none = None
+        least_common_ancestor_number_of_ancestors = -1
+        for class_id in iterate_class_ids_in_bitset(common_ancestor_bitset):
+            number_of_ancestors = bin(get_ancestor_bitset(class_id)).count('1')
+            if number_of_ancestors > least_common_ancestor_number_of_ancestors:
+                least_common_ancestor_class_id_or_none = class_id
+                least_common_ancestor_number_of_ancestors = number_of_ancestors
+
+        if least_common_ancestor_class_id_or_none is not None:
+            concrete_class = get_concrete_class(least_common_ancestor_class_id_or_none)
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'nominal join %s', concrete_class)
+
+            # changed
+            # The type arguments of the `Subscription`'s of the least common ancestor among the type annotations are kept (e.g. `Iterable[int]` for `list[int]` and `Iterable[int]`)
+            subscription_list = [
+                type_annotation
+                for type_annotation in unique_type_annotation_list
+                if isinstance(type_annotation, Subscription) and type_annotation.concrete_class == concrete_class
+            ]
+
+            if not subscription_list:
+                return concrete_class
+
+            # Combining type arguments component-wise is only sound for covariant type variables, so the result is checked
+            join = combine_subscriptions(concrete_class, subscription_list, join_type_annotations_or_none, indent_level + 1)
+            if all(subtyping.type_annotation_subtyping_with_edges(type_annotation, join, indent_level + 1)[0] for type_annotation in unique_type_annotation_list):
+                return join
+
+            trace(TRACE_LEVEL_DEBUG, indent_level, 'combined join %s is not an upper bound', join)
+
+            # The bare class is an upper bound of the other classes
+            if len(subscription_list) < len(unique_type_annotation_list):
+                return concrete_class
+
+    return join_type_annotations_structurally(unique_type_annotation_list, indent_level + 1)
+
+
+def join_type_annotations_structurally(type_annotation_list, indent_level=0):
+    trace(TRACE_LEVEL_DEBUG, indent_level, 'join_type_annotations_structurally %s', type_annotation_list)
+
+    # The type annotations that are not subtypes of any other type annotation
+    maximal_type_annotation_list = [
+        type_annotation
+        for type_annotation in type_annotation_list
+        if not any(
+            other_type_annotation is not type_annotation and subtyping.type_annotation_subtyping_with_edges(type_annotation, other_type_annotation, indent_level + 1)[0]
+            for other_type_annotation in type_annotation_list
+        )
+    ]
+
+    if len(maximal_type_annotation_list) == 1:
+        return maximal_type_annotation_list[0]
+    else:
+        return create_union_type_annotation(maximal_type_annotation_list or type_annotation_list)
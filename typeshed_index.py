@@ -0,0 +1,158 @@
+"""
+Builds a single serialized index of all classes, global functions and names (aliases, type variables, imported names),
+as well as the (class, base class) edges of the class hierarchy, of all stub modules known to typeshed_client.
+
+Modules are parsed in parallel across a process pool.
+
+```
+$ python typeshed_index.py typeshed_index.pickle --max-workers 8
+
+$ python typeshed_index.py typeshed_index.pickle --type-database typeshed.tifdb # also write a shared type database (see `type_database.py`)
+```
+
+```python
+In [1]: from typeshed_index import *
+
+In [2]: load_typeshed_index('typeshed_index.pickle')
+
+In [3]: look_up_class(ConcreteClass('builtins', 'int')) # cache hit
+```
+"""
+
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import os
+import pickle
+
+import typeshed_client.finder
+import typeshed_client.parser
+
+from look_up import collect_module_entries, install_module_entries, look_up_class, materialize_class_definition, look_up_global_function, look_up_name, save_type_database
+from persistent_cache import INTERPRETER_CACHE_TAG, PERSISTENT_CACHE_FORMAT_VERSION, SEARCH_CONTEXT, typeshed_bundle_hash
+from stub_module_cache import get_stub_names
+from tracing import TRACE_LEVEL_INFO, trace
+from type_annotation import *
+
+
+def iterate_module_names():
+    for module_name, stub_file_path in typeshed_client.finder.get_all_stub_files(SEARCH_CONTEXT):
+        yield module_name
+
+
+# Runs in a worker process
+# Returns (module_name, module_entries, error_list)
+def index_module(module_name: str):
+    error_list = list()
+
+    # Tracing output of the worker processes is discarded
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull):
+        module_stub_names_dict = get_stub_names(module_name)
+
+        if module_stub_names_dict is None:
+            return module_name, None, [f'no stub file found for {module_name}']
+
+        for name, name_info in module_stub_names_dict.items():
+            name_info_ast = name_info.ast
+
+            try:
+                if isinstance(name_info_ast, ast.ClassDef):
+                    # Members are parsed lazily, so parse them here to surface (and leave out) classes with unsupported members
+                    if not materialize_class_definition(look_up_class(ConcreteClass(module_name, name))):
+                        raise ValueError('members cannot be parsed')
+                elif isinstance(name_info_ast, (ast.FunctionDef, typeshed_client.parser.OverloadedName)):
+                    look_up_global_function(GlobalFunction(module_name, name))
+                else:
+                    look_up_name(module_name, name)
+            # The parser asserts on stub constructs it does not support
+            # Such names are skipped, and are looked up (and fail) on demand as before
+            except Exception as e:
+                error_list.append(f'{module_name}.{name}: {type(e).__name__} {e}')
+
+        module_entries = collect_module_entries(module_name)
+
+    return module_name, module_entries, error_list
+
+
+def build_typeshed_index(max_workers=None, module_name_list=None, indent_level=0) -> dict:
+    trace(TRACE_LEVEL_INFO, indent_level, 'build_typeshed_index %s', max_workers)
+
+    if module_name_list is None:
+        module_name_list = sorted(iterate_module_names())
+
+    typeshed_index = {
+        'format_version': PERSISTENT_CACHE_FORMAT_VERSION,
+        'python_version': tuple(SEARCH_CONTEXT.version[:2]),
+        'interpreter_cache_tag': INTERPRETER_CACHE_TAG,
+        # The entries of a module depend on other modules, so the whole index is only valid for the typeshed bundle it was built from
+        'typeshed_bundle_hash': typeshed_bundle_hash(indent_level + 1),
+        'module_name_to_module_entries_dict': dict(),
+        'module_name_to_error_list_dict': dict()
+    }
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for module_name, module_entries, error_list in executor.map(index_module, module_name_list, chunksize=8):
+            trace(TRACE_LEVEL_INFO, indent_level, 'indexed %s (%s errors)', module_name, len(error_list))
+
+            if module_entries is not None:
+                typeshed_index['module_name_to_module_entries_dict'][module_name] = module_entries
+
+            if error_list:
+                typeshed_index['module_name_to_error_list_dict'][module_name] = error_list
+
+    return typeshed_index
+
+
+def save_typeshed_index(typeshed_index: dict, file_path: str):
+    temporary_file_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(temporary_file_path, 'wb') as file:
+        pickle.dump(typeshed_index, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file_path, file_path)
+
+
+# Installs the entries of the index into the caches in `look_up.py`
+# The index is ignored if any stub file changed since it was built (modules will be parsed on demand)
+# Returns the number of installed modules
+def load_typeshed_index(file_path: str, indent_level=0) -> int:
+    trace(TRACE_LEVEL_INFO, indent_level, 'load_typeshed_index %s', file_path)
+
+    with open(file_path, 'rb') as file:
+        typeshed_index = pickle.load(file)
+
+    if (
+        typeshed_index['format_version'] != PERSISTENT_CACHE_FORMAT_VERSION
+        or typeshed_index['python_version'] != tuple(SEARCH_CONTEXT.version[:2])
+        or typeshed_index['interpreter_cache_tag'] != INTERPRETER_CACHE_TAG
+    ):
+        trace(TRACE_LEVEL_INFO, indent_level, 'incompatible index ignored: format version %s, python version %s, interpreter %s', typeshed_index['format_version'], typeshed_index['python_version'], typeshed_index['interpreter_cache_tag'])
+        return 0
+
+    if typeshed_index['typeshed_bundle_hash'] != typeshed_bundle_hash(indent_level + 1):
+        trace(TRACE_LEVEL_INFO, indent_level, 'stale index ignored: typeshed bundle hash %s', typeshed_index['typeshed_bundle_hash'])
+        return 0
+
+    for module_entries in typeshed_index['module_name_to_module_entries_dict'].values():
+        install_module_entries(module_entries, indent_level + 1)
+
+    return len(typeshed_index['module_name_to_module_entries_dict'])
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Pre-index all stub modules known to typeshed_client.')
+    argument_parser.add_argument('output_file_path')
+    argument_parser.add_argument('--max-workers', type=int, default=None)
+    argument_parser.add_argument('--module', action='append', dest='module_name_list', default=None, help='index only this module (may be repeated)')
+    argument_parser.add_argument('--type-database', dest='type_database_file_path', default=None, help='also write the index as a memory-mapped type database')
+    arguments = argument_parser.parse_args()
+
+    typeshed_index = build_typeshed_index(arguments.max_workers, arguments.module_name_list)
+    save_typeshed_index(typeshed_index, arguments.output_file_path)
+
+    number_of_errors = sum(len(error_list) for error_list in typeshed_index['module_name_to_error_list_dict'].values())
+    print(f'indexed {len(typeshed_index["module_name_to_module_entries_dict"])} modules ({number_of_errors} names failed) into {arguments.output_file_path}')
+
+    if arguments.type_database_file_path is not None:
+        load_typeshed_index(arguments.output_file_path)
+        save_type_database(arguments.type_database_file_path)
+        print(f'wrote type database {arguments.type_database_file_path}')